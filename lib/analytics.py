@@ -0,0 +1,166 @@
+from array import array
+from datetime import date
+from decimal import Decimal, ROUND_HALF_UP
+from db.models import TransactionType
+from db.session import get_engine
+from money import from_cents
+from helpers import TransactionHelper
+
+try:
+    import numpy as np
+except ImportError:
+    # array.array keeps the columns compact either way; numpy only speeds up the grouping
+    np = None
+
+# Integers only: month index (year * 12 + month - 1), Julian day number, cents, income flag, category (0 = none)
+COLUMNS_SQL = (
+    # created_at is stored as 'YYYY-MM-DD HH:MM:SS.ffffff'; substr is much cheaper than strftime per row
+    "SELECT CAST(substr(created_at, 1, 4) AS INTEGER) * 12 + CAST(substr(created_at, 6, 2) AS INTEGER) - 1, "
+    "CAST(julianday(substr(created_at, 1, 10)) + 0.5 AS INTEGER), "
+    "amount_cents, "
+    "transaction_type = '" + TransactionType.INCOME.name + "', "
+    "COALESCE(category_id, 0) "
+    "FROM transactions WHERE user_id = ? AND created_at IS NOT NULL"
+)
+JULIAN_DAY_OFFSET = 1721425
+
+def month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def week_label(julian_day):
+    # Julian day 0 was a Monday, so day - day % 7 is the Monday starting the week
+    return date.fromordinal(julian_day - julian_day % 7 - JULIAN_DAY_OFFSET).isoformat()
+
+class TransactionColumns:
+    __slots__ = ('months', 'days', 'cents', 'income', 'categories')
+
+    def __init__(self, rows):
+        if np is not None:
+            table = np.array(rows, dtype=np.int64).reshape(-1, 5)
+            self.months, self.days, self.cents = table[:, 0], table[:, 1], table[:, 2]
+            self.income, self.categories = table[:, 3].astype(bool), table[:, 4]
+        else:
+            columns = list(zip(*rows)) or [(), (), (), (), ()]
+            self.months, self.days, self.cents = array('l', columns[0]), array('l', columns[1]), array('q', columns[2])
+            self.income, self.categories = array('b', columns[3]), array('l', columns[4])
+
+    def __len__(self):
+        return len(self.cents)
+
+def load_columns(user_id, start_date=None, end_date=None):
+    sql, params = COLUMNS_SQL, [user_id]
+    if start_date:
+        sql += " AND created_at >= ?"
+        params.append(start_date.strftime("%Y-%m-%d %H:%M:%S.%f"))
+    if end_date:
+        sql += " AND created_at < ?"
+        params.append(end_date.strftime("%Y-%m-%d %H:%M:%S.%f"))
+
+    # Straight off the DBAPI cursor: no ORM objects, no Row wrappers
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        cursor.close()
+    finally:
+        connection.close()
+    return TransactionColumns(rows)
+
+def group_totals(keys, columns):
+    # {key: [income_cents, expense_cents, income_count, expense_count]} in exact integer arithmetic
+    if np is not None:
+        unique, inverse = np.unique(keys, return_inverse=True)
+        totals = np.zeros((len(unique), 4), dtype=np.int64)
+        np.add.at(totals[:, 0], inverse, np.where(columns.income, columns.cents, 0))
+        np.add.at(totals[:, 1], inverse, np.where(columns.income, 0, columns.cents))
+        np.add.at(totals[:, 2], inverse, columns.income.astype(np.int64))
+        np.add.at(totals[:, 3], inverse, (~columns.income).astype(np.int64))
+        return {int(key): [int(value) for value in row] for key, row in zip(unique, totals)}
+
+    groups = {}
+    for key, cents, income in zip(keys, columns.cents, columns.income):
+        totals = groups.get(key)
+        if totals is None:
+            totals = groups[key] = [0, 0, 0, 0]
+        if income:
+            totals[0] += cents
+            totals[2] += 1
+        else:
+            totals[1] += cents
+            totals[3] += 1
+    return groups
+
+def cumulative(values):
+    if np is not None:
+        return [int(value) for value in np.cumsum(np.array(values, dtype=np.int64))]
+    running, result = 0, []
+    for value in values:
+        running += value
+        result.append(running)
+    return result
+
+class AnalyticsHelper:
+    @staticmethod
+    def monthly_totals(columns):
+        # Same shape as TransactionHelper.get_monthly_report
+        return {
+            month_label(month): {
+                'income': from_cents(totals[0]),
+                'expense': from_cents(totals[1]),
+                'counts': {'income': totals[2], 'expense': totals[3]}
+            }
+            for month, totals in sorted(group_totals(columns.months, columns).items())
+        }
+
+    @staticmethod
+    def weekly_totals(columns):
+        weeks = columns.days - columns.days % 7 if np is not None else array('l', (day - day % 7 for day in columns.days))
+        return {
+            week_label(week): {'income': from_cents(totals[0]), 'expense': from_cents(totals[1]), 'count': totals[2] + totals[3]}
+            for week, totals in sorted(group_totals(weeks, columns).items())
+        }
+
+    @staticmethod
+    def category_totals(columns):
+        return {
+            category or None: {'income': from_cents(totals[0]), 'expense': from_cents(totals[1]), 'count': totals[2] + totals[3]}
+            for category, totals in group_totals(columns.categories, columns).items()
+        }
+
+    @staticmethod
+    def monthly_net(columns):
+        # Net cents for every month from the first to the last, empty months included
+        totals = group_totals(columns.months, columns)
+        if not totals:
+            return [], []
+        months = list(range(min(totals), max(totals) + 1))
+        return months, [totals[m][0] - totals[m][1] if m in totals else 0 for m in months]
+
+    @staticmethod
+    def running_balance(columns):
+        months, net = AnalyticsHelper.monthly_net(columns)
+        return [(month_label(month), from_cents(balance)) for month, balance in zip(months, cumulative(net))]
+
+    @staticmethod
+    def rolling_average(columns, window=3):
+        # Mean monthly net over the trailing window, once a full window is available
+        months, net = AnalyticsHelper.monthly_net(columns)
+        sums = cumulative(net)
+        averages = []
+        for i in range(window - 1, len(months)):
+            total = sums[i] - (sums[i - window] if i >= window else 0)
+            average = (from_cents(total) / window).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            averages.append((month_label(months[i]), average))
+        return averages
+
+    @staticmethod
+    def verify(user_id, start_date=None, end_date=None):
+        # Cross-check against the SQL report; returns the months that disagree
+        expected = TransactionHelper.get_monthly_report(user_id, start_date, end_date)
+        actual = AnalyticsHelper.monthly_totals(load_columns(user_id, start_date, end_date))
+        return [
+            (month, expected.get(month), actual.get(month))
+            for month in sorted(set(expected) | set(actual))
+            if expected.get(month) != actual.get(month)
+        ]
@@ -0,0 +1,309 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from db.session import DATABASE_URL, SQLITE_PROFILE, POOL_SETTINGS, apply_sqlite_profile
+from db.models import User, Category, Transaction, TransactionType
+from money import to_cents
+from cache import report_cache
+from records import TransactionRecord, CategoryRecord, select_records
+from rollups import RollupHelper
+from budgets import BudgetHelper
+from auth import hash_password, verify_password, verify_unknown_user, needs_rehash, login_throttle, last_logins
+from helpers import (
+    balances_from_rows, transactions_page_statement, split_page, totals_statement, totals_from_rows,
+    detailed_report_statement, detailed_report_from_records, monthly_report_statement, monthly_summary_from_rows,
+    category_report_statement, category_report_from_rows
+)
+
+# Async mirror of UserHelper, CategoryHelper and TransactionHelper with the same
+# return values. Needs the aiosqlite driver (pip install aiosqlite) for SQLite.
+
+def async_url(url=DATABASE_URL):
+    if url.startswith('sqlite://'):
+        return 'sqlite+aiosqlite://' + url[len('sqlite://'):]
+    return url
+
+def make_async_engine(url=DATABASE_URL, profile=SQLITE_PROFILE, **pool_settings):
+    url = async_url(url)
+    if url in ('sqlite+aiosqlite://', 'sqlite+aiosqlite:///:memory:'):
+        engine = create_async_engine(url)
+    else:
+        engine = create_async_engine(url, pool_pre_ping=True, **dict(POOL_SETTINGS, **pool_settings))
+    if engine.dialect.name == 'sqlite':
+        # Same PRAGMA profile as the sync engine; connect events live on the sync facade
+        apply_sqlite_profile(engine.sync_engine, profile)
+    return engine
+
+async_engine = None
+AsyncSessionFactory = async_sessionmaker(expire_on_commit=False)
+
+def get_async_engine():
+    global async_engine
+    if async_engine is None:
+        async_engine = make_async_engine()
+        AsyncSessionFactory.configure(bind=async_engine)
+    return async_engine
+
+async def configure_async_engine(url=DATABASE_URL, profile=SQLITE_PROFILE, **pool_settings):
+    global async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+    async_engine = make_async_engine(url, profile, **pool_settings)
+    AsyncSessionFactory.configure(bind=async_engine)
+    return async_engine
+
+async def dispose_async_engine():
+    # aiosqlite runs each connection on its own thread; dispose before the loop exits
+    global async_engine
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = None
+
+@asynccontextmanager
+async def async_session_scope():
+    # One AsyncSession per unit of work, never shared between concurrent tasks
+    get_async_engine()
+    session = AsyncSessionFactory()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+async def run_blocking(function, *args):
+    # Password hashing is deliberately slow CPU work; keep it off the event loop
+    return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+async def fetch_records(session, record_class, statement):
+    result = await session.execute(statement)
+    return [record_class(*row) for row in result]
+
+class AsyncUserHelper:
+    @staticmethod
+    async def create_user(name, email, password):
+        try:
+            async with async_session_scope() as session:
+                if await session.scalar(select(User.id).where(User.email == email)):
+                    return None, "Email already exists"
+
+                user = User(name=name, email=email, password=await run_blocking(hash_password, password))
+                session.add(user)
+            return user, "Account created"
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    async def login_user(email, password):
+        try:
+            retry_after = login_throttle.retry_after(email)
+            if retry_after:
+                return None, f"Too many failed attempts. Try again in {retry_after:.0f}s"
+
+            async with async_session_scope() as session:
+                user = await session.scalar(select(User).where(User.email == email))
+            if user:
+                verified = await run_blocking(verify_password, password, user.password)
+            else:
+                verified = await run_blocking(verify_unknown_user, password)
+            if not verified:
+                login_throttle.failure(email)
+                return None, "Invalid credentials"
+
+            login_throttle.reset(email)
+            if needs_rehash(user.password):
+                user.password = await run_blocking(hash_password, password)
+                async with async_session_scope() as session:
+                    await session.execute(update(User).where(User.id == user.id).values(password=user.password))
+            user.last_login = datetime.now()
+            await run_blocking(last_logins.record, user.id, user.last_login)
+            return user, "Login successful"
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    async def delete_user(user_id):
+        try:
+            async with async_session_scope() as session:
+                user = await session.get(User, user_id)
+                if not user:
+                    return False, "User not found"
+                await session.delete(user)
+            report_cache.invalidate_user(user_id)
+            return True, "Account deleted"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    @staticmethod
+    async def get_balances(user_id):
+        async with async_session_scope() as session:
+            balance = await session.scalar(select(User.balance_cents).where(User.id == user_id))
+            categories = (await session.execute(
+                select(Category.name, Category.balance_cents).where(Category.user_id == user_id).order_by(Category.name)
+            )).all()
+        return balances_from_rows(balance, categories)
+
+class AsyncCategoryHelper:
+    @staticmethod
+    async def create_category(name, user_id):
+        try:
+            async with async_session_scope() as session:
+                if await session.scalar(select(Category.id).where(Category.name == name, Category.user_id == user_id)):
+                    return None, "Category already exists"
+
+                category = Category(name=name, user_id=user_id)
+                session.add(category)
+            return category, "Category created"
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    async def get_user_categories(user_id):
+        async with async_session_scope() as session:
+            return await fetch_records(session, CategoryRecord, select_records(CategoryRecord).where(Category.user_id == user_id))
+
+    @staticmethod
+    async def find_category_by_name(name, user_id):
+        async with async_session_scope() as session:
+            return await session.scalar(select(Category).where(Category.name == name, Category.user_id == user_id).limit(1))
+
+    @staticmethod
+    async def delete_category(name, user_id):
+        try:
+            async with async_session_scope() as session:
+                category = await session.scalar(select(Category).where(Category.name == name, Category.user_id == user_id).limit(1))
+                if not category:
+                    return False, "Category not found"
+                await session.run_sync(RollupHelper.forget_category, category.id)
+                await session.delete(category)
+            report_cache.invalidate_user(user_id)
+            return True, "Category deleted"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+class AsyncTransactionHelper:
+    @staticmethod
+    async def create_transaction(amount, transaction_type, description, user_id, category_name=None):
+        try:
+            if transaction_type.lower() not in ['income', 'expense']:
+                return None, "Invalid type. Use 'income' or 'expense'"
+
+            trans_type = TransactionType.INCOME if transaction_type.lower() == 'income' else TransactionType.EXPENSE
+
+            async with async_session_scope() as session:
+                category_id = None
+                if category_name:
+                    category_id = await session.scalar(
+                        select(Category.id).where(Category.name == category_name, Category.user_id == user_id).limit(1))
+                    if category_id is None:
+                        return None, "Category not found"
+
+                transaction = Transaction(
+                    amount_cents=to_cents(amount),
+                    transaction_type=trans_type,
+                    description=description,
+                    user_id=user_id,
+                    category_id=category_id
+                )
+                session.add(transaction)
+                await session.flush()
+                # The rollup and budget rules are sync code; run_sync drives them without blocking the loop
+                await session.run_sync(RollupHelper.record, [transaction])
+                alerts = await session.run_sync(BudgetHelper.check, transaction)
+            report_cache.invalidate_user(user_id)
+            return transaction, "\n".join(["Transaction created"] + alerts)
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    async def get_user_transactions(user_id):
+        async with async_session_scope() as session:
+            return await fetch_records(session, TransactionRecord, select_records(TransactionRecord).where(Transaction.user_id == user_id))
+
+    @staticmethod
+    async def get_transactions_page(user_id, page_size=20, cursor=None, order="desc", start_date=None, end_date=None):
+        query = transactions_page_statement(user_id, page_size, cursor, order, start_date, end_date)
+        async with async_session_scope() as session:
+            transactions = await fetch_records(session, TransactionRecord, query)
+        return split_page(transactions, page_size)
+
+    @staticmethod
+    async def get_transaction_totals(user_id):
+        async with async_session_scope() as session:
+            rows = (await session.execute(totals_statement(user_id))).all()
+        return totals_from_rows(rows)
+
+    @staticmethod
+    async def find_transaction_by_description(description, user_id):
+        async with async_session_scope() as session:
+            return await session.scalar(
+                select(Transaction).where(Transaction.description == description, Transaction.user_id == user_id).limit(1))
+
+    @staticmethod
+    async def delete_transaction(description, user_id):
+        try:
+            async with async_session_scope() as session:
+                transaction = await session.scalar(
+                    select(Transaction).where(Transaction.description == description, Transaction.user_id == user_id).limit(1))
+                if not transaction:
+                    return False, "Transaction not found"
+                await session.run_sync(RollupHelper.record, [transaction], -1)
+                await session.delete(transaction)
+            report_cache.invalidate_user(user_id)
+            return True, "Transaction deleted"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    @staticmethod
+    async def get_detailed_monthly_report(user_id):
+        cached = report_cache.get(user_id, ('detailed',))
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
+        try:
+            async with async_session_scope() as session:
+                transactions = await fetch_records(session, TransactionRecord, detailed_report_statement(user_id))
+            report = detailed_report_from_records(transactions)
+            report_cache.put(user_id, ('detailed',), report, generation)
+            return report
+        except Exception as e:
+            print(f"Error generating monthly report: {str(e)}")
+            return {}
+
+    @staticmethod
+    async def get_category_report(user_id, start_month=None, end_month=None, top=None):
+        cache_key = ('categories', start_month, end_month, top)
+        cached = report_cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
+        try:
+            async with async_session_scope() as session:
+                rows = (await session.execute(category_report_statement(user_id, start_month, end_month))).all()
+            report = category_report_from_rows(rows, top)
+            report_cache.put(user_id, cache_key, report, generation)
+            return report
+        except Exception as e:
+            print(f"Error generating category report: {str(e)}")
+            return {'months': {}, 'totals': []}
+
+    @staticmethod
+    async def get_monthly_report(user_id, start_date=None, end_date=None, category_id=None):
+        cache_key = ('monthly', start_date, end_date, category_id)
+        cached = report_cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
+        try:
+            async with async_session_scope() as session:
+                rows = (await session.execute(monthly_report_statement(user_id, start_date, end_date, category_id))).all()
+            summary = monthly_summary_from_rows(rows)
+            report_cache.put(user_id, cache_key, summary, generation)
+            return summary
+        except Exception as e:
+            print(f"Error generating summary report: {str(e)}")
+            return {}
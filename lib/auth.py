@@ -0,0 +1,177 @@
+import atexit
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from sqlalchemy import update, bindparam
+from db.models import User
+from db.session import session_scope
+
+# Stored format: <kdf>$<cost>$<salt>$<hash>, e.g. pbkdf2_sha256$600000$<b64>$<b64>
+# or scrypt$16384.8.1$<b64>$<b64>. The cost travels with each hash, so raising it
+# only affects new hashes, and old ones are upgraded on the next good login.
+PASSWORD_KDF = os.environ.get('FINANCE_TRACKER_PASSWORD_KDF', 'pbkdf2_sha256')
+PBKDF2_ITERATIONS = int(os.environ.get('FINANCE_TRACKER_PBKDF2_ITERATIONS', 600000))
+SCRYPT_N = int(os.environ.get('FINANCE_TRACKER_SCRYPT_N', 2 ** 14))
+SALT_BYTES = 16
+
+MAX_FAILED_LOGINS = int(os.environ.get('FINANCE_TRACKER_MAX_FAILED_LOGINS', 5))
+FAILED_LOGIN_WINDOW = float(os.environ.get('FINANCE_TRACKER_FAILED_LOGIN_WINDOW', 300))
+LAST_LOGIN_FLUSH_SECONDS = float(os.environ.get('FINANCE_TRACKER_LAST_LOGIN_FLUSH', 5))
+
+def _b64(raw):
+    return base64.b64encode(raw).decode('ascii')
+
+def default_cost(kdf=None):
+    # Module settings are read at call time so the benchmark can retune them in-process
+    kdf = kdf or PASSWORD_KDF
+    if kdf == 'pbkdf2_sha256':
+        return str(PBKDF2_ITERATIONS)
+    if kdf == 'scrypt':
+        return f"{SCRYPT_N}.8.1"
+    raise ValueError(f"Unknown password KDF '{kdf}'. Use pbkdf2_sha256 or scrypt")
+
+def _derive(kdf, cost, password, salt):
+    if kdf == 'pbkdf2_sha256':
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, int(cost))
+    if kdf == 'scrypt':
+        n, r, p = (int(part) for part in cost.split('.'))
+        return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+    raise ValueError(f"Unknown password KDF '{kdf}'")
+
+def hash_password(password, kdf=None, cost=None):
+    kdf = kdf or PASSWORD_KDF
+    cost = cost or default_cost(kdf)
+    salt = secrets.token_bytes(SALT_BYTES)
+    return f"{kdf}${cost}${_b64(salt)}${_b64(_derive(kdf, cost, password, salt))}"
+
+def is_hashed(stored):
+    return stored.count('$') == 3 and stored.split('$', 1)[0] in ('pbkdf2_sha256', 'scrypt')
+
+def verify_password(password, stored):
+    if not stored or not is_hashed(stored):
+        return False
+    kdf, cost, salt, expected = stored.split('$')
+    derived = _derive(kdf, cost, password, base64.b64decode(salt))
+    return hmac.compare_digest(derived, base64.b64decode(expected))
+
+def needs_rehash(stored, kdf=None):
+    kdf = kdf or PASSWORD_KDF
+    return not stored.startswith(f"{kdf}${default_cost(kdf)}$")
+
+# Verified against when the email is unknown, so a miss costs as much as a wrong password
+DUMMY_HASH = None
+
+def verify_unknown_user(password):
+    global DUMMY_HASH
+    if DUMMY_HASH is None or needs_rehash(DUMMY_HASH):
+        DUMMY_HASH = hash_password(secrets.token_hex(8))
+    verify_password(password, DUMMY_HASH)
+    return False
+
+class LoginThrottle:
+    # Sliding window of failed attempts per email, in process memory
+    def __init__(self, max_failures=MAX_FAILED_LOGINS, window=FAILED_LOGIN_WINDOW):
+        self.max_failures = max_failures
+        self.window = window
+        self.failures = {}
+        # (time, email) for every failure in order; with one window that is also expiry order
+        self.expiries = deque()
+        self.lock = threading.Lock()
+
+    def _recent(self, email, now):
+        attempts = self.failures.get(email)
+        if attempts is None:
+            return None
+        while attempts and attempts[0] <= now - self.window:
+            attempts.popleft()
+        if not attempts:
+            del self.failures[email]
+            return None
+        return attempts
+
+    def retry_after(self, email):
+        # Seconds until the next attempt is allowed, 0 if it is allowed now
+        now = time.monotonic()
+        with self.lock:
+            attempts = self._recent(email, now)
+            if attempts is None or len(attempts) < self.max_failures:
+                return 0
+            return attempts[-self.max_failures] + self.window - now
+
+    def failure(self, email):
+        now = time.monotonic()
+        with self.lock:
+            # Prune emails whose failures have all aged out, even if they never come back
+            while self.expiries and self.expiries[0][0] <= now - self.window:
+                self._recent(self.expiries.popleft()[1], now)
+            self.expiries.append((now, email))
+            attempts = self._recent(email, now)
+            if attempts is None:
+                attempts = self.failures[email] = deque(maxlen=self.max_failures)
+            attempts.append(now)
+
+    def reset(self, email):
+        with self.lock:
+            self.failures.pop(email, None)
+
+class LastLoginRecorder:
+    # last_login is informational, so logins queue it here and a background thread
+    # writes the latest value for every user in one UPDATE every flush_seconds,
+    # instead of a commit per login. Logins never wait on (or fail with) that write.
+    def __init__(self, flush_seconds=LAST_LOGIN_FLUSH_SECONDS):
+        self.flush_seconds = flush_seconds
+        self.pending = {}
+        self.thread = None
+        self.stopped = threading.Event()
+        self.lock = threading.Lock()
+
+    def record(self, user_id, when):
+        with self.lock:
+            self.pending[user_id] = when
+            if self.thread is None and not self.stopped.is_set():
+                self.thread = threading.Thread(target=self._run, name="last-login-flush", daemon=True)
+                self.thread.start()
+
+    def close(self):
+        self.stopped.set()
+        self._flush_logged()
+
+    def _run(self):
+        while not self.stopped.wait(self.flush_seconds):
+            self._flush_logged()
+
+    def _flush_logged(self):
+        # A failed flush (e.g. database is locked) keeps its entries for the next one
+        try:
+            return self.flush()
+        except Exception as e:
+            print(f"Saving last_login failed, will retry: {str(e)}")
+            return 0
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+        try:
+            with session_scope() as session:
+                session.connection().execute(
+                    update(User.__table__).where(User.__table__.c.id == bindparam('uid'))
+                    .values(last_login=bindparam('when')),
+                    [{'uid': user_id, 'when': when} for user_id, when in pending.items()])
+        except Exception:
+            # Put them back (unless a newer login has replaced them) for the next flush
+            with self.lock:
+                for user_id, when in pending.items():
+                    self.pending.setdefault(user_id, when)
+            raise
+        return len(pending)
+
+login_throttle = LoginThrottle()
+last_logins = LastLoginRecorder()
+atexit.register(last_logins.close)
@@ -0,0 +1,630 @@
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import sqlalchemy
+from db.session import configure_engine, SQLITE_PROFILES
+from db.models import Base, Category, Transaction, User, RecurringRule, RecurringFrequency, TransactionType, session_scope
+from db.seed import generate_dataset
+from helpers import UserHelper, TransactionHelper
+from analytics import AnalyticsHelper, load_columns
+from records import TransactionRecord, select_records, fetch_records
+import auth
+from exporter import ExportHelper
+from recurring import RecurringHelper
+from rollups import RollupHelper
+from writebehind import WriteBehindQueue
+from purge import PurgeHelper
+from cache import report_cache
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+SUITE_USERS = 10
+SUITE_CATEGORIES = 20
+REGRESSION_THRESHOLD = 1.10
+STARTUP_TARGET_MS = 150
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def bench_sqlite_profile(profile, writes=500, read_seconds=2.0):
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+    Base.metadata.create_all(engine)
+    user, msg = UserHelper.create_user("Bench", f"bench-{profile}@example.com", "bench")
+
+    # Single-row commits, the way the CLI writes
+    started = time.perf_counter()
+    for i in range(writes):
+        TransactionHelper.create_transaction(10 + i % 90, "expense" if i % 3 else "income", f"write {i}", user.id)
+    write_seconds = time.perf_counter() - started
+
+    # Read latency while another thread keeps committing
+    stop = threading.Event()
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            TransactionHelper.create_transaction(5, "expense", f"background {i}", user.id)
+            i += 1
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    latencies = []
+    deadline = time.perf_counter() + read_seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        TransactionHelper.get_transaction_totals(user.id)
+        latencies.append((time.perf_counter() - started) * 1000)
+    stop.set()
+    thread.join()
+    engine.dispose()
+
+    return {
+        'profile': profile,
+        'writes_per_sec': writes / write_seconds,
+        'reads': len(latencies),
+        'read_p50_ms': statistics.median(latencies) if latencies else 0.0,
+        'read_p99_ms': percentile(latencies, 99),
+    }
+
+def run_sqlite_benchmark(profiles=None, writes=500):
+    results = [bench_sqlite_profile(profile, writes) for profile in (profiles or list(SQLITE_PROFILES))]
+    print("\n--- SQLite Profiles ---")
+    print(f"{'profile':<10} {'writes/sec':>12} {'reads':>8} {'read p50 ms':>12} {'read p99 ms':>12}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['writes_per_sec']:>12.1f} {r['reads']:>8} {r['read_p50_ms']:>12.2f} {r['read_p99_ms']:>12.2f}")
+    return results
+
+def uncached(report, *args, **kwargs):
+    # The report helpers read through report_cache; every timed run has to compute
+    report_cache.clear()
+    return report(*args, **kwargs)
+
+def suite_cases(user_id):
+    return {
+        'get_monthly_report': lambda: uncached(TransactionHelper.get_monthly_report, user_id),
+        'get_monthly_report (date range)': lambda: uncached(TransactionHelper.get_monthly_report, user_id, start_date=datetime(2000, 1, 1)),
+        'analytics monthly_totals': lambda: AnalyticsHelper.monthly_totals(load_columns(user_id)),
+        'get_detailed_monthly_report': lambda: uncached(TransactionHelper.get_detailed_monthly_report, user_id),
+        'get_user_transactions': lambda: TransactionHelper.get_user_transactions(user_id),
+        'get_transactions_page': lambda: TransactionHelper.get_transactions_page(user_id, 20),
+        'get_transaction_totals': lambda: TransactionHelper.get_transaction_totals(user_id),
+        'find_transaction_by_description': lambda: TransactionHelper.find_transaction_by_description("Refund", user_id),
+    }
+
+def measure(case, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        case()
+        timings.append(time.perf_counter() - started)
+
+    # Separate run so tracemalloc's overhead does not skew the timings
+    tracemalloc.start()
+    case()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'peak_kb': peak / 1024,
+    }
+
+def measure_startup(runs=5):
+    # Wall time from launching the CLI to it exiting at the main menu
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(LIB_DIR, "cli.py")], input="0\n", capture_output=True, text=True)
+        timings.append(time.perf_counter() - started)
+
+    # "import time: self [us] | cumulative | package" lines from python -X importtime
+    trace = subprocess.run([sys.executable, "-X", "importtime", "-c", "import cli"],
+                           cwd=LIB_DIR, capture_output=True, text=True).stderr
+    imports = []
+    for line in trace.splitlines():
+        if line.startswith("import time:") and "self [us]" not in line:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|")
+            imports.append((int(cumulative_us), int(self_us), name.strip()))
+
+    return {
+        'seconds_min': min(timings),
+        'seconds_median': statistics.median(timings),
+        'import_ms': sum(self_us for _, self_us, _ in imports) / 1000,
+        'slowest_imports': [(name, cumulative_us / 1000) for cumulative_us, _, name in sorted(imports, reverse=True)[:5]],
+    }
+
+def run_startup_benchmark():
+    result = measure_startup()
+    median_ms = result['seconds_median'] * 1000
+    print("\n--- CLI Startup ---")
+    print(f"Launch to exit: {median_ms:.1f} ms (target {STARTUP_TARGET_MS} ms)")
+    print(f"Module imports: {result['import_ms']:.1f} ms")
+    for name, ms in result['slowest_imports']:
+        print(f"  {name:<40} {ms:>8.1f} ms")
+    return median_ms <= STARTUP_TARGET_MS
+
+def run_read_benchmark(rows=100000, repeat=3):
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    user_id = generate_dataset(1, SUITE_CATEGORIES, rows)[0]
+
+    def orm_objects():
+        with session_scope() as session:
+            return session.query(Transaction).filter_by(user_id=user_id).all()
+
+    def slim_records():
+        with session_scope() as session:
+            return fetch_records(session, TransactionRecord, select_records(TransactionRecord).where(Transaction.user_id == user_id))
+
+    print(f"\n--- Listing {rows} transactions ---")
+    print(f"{'read path':<16} {'median ms':>10} {'us/row':>8} {'peak KB':>10} {'bytes/row':>10}")
+    results = {}
+    for name, case in (('ORM objects', orm_objects), ('slim records', slim_records)):
+        result = results[name] = measure(case, repeat)
+        print(f"{name:<16} {result['seconds_median'] * 1000:>10.1f} {result['seconds_median'] * 1e6 / rows:>8.2f} "
+              f"{result['peak_kb']:>10.0f} {result['peak_kb'] * 1024 / rows:>10.0f}")
+    engine.dispose()
+    return results
+
+def run_export_benchmark(sizes=None, repeat=1):
+    # Peak memory should stay flat as the history grows: rows stream through in batches
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+
+    print("\n--- Streaming export ---")
+    print(f"{'rows':>9} {'file':<22} {'median ms':>10} {'rows/sec':>10} {'peak KB':>9} {'file KB':>9}")
+    results = []
+    for rows in sizes or [10000, 100000]:
+        user_id = generate_dataset(1, SUITE_CATEGORIES, rows)[0]
+        for name in ('export.csv', 'export.jsonl.gz'):
+            path = os.path.join(directory, name)
+            result = dict(measure(lambda: ExportHelper.export_file(path, user_id), repeat), rows=rows, file=name)
+            result['bytes'] = os.path.getsize(path)
+            results.append(result)
+            print(f"{rows:>9} {name:<22} {result['seconds_median'] * 1000:>10.0f} {rows / result['seconds_median']:>10.0f} "
+                  f"{result['peak_kb']:>9.0f} {result['bytes'] / 1024:>9.0f}")
+    engine.dispose()
+    return results
+
+def run_recurring_benchmark(users=2000, rules_per_user=3, months=12):
+    # Catch-up after a long outage: every rule starts <months> ago and nothing has run yet
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    user_ids = generate_dataset(users, 3, 0)
+    start = datetime.now() - timedelta(days=months * 365 // 12)
+    kinds = [('Salary', TransactionType.INCOME, RecurringFrequency.MONTHLY),
+             ('Rent', TransactionType.EXPENSE, RecurringFrequency.MONTHLY),
+             ('Gym', TransactionType.EXPENSE, RecurringFrequency.WEEKLY)]
+    with session_scope() as session:
+        session.execute(sqlalchemy.insert(RecurringRule), [
+            {'user_id': user_id, 'description': name, 'amount_cents': 1000 + i, 'transaction_type': trans_type,
+             'frequency': frequency, 'interval': 1, 'start_date': start, 'occurrences': 0, 'next_run': start}
+            for user_id in user_ids
+            for i, (name, trans_type, frequency) in enumerate(kinds[i % len(kinds)] for i in range(rules_per_user))
+        ])
+
+    print(f"\n--- Recurring catch-up: {users} users x {rules_per_user} rules, {months} months behind ---")
+    for label in ("catch-up run", "repeat run"):
+        report, msg = RecurringHelper.run_due()
+        print(f"{label:<13} {msg} in {report['seconds']:.2f}s "
+              f"({report['created'] / report['seconds'] if report['seconds'] else 0:.0f} rows/sec)")
+    drift = RollupHelper.verify() + RollupHelper.verify_balances()
+    print(f"Rollups and balances {'match' if not drift else f'drifted in {len(drift)} places'}")
+    engine.dispose()
+    return report
+
+def bench_write_mode(mode, user_ids, writes, threads, queue=None):
+    # Every mode makes the same calls; only how they reach the database differs
+    def create(i):
+        user_id = user_ids[i % len(user_ids)]
+        if mode == 'per-row':
+            return TransactionHelper.create_transaction(5 + i % 50, "expense", f"write {i}", user_id)
+        return queue.submit(5 + i % 50, "expense", f"write {i}", user_id).result()
+
+    def submit_only(i):
+        return queue.submit(5 + i % 50, "expense", f"write {i}", user_ids[i % len(user_ids)])
+
+    latencies = []
+    started = time.perf_counter()
+    if mode == 'queued':
+        # Fire and forget, then one flush: how fast callers get control back
+        for i in range(writes):
+            latencies.append(timed(submit_only, i))
+        queue.flush()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(lambda i: timed(create, i), range(writes)))
+    return summarize(f"{mode} x{threads if mode != 'queued' else 1}", latencies, time.perf_counter() - started)
+
+def run_writebehind_benchmark(writes=2000, threads=8, users=10, profiles=('balanced', 'durable')):
+    results = []
+    for profile in profiles:
+        directory = tempfile.mkdtemp(prefix="finance_bench_")
+        engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", profile)
+        Base.metadata.create_all(engine)
+        user_ids = generate_dataset(users, 3, 0)
+        print(f"\n--- create_transaction: per-row commits vs. write-behind ({profile}, {writes} writes) ---")
+        print(f"{'mode':<16} {'rows/sec':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        results.append(dict(bench_write_mode('per-row', user_ids, writes, 1), profile=profile))
+        results.append(dict(bench_write_mode('per-row', user_ids, writes, threads), profile=profile))
+        for mode, workers in (('confirmed', threads), ('confirmed', threads * 8), ('queued', 1)):
+            queue = WriteBehindQueue().start()
+            result = bench_write_mode(mode, user_ids, writes, workers, queue)
+            queue.close()
+            stats = queue.stats()
+            batches = stats['batches']
+            print(f"{'':<16} {batches} commits, {stats['written'] / max(batches, 1):.0f} rows per commit")
+            results.append(dict(result, profile=profile, commits=batches))
+        drift = RollupHelper.verify() + RollupHelper.verify_balances()
+        print(f"Rollups and balances {'match' if not drift else f'drifted in {len(drift)} places'}")
+        engine.dispose()
+    return results
+
+def run_category_benchmark(rows=1000000, categories=300, repeat=3):
+    # One account with a long history spread over hundreds of categories
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    user_id = generate_dataset(1, categories, rows)[0]
+    month = sqlalchemy.func.strftime("%Y-%m", Transaction.created_at)
+    raw = sqlalchemy.select(month, Transaction.category_id, Transaction.transaction_type,
+                            sqlalchemy.func.sum(Transaction.amount_cents), sqlalchemy.func.count(Transaction.id)) \
+        .where(Transaction.user_id == user_id).group_by(month, Transaction.category_id, Transaction.transaction_type)
+
+    def raw_group_by():
+        with session_scope() as session:
+            session.execute(raw).all()
+
+    def category_report(top=None):
+        report_cache.clear()
+        TransactionHelper.get_category_report(user_id, top=top)
+
+    print(f"\n--- Category breakdown: {rows} rows, {categories} categories ---")
+    for name, case in (('GROUP BY transactions', raw_group_by),
+                       ('get_category_report', category_report),
+                       ('get_category_report top 10', lambda: category_report(10))):
+        print(f"{name:<28} {statistics.median(timed(case) for _ in range(repeat)):>10.1f} ms")
+
+    # Recategorize every "Coffee Shop" row, then put them back: rollups and balances move both ways
+    with session_scope() as session:
+        target = session.query(Category.name).filter_by(user_id=user_id).order_by(Category.id).first()[0]
+    started = time.perf_counter()
+    moved, msg = TransactionHelper.categorize(user_id, target, match="coffee shop")
+    seconds = time.perf_counter() - started
+    print(f"{'categorize (match)':<28} {seconds * 1000:>10.1f} ms  {msg} ({moved / seconds if seconds else 0:.0f} rows/sec)")
+    drift = RollupHelper.verify(user_id) + RollupHelper.verify_balances(user_id)
+    print(f"Rollups and balances {'match' if not drift else f'drifted in {len(drift)} places'}")
+    engine.dispose()
+
+def orm_delete_user(user_id):
+    # How accounts used to go: every transaction loaded and deleted as its own statement
+    with session_scope() as session:
+        for transaction in session.query(Transaction).filter_by(user_id=user_id).all():
+            session.delete(transaction)
+        session.flush()
+        session.delete(session.get(User, user_id))
+    report_cache.invalidate_user(user_id)
+    return True, "User deleted successfully"
+
+def run_delete_benchmark(rows=200000, categories=20, chunk_size=1000):
+    # Delete one big account while another user keeps writing, once per strategy
+    strategies = [('per-row ORM', orm_delete_user),
+                  ('ON DELETE CASCADE', UserHelper.delete_user),
+                  (f'chunked x{chunk_size}', lambda user_id: PurgeHelper.purge_user(user_id, chunk_size))]
+    print(f"\n--- Deleting an account with {rows} transactions, one concurrent writer ---")
+    print(f"{'strategy':<20} {'seconds':>10} {'peak MB':>10} {'writes':>8} {'writer p50':>11} {'writer max':>11}")
+    results = []
+    for name, strategy in strategies:
+        directory = tempfile.mkdtemp(prefix="finance_bench_")
+        engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        doomed, writer = generate_dataset(2, categories, rows)
+
+        latencies, stop = [], threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                latencies.append(timed(TransactionHelper.create_transaction, 5, "expense", f"during delete {i}", writer))
+                i += 1
+        thread = threading.Thread(target=write)
+        tracemalloc.start()
+        thread.start()
+        started = time.perf_counter()
+        strategy(doomed)
+        seconds = time.perf_counter() - started
+        stop.set()
+        thread.join()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        with session_scope() as session:
+            left = session.query(Transaction).filter_by(user_id=doomed).count()
+        print(f"{name:<20} {seconds:>10.2f} {peak:>10.1f} {len(latencies):>8} "
+              f"{percentile(latencies, 50):>9.1f}ms {max(latencies or [0]):>9.1f}ms"
+              f"{'' if not left else f'  ({left} rows left)'}")
+        results.append({'strategy': name, 'seconds': seconds, 'peak_mb': peak,
+                        'writer_max_ms': max(latencies or [0]), 'rows_left': left})
+        engine.dispose()
+    return results
+
+LOGIN_COSTS = [('pbkdf2_sha256', 100000), ('pbkdf2_sha256', 300000), ('pbkdf2_sha256', 600000),
+               ('scrypt', 2 ** 14), ('scrypt', 2 ** 15)]
+
+def run_login_benchmark(logins=200, threads=8, users=20):
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    defaults = auth.PASSWORD_KDF, auth.PBKDF2_ITERATIONS, auth.SCRYPT_N
+
+    print(f"\n--- Login throughput: {logins} logins over {users} users, serial and {threads} threads ---")
+    print(f"{'kdf':<14} {'cost':>8} {'serial/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'threads/s':>10} {'p99 ms':>8}")
+    results = []
+    try:
+        for number, (kdf, cost) in enumerate(LOGIN_COSTS):
+            auth.PASSWORD_KDF = kdf
+            if kdf == 'scrypt':
+                auth.SCRYPT_N = cost
+            else:
+                auth.PBKDF2_ITERATIONS = cost
+            emails = [f"login{number}-{i}@example.com" for i in range(users)]
+            for email in emails:
+                UserHelper.create_user("Bench", email, "bench-password")
+            attempts = [emails[i % users] for i in range(logins)]
+
+            started = time.perf_counter()
+            serial = [timed(UserHelper.login_user, email, "bench-password") for email in attempts]
+            serial_seconds = time.perf_counter() - started
+
+            # hashlib releases the GIL while hashing, so on several cores logins overlap across threads
+            started = time.perf_counter()
+            with ThreadPoolExecutor(threads) as pool:
+                threaded = list(pool.map(lambda email: timed(UserHelper.login_user, email, "bench-password"), attempts))
+            threaded_seconds = time.perf_counter() - started
+
+            result = {
+                'kdf': kdf, 'cost': cost,
+                'serial_per_sec': logins / serial_seconds, 'serial_p50_ms': statistics.median(serial),
+                'serial_p99_ms': percentile(serial, 99),
+                'threaded_per_sec': logins / threaded_seconds, 'threaded_p99_ms': percentile(threaded, 99),
+            }
+            results.append(result)
+            print(f"{kdf:<14} {cost:>8} {result['serial_per_sec']:>9.1f} {result['serial_p50_ms']:>8.2f} "
+                  f"{result['serial_p99_ms']:>8.2f} {result['threaded_per_sec']:>10.1f} {result['threaded_p99_ms']:>8.2f}")
+
+        # Past the failure limit an attempt is refused before any hashing or query
+        email = "throttled@example.com"
+        for _ in range(auth.login_throttle.max_failures):
+            UserHelper.login_user(email, "wrong")
+        refused = [timed(UserHelper.login_user, email, "wrong") for _ in range(1000)]
+        print(f"\nThrottled attempt after {auth.login_throttle.max_failures} failures: "
+              f"p50 {statistics.median(refused) * 1000:.1f} us")
+        auth.login_throttle.reset(email)
+        auth.last_logins.flush()
+    finally:
+        auth.PASSWORD_KDF, auth.PBKDF2_ITERATIONS, auth.SCRYPT_N = defaults
+        engine.dispose()
+    return results
+
+def workload(user_ids, requests_per_user):
+    # One write for every four reads, interleaved across users
+    operations = []
+    for i in range(requests_per_user):
+        for user_id in user_ids:
+            kind = ('create', 'page', 'totals', 'report', 'page')[i % 5]
+            operations.append((kind, user_id, i))
+    return operations
+
+def run_sync_operation(kind, user_id, i):
+    if kind == 'create':
+        return TransactionHelper.create_transaction(5 + i % 50, "expense", f"bench {i}", user_id)
+    if kind == 'page':
+        return TransactionHelper.get_transactions_page(user_id, 20)
+    if kind == 'totals':
+        return TransactionHelper.get_transaction_totals(user_id)
+    return TransactionHelper.get_monthly_report(user_id, start_date=datetime(2000, 1, 1))
+
+def timed(function, *args):
+    started = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - started) * 1000
+
+def summarize(name, latencies, seconds, loop_lag_ms=None):
+    result = {
+        'mode': name,
+        'requests': len(latencies),
+        'requests_per_sec': len(latencies) / seconds,
+        'p50_ms': statistics.median(latencies),
+        'p99_ms': percentile(latencies, 99),
+        'loop_lag_ms': loop_lag_ms,
+    }
+    lag = "" if loop_lag_ms is None else f" {loop_lag_ms:>12.1f}"
+    print(f"{name:<16} {result['requests_per_sec']:>10.0f} {result['p50_ms']:>10.2f} {result['p99_ms']:>10.2f}{lag}")
+    return result
+
+async def run_async_workload(operations, concurrency):
+    from async_helpers import AsyncTransactionHelper, dispose_async_engine
+
+    async def run_operation(kind, user_id, i):
+        if kind == 'create':
+            return await AsyncTransactionHelper.create_transaction(5 + i % 50, "expense", f"bench {i}", user_id)
+        if kind == 'page':
+            return await AsyncTransactionHelper.get_transactions_page(user_id, 20)
+        if kind == 'totals':
+            return await AsyncTransactionHelper.get_transaction_totals(user_id)
+        return await AsyncTransactionHelper.get_monthly_report(user_id, start_date=datetime(2000, 1, 1))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed_operation(operation):
+        async with semaphore:
+            started = time.perf_counter()
+            await run_operation(*operation)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # A ticker that should wake every 10 ms; how late it runs shows whether anything blocks the loop
+    lag = [0.0]
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag[0] = max(lag[0], (time.perf_counter() - started - 0.01) * 1000)
+
+    monitor = asyncio.ensure_future(ticker())
+    started = time.perf_counter()
+    await asyncio.gather(*(timed_operation(operation) for operation in operations))
+    seconds = time.perf_counter() - started
+    done.set()
+    await monitor
+    await dispose_async_engine()
+    return latencies, seconds, lag[0]
+
+def run_async_benchmark(users=20, requests_per_user=50, concurrency=20, rows_per_user=1000):
+    import async_helpers
+
+    directory = tempfile.mkdtemp(prefix="finance_bench_")
+    url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+    engine = configure_engine(url, pool_size=concurrency)
+    Base.metadata.create_all(engine)
+    user_ids = generate_dataset(users, 5, rows_per_user)
+    operations = workload(user_ids, requests_per_user)
+
+    print(f"\n--- {len(operations)} requests from {users} users, concurrency {concurrency} ---")
+    print(f"{'mode':<16} {'req/sec':>10} {'p50 ms':>10} {'p99 ms':>10} {'max loop lag':>12}")
+    results = []
+
+    started = time.perf_counter()
+    latencies = [timed(run_sync_operation, *operation) for operation in operations]
+    results.append(summarize("sync serial", latencies, time.perf_counter() - started))
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        started = time.perf_counter()
+        latencies = list(pool.map(lambda operation: timed(run_sync_operation, *operation), operations))
+        results.append(summarize("sync threads", latencies, time.perf_counter() - started))
+    engine.dispose()
+
+    async def run_async():
+        await async_helpers.configure_async_engine(url, pool_size=concurrency)
+        return await run_async_workload(operations, concurrency)
+
+    latencies, seconds, lag = asyncio.run(run_async())
+    results.append(summarize("async", latencies, seconds, lag))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def run_suite(sizes=None, output=None, repeat=3):
+    startup = measure_startup()
+    results = [dict(helper='cli startup', size=0, seconds_min=startup['seconds_min'],
+                    seconds_median=startup['seconds_median'], import_ms=startup['import_ms'])]
+    print(f"{'cli startup':<34} {startup['seconds_median'] * 1000:>10.2f} ms")
+    for size in sizes or DEFAULT_SIZES:
+        directory = tempfile.mkdtemp(prefix="finance_bench_")
+        engine = configure_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(engine)
+        user_ids = generate_dataset(SUITE_USERS, SUITE_CATEGORIES, max(1, size // SUITE_USERS))
+
+        # Every user has the same volume; time one of them
+        print(f"\n--- {size} rows ({size // SUITE_USERS} per user) ---")
+        for name, case in suite_cases(user_ids[0]).items():
+            result = dict(measure(case, repeat), helper=name, size=size)
+            results.append(result)
+            print(f"{name:<34} {result['seconds_median'] * 1000:>10.2f} ms {result['peak_kb']:>12.0f} KB peak")
+        engine.dispose()
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'sqlalchemy': sqlalchemy.__version__,
+        'results': results,
+    }
+    if output:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {output}")
+    return report
+
+def compare_results(baseline_path, current_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(current_path) as f:
+        current = json.load(f)
+
+    previous = {(r['helper'], r['size']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\n--- {baseline.get('commit')} -> {current.get('commit')} ---")
+    for r in current['results']:
+        before = previous.get((r['helper'], r['size']))
+        if not before:
+            continue
+        ratio = r['seconds_median'] / before['seconds_median'] if before['seconds_median'] else 1.0
+        flag = "REGRESSION" if ratio > REGRESSION_THRESHOLD else ""
+        regressions += bool(flag)
+        print(f"{r['helper']:<34} {r['size']:>8} {before['seconds_median'] * 1000:>10.2f} ms -> "
+              f"{r['seconds_median'] * 1000:>10.2f} ms ({ratio:.2f}x) {flag}")
+    return regressions
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "sqlite":
+        run_sqlite_benchmark(sys.argv[3:] or None, int(sys.argv[2]) if len(sys.argv) > 2 else 500)
+    elif len(sys.argv) > 1 and sys.argv[1] == "startup":
+        sys.exit(0 if run_startup_benchmark() else 1)
+    elif len(sys.argv) > 1 and sys.argv[1] == "reads":
+        run_read_benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100000)
+    elif len(sys.argv) > 1 and sys.argv[1] == "export":
+        run_export_benchmark([int(arg) for arg in sys.argv[2:]] or None)
+    elif len(sys.argv) > 1 and sys.argv[1] == "recurring":
+        run_recurring_benchmark(*[int(arg) for arg in sys.argv[2:5]])
+    elif len(sys.argv) > 1 and sys.argv[1] == "categories":
+        run_category_benchmark(*[int(arg) for arg in sys.argv[2:4]])
+    elif len(sys.argv) > 1 and sys.argv[1] == "writebehind":
+        run_writebehind_benchmark(*[int(arg) for arg in sys.argv[2:5]])
+    elif len(sys.argv) > 1 and sys.argv[1] == "delete":
+        run_delete_benchmark(*[int(arg) for arg in sys.argv[2:5]])
+    elif len(sys.argv) > 1 and sys.argv[1] == "login":
+        run_login_benchmark(*[int(arg) for arg in sys.argv[2:5]])
+    elif len(sys.argv) > 1 and sys.argv[1] == "async":
+        run_async_benchmark(*[int(arg) for arg in sys.argv[2:5]])
+    elif len(sys.argv) > 2 and sys.argv[1] == "suite":
+        run_suite([int(size) for size in sys.argv[3:]] or None, sys.argv[2])
+    elif len(sys.argv) == 4 and sys.argv[1] == "compare":
+        sys.exit(1 if compare_results(sys.argv[2], sys.argv[3]) else 0)
+    else:
+        print("Usage: python bench.py sqlite [writes] [profile ...]")
+        print("       python bench.py startup")
+        print("       python bench.py reads [rows]")
+        print("       python bench.py export [rows ...]")
+        print("       python bench.py recurring [users] [rules per user] [months behind]")
+        print("       python bench.py categories [rows] [categories]")
+        print("       python bench.py writebehind [writes] [threads] [users]")
+        print("       python bench.py delete [rows] [categories] [chunk size]")
+        print("       python bench.py login [logins] [threads] [users]")
+        print("       python bench.py async [users] [requests per user] [concurrency]")
+        print("       python bench.py suite <output.json> [rows ...]")
+        print("       python bench.py compare <baseline.json> <current.json>")
@@ -0,0 +1,146 @@
+from datetime import datetime
+from sqlalchemy import func, or_
+from db.models import Budget, Category, MonthlyRollup, TransactionType, session_scope
+from money import to_cents, from_cents
+from rollups import MONTH_FORMAT
+
+class BudgetHelper:
+    @staticmethod
+    def set_budget(user_id, limit, category_name=None, month=None):
+        try:
+            month = month or datetime.now().strftime(MONTH_FORMAT)
+            try:
+                datetime.strptime(month, MONTH_FORMAT)
+            except ValueError:
+                return None, f"Invalid month '{month}'. Use YYYY-MM."
+            limit_cents = to_cents(limit)
+            if limit_cents <= 0:
+                return None, "Budget must be > 0"
+
+            with session_scope() as session:
+                category_id = None
+                if category_name:
+                    category = session.query(Category).filter_by(name=category_name, user_id=user_id).first()
+                    if not category:
+                        return None, "Category not found"
+                    category_id = category.id
+
+                budget = session.query(Budget).filter_by(user_id=user_id, month=month, category_id=category_id).first()
+                if budget:
+                    budget.limit_cents = limit_cents
+                else:
+                    budget = Budget(user_id=user_id, month=month, category_id=category_id, limit_cents=limit_cents)
+                    session.add(budget)
+            return budget, "Budget saved"
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    def delete_budget(user_id, category_name=None, month=None):
+        try:
+            month = month or datetime.now().strftime(MONTH_FORMAT)
+            with session_scope() as session:
+                query = session.query(Budget).filter_by(user_id=user_id, month=month)
+                if category_name:
+                    query = query.join(Category, Category.id == Budget.category_id).filter(Category.name == category_name)
+                else:
+                    query = query.filter(Budget.category_id.is_(None))
+                budget = query.first()
+                if not budget:
+                    return False, "Budget not found"
+                session.delete(budget)
+            return True, "Budget deleted"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    @staticmethod
+    def _spent_cents(session, user_id, month, category_id):
+        # Read from the monthly rollups: one row per category, however long the history
+        query = session.query(func.coalesce(func.sum(MonthlyRollup.total_cents), 0)).filter(
+            MonthlyRollup.user_id == user_id,
+            MonthlyRollup.month == month,
+            MonthlyRollup.transaction_type == TransactionType.EXPENSE
+        )
+        if category_id is not None:
+            query = query.filter(MonthlyRollup.category_id == category_id)
+        return query.scalar()
+
+    @staticmethod
+    def _status(session, budget, category_name):
+        spent = BudgetHelper._spent_cents(session, budget.user_id, budget.month, budget.category_id)
+        return {
+            'month': budget.month,
+            'category': category_name,
+            'limit': from_cents(budget.limit_cents),
+            'spent': from_cents(spent),
+            'remaining': from_cents(budget.limit_cents - spent),
+            'over': spent > budget.limit_cents,
+        }
+
+    @staticmethod
+    def get_budget_status(user_id, month=None):
+        month = month or datetime.now().strftime(MONTH_FORMAT)
+        with session_scope() as session:
+            budgets = session.query(Budget, Category.name).outerjoin(Category, Category.id == Budget.category_id) \
+                .filter(Budget.user_id == user_id, Budget.month == month).order_by(Category.name).all()
+            return [BudgetHelper._status(session, budget, name) for budget, name in budgets]
+
+    @staticmethod
+    def check(session, transaction):
+        # Called by create_transaction after the rollups include the new row
+        if transaction.transaction_type != TransactionType.EXPENSE:
+            return []
+        month = transaction.created_at.strftime(MONTH_FORMAT)
+        budgets = session.query(Budget, Category.name).outerjoin(Category, Category.id == Budget.category_id).filter(
+            Budget.user_id == transaction.user_id,
+            Budget.month == month,
+            or_(Budget.category_id.is_(None), Budget.category_id == transaction.category_id)
+        ).all()
+
+        alerts = []
+        for budget, name in budgets:
+            status = BudgetHelper._status(session, budget, name)
+            if status['over']:
+                alerts.append(f"Over budget for {name or 'all expenses'} in {month}: "
+                              f"spent ${status['spent']:.2f} of ${status['limit']:.2f}")
+        return alerts
+
+    @staticmethod
+    def check_many(session, transactions):
+        # check() for a whole batch: one budget lookup and one spend query per budget.
+        # The rollups already hold the whole batch, so each row is judged against the
+        # spend as it stood right after that row, the same as committing them one by one
+        expenses = [t for t in transactions if t.transaction_type == TransactionType.EXPENSE]
+        budgets = {}
+        if expenses:
+            months = {t.created_at.strftime(MONTH_FORMAT) for t in expenses}
+            user_ids = sorted({t.user_id for t in expenses})
+            for i in range(0, len(user_ids), 500):
+                for budget, name in session.query(Budget, Category.name).outerjoin(Category, Category.id == Budget.category_id) \
+                        .filter(Budget.user_id.in_(user_ids[i:i + 500]), Budget.month.in_(months)).all():
+                    budgets.setdefault((budget.user_id, budget.month), []).append((budget, name))
+
+        def covering(transaction):
+            month = transaction.created_at.strftime(MONTH_FORMAT)
+            return [(budget, name, month) for budget, name in budgets.get((transaction.user_id, month), [])
+                    if budget.category_id is None or budget.category_id == transaction.category_id]
+
+        # Start each budget at its spend before the batch, then add the rows back in order
+        spent = {}
+        for transaction in expenses:
+            for budget, _, _ in covering(transaction):
+                if budget.id not in spent:
+                    spent[budget.id] = BudgetHelper._spent_cents(session, budget.user_id, budget.month, budget.category_id)
+                spent[budget.id] -= transaction.amount_cents
+
+        results = []
+        for transaction in transactions:
+            alerts = []
+            if transaction.transaction_type == TransactionType.EXPENSE:
+                for budget, name, month in covering(transaction):
+                    spent[budget.id] += transaction.amount_cents
+                    if spent[budget.id] > budget.limit_cents:
+                        alerts.append(f"Over budget for {name or 'all expenses'} in {month}: "
+                                      f"spent ${from_cents(spent[budget.id]):.2f} of ${budget.limit:.2f}")
+            results.append(alerts)
+        return results
@@ -0,0 +1,127 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = int(os.environ.get('FINANCE_TRACKER_REPORT_CACHE_BYTES', 16 * 1024 * 1024))
+
+def estimate_size(value, limit=None):
+    # Rough deep size: containers plus everything they hold, each object counted once.
+    # Stops early once past limit, since huge reports are not cached anyway.
+    seen = set()
+    stack = [value]
+    size = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if limit is not None and size > limit:
+            break
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return size
+
+def copy_report(value):
+    # Reports are plain dicts and lists over immutable leaves; copying just the containers
+    # keeps callers that edit a report from editing the cached one
+    if isinstance(value, dict):
+        return {key: copy_report(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_report(item) for item in value]
+    return value
+
+class ReportCache:
+    # LRU over (user_id, report key), bounded by the estimated size of the cached reports
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.user_keys = {}
+        # Bumped by every invalidation: a report computed across one must not be cached
+        self.generations = {}
+        self.epoch = 0
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+        self.lock = threading.Lock()
+
+    def get(self, user_id, key):
+        with self.lock:
+            entry = self.entries.get((user_id, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end((user_id, key))
+            self.hits += 1
+            return copy_report(entry[0])
+
+    def generation(self, user_id):
+        # Take this on a miss, before reading, and hand it back to put
+        with self.lock:
+            return self.epoch, self.generations.get(user_id, 0)
+
+    def put(self, user_id, key, value, generation=None):
+        value = copy_report(value)
+        size = estimate_size(value, self.max_bytes)
+        with self.lock:
+            if generation is not None and generation != (self.epoch, self.generations.get(user_id, 0)):
+                # Written to since the read began, so this report may already be stale
+                return
+            self._discard((user_id, key))
+            if size > self.max_bytes:
+                # Caching it would flush everything else and still not fit
+                return
+            self.entries[(user_id, key)] = (value, size)
+            self.user_keys.setdefault(user_id, set()).add(key)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self.lock:
+            self.generations[user_id] = self.generations.get(user_id, 0) + 1
+            for key in list(self.user_keys.get(user_id, ())):
+                self._discard((user_id, key))
+                self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.user_keys.clear()
+            self.generations.clear()
+            self.epoch += 1
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _discard(self, entry_key):
+        entry = self.entries.pop(entry_key, None)
+        if entry is None:
+            return
+        self.bytes -= entry[1]
+        user_id, key = entry_key
+        keys = self.user_keys.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.user_keys[user_id]
+
+# Shared by every helper in the process
+report_cache = ReportCache()
@@ -1,9 +1,12 @@
-from helpers import UserHelper, CategoryHelper, TransactionHelper, DisplayHelper, get_valid_input, validate_email, validate_transaction_type
+# helpers (and with it SQLAlchemy and the database engine) is imported by each
+# menu on first use, so the main menu prints without paying for it
 
 current_user = None
+PAGE_SIZE = 20
 
 def user_menu():
     global current_user
+    from helpers import UserHelper, DisplayHelper, get_valid_input, validate_email
     while True:
         print("\n=== USER MENU ===")
         print("1. Create Account")
@@ -49,7 +52,7 @@ def user_menu():
             if current_user:
                 confirm = input("Are you sure you want to delete your account? (yes/no): ")
                 if confirm.lower() == "yes":
-                    success, msg = UserHelper.delete_user(current_user.user_id)
+                    success, msg = UserHelper.delete_user(current_user.id)
                     print(msg)
                     if success:
                         current_user = None
@@ -66,6 +69,7 @@ def user_menu():
             print("Invalid choice.")
 
 def category_menu():
+    from helpers import CategoryHelper, DisplayHelper, get_valid_input
     while True:
         print("\n=== CATEGORY MENU ===")
         print("1. Create Category")
@@ -79,14 +83,14 @@ def category_menu():
         if choice == "1":
             if current_user:
                 name = get_valid_input("Enter category name: ")
-                category, msg = CategoryHelper.create_category(name, current_user.user_id)
+                category, msg = CategoryHelper.create_category(name, current_user.id)
                 print(msg)
             else:
                 print("You need to log in first.")
 
         elif choice == "2":
             if current_user:
-                categories = CategoryHelper.get_user_categories(current_user.user_id)
+                categories = CategoryHelper.get_user_categories(current_user.id)
                 DisplayHelper.display_categories(categories)
             else:
                 print("You need to log in first.")
@@ -94,7 +98,7 @@ def category_menu():
         elif choice == "3":
             if current_user:
                 name = get_valid_input("Enter category name: ")
-                category = CategoryHelper.find_category_by_name(name, current_user.user_id)
+                category = CategoryHelper.find_category_by_name(name, current_user.id)
                 if category:
                     print(f"Found: {category.name}")
                 else:
@@ -105,7 +109,7 @@ def category_menu():
         elif choice == "4":
             if current_user:
                 name = get_valid_input("Enter category name to delete: ")
-                success, msg = CategoryHelper.delete_category(name, current_user.user_id)
+                success, msg = CategoryHelper.delete_category(name, current_user.id)
                 print(msg)
             else:
                 print("You need to log in first.")
@@ -115,7 +119,44 @@ def category_menu():
         else:
             print("Invalid choice.")
 
+def page_transactions(user_id):
+    from helpers import TransactionHelper, DisplayHelper
+    totals = TransactionHelper.get_transaction_totals(user_id)
+    DisplayHelper.display_transaction_totals(totals)
+    if not totals['count']:
+        return
+
+    cursor = None
+    page_number = 1
+    while True:
+        transactions, cursor = TransactionHelper.get_transactions_page(user_id, PAGE_SIZE, cursor)
+        DisplayHelper.display_transaction_page(transactions, page_number)
+        if not cursor:
+            break
+        if input("Press Enter for the next page or 'q' to stop: ").strip().lower() == "q":
+            break
+        page_number += 1
+
+def search_transactions(user_id, query):
+    from helpers import DisplayHelper
+    from search import SearchHelper
+
+    page = 1
+    while True:
+        results, has_more = SearchHelper.search(user_id, query, page=page, page_size=PAGE_SIZE)
+        DisplayHelper.display_search_results(results, page, has_more)
+        if not has_more:
+            break
+        if input("Press Enter for the next page or 'q' to stop: ").strip().lower() == "q":
+            break
+        page += 1
+
 def transaction_menu():
+    from helpers import UserHelper, TransactionHelper, DisplayHelper, get_valid_input, validate_transaction_type
+    from importer import ImportHelper
+    from exporter import ExportHelper
+    from budgets import BudgetHelper
+    from recurring import RecurringHelper
     while True:
         print("\n=== TRANSACTIONS MENU ===")
         print("1. Create Transaction")
@@ -124,6 +165,14 @@ def transaction_menu():
         print("4. Delete Transaction")
         print("5. View Monthly Summary Report")
         print("6. View Detailed Monthly Report")
+        print("7. Import Statement (CSV/OFX/QIF)")
+        print("8. Search Transactions")
+        print("9. View Balances and Budgets")
+        print("10. Set Monthly Budget")
+        print("11. Export Transactions (CSV/JSONL/Parquet)")
+        print("12. Add Recurring Transaction")
+        print("13. Categorize Transactions")
+        print("14. View Category Breakdown")
         print("0. Back to Main Menu")
 
         choice = input("Select an option: ")
@@ -133,22 +182,23 @@ def transaction_menu():
                 amount = get_valid_input("Enter amount: ", float)
                 transaction_type = get_valid_input("Enter type (income/expense): ", validation_func=validate_transaction_type)
                 description = get_valid_input("Enter description: ")
-                transaction, msg = TransactionHelper.create_transaction(amount, transaction_type, description, current_user.user_id)
+                category = input("Category name (leave empty for none): ").strip()
+                transaction, msg = TransactionHelper.create_transaction(amount, transaction_type, description,
+                                                                        current_user.id, category or None)
                 print(msg)
             else:
                 print("You need to log in first.")
 
         elif choice == "2":
             if current_user:
-                transactions = TransactionHelper.get_user_transactions(current_user.user_id)
-                DisplayHelper.display_transactions(transactions)
+                page_transactions(current_user.id)
             else:
                 print("You need to log in first.")
 
         elif choice == "3":
             if current_user:
                 description = get_valid_input("Enter transaction description: ")
-                transaction = TransactionHelper.find_transaction_by_description(description, current_user.user_id)
+                transaction = TransactionHelper.find_transaction_by_description(description, current_user.id)
                 if transaction:
                     print(f"Found: ${transaction.amount} - {transaction.description}")
                 else:
@@ -159,25 +209,101 @@ def transaction_menu():
         elif choice == "4":
             if current_user:
                 description = get_valid_input("Enter transaction description to delete: ")
-                success, msg = TransactionHelper.delete_transaction(description, current_user.user_id)
+                success, msg = TransactionHelper.delete_transaction(description, current_user.id)
                 print(msg)
             else:
                 print("You need to log in first.")
 
         elif choice == "5":
             if current_user:
-                summary = TransactionHelper.get_monthly_report(current_user.user_id)
+                summary = TransactionHelper.get_monthly_report(current_user.id)
                 DisplayHelper.display_summary_report(summary)
             else:
                 print("You need to log in first.")
 
         elif choice == "6":
             if current_user:
-                report = TransactionHelper.get_detailed_monthly_report(current_user.user_id)
+                report = TransactionHelper.get_detailed_monthly_report(current_user.id)
                 DisplayHelper.display_detailed_report(report)
             else:
                 print("You need to log in first.")
 
+        elif choice == "7":
+            if current_user:
+                path = get_valid_input("Enter statement file path: ")
+                report, msg = ImportHelper.import_file(path, current_user.id)
+                print(msg)
+                if report:
+                    DisplayHelper.display_import_report(report)
+            else:
+                print("You need to log in first.")
+
+        elif choice == "8":
+            if current_user:
+                query = get_valid_input("Search for (words match as prefixes, use quotes for a phrase): ")
+                search_transactions(current_user.id, query)
+            else:
+                print("You need to log in first.")
+
+        elif choice == "9":
+            if current_user:
+                DisplayHelper.display_balances(UserHelper.get_balances(current_user.id))
+                DisplayHelper.display_budgets(BudgetHelper.get_budget_status(current_user.id))
+            else:
+                print("You need to log in first.")
+
+        elif choice == "10":
+            if current_user:
+                limit = get_valid_input("Enter monthly limit: ", float)
+                category = input("Category name (leave empty for all expenses): ").strip()
+                month = input("Month YYYY-MM (leave empty for this month): ").strip()
+                budget, msg = BudgetHelper.set_budget(current_user.id, limit, category or None, month or None)
+                print(msg)
+            else:
+                print("You need to log in first.")
+
+        elif choice == "11":
+            if current_user:
+                path = get_valid_input("Enter output file (.csv, .jsonl or .parquet, optionally .gz/.zst): ")
+                report, msg = ExportHelper.export_file(path, current_user.id)
+                print(msg)
+            else:
+                print("You need to log in first.")
+
+        elif choice == "12":
+            if current_user:
+                amount = get_valid_input("Enter amount: ", float)
+                transaction_type = get_valid_input("Enter type (income/expense): ", validation_func=validate_transaction_type)
+                description = get_valid_input("Enter description: ")
+                frequency = input("Repeat (daily/weekly/monthly/yearly, default monthly): ").strip() or "monthly"
+                category = input("Category name (leave empty for none): ").strip()
+                rule, msg = RecurringHelper.create_rule(current_user.id, amount, transaction_type, description,
+                                                        frequency, category_name=category or None)
+                print(msg)
+                if rule:
+                    # Materializes the first occurrence right away
+                    report, msg = RecurringHelper.run_due(user_id=current_user.id)
+                    DisplayHelper.display_recurring_rules(RecurringHelper.get_user_rules(current_user.id))
+            else:
+                print("You need to log in first.")
+
+        elif choice == "13":
+            if current_user:
+                match = get_valid_input("Categorize transactions whose description contains: ")
+                category = input("Category name (leave empty to clear the category): ").strip()
+                moved, msg = TransactionHelper.categorize(current_user.id, category or None, match=match)
+                print(msg)
+            else:
+                print("You need to log in first.")
+
+        elif choice == "14":
+            if current_user:
+                top = input("Show the top N categories (leave empty for all): ").strip()
+                report = TransactionHelper.get_category_report(current_user.id, top=int(top) if top.isdigit() and int(top) > 0 else None)
+                DisplayHelper.display_category_report(report)
+            else:
+                print("You need to log in first.")
+
         elif choice == "0":
             break
         else:
@@ -206,4 +332,10 @@ def main():
             print("Invalid choice.")
 
 if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) > 1:
+        # Non-interactive subcommands, e.g. "cli.py tx list --month 2026-09 --format json"
+        from commands import run
+        sys.exit(run(sys.argv[1:]))
     main()
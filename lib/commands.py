@@ -0,0 +1,549 @@
+import argparse
+import csv
+import json
+import shlex
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from helpers import UserHelper, CategoryHelper, TransactionHelper, DisplayHelper, validate_email
+from importer import ImportHelper, DEFAULT_BATCH_SIZE
+from exporter import ExportHelper, DATASETS, WRITERS, DEFAULT_BATCH_SIZE as EXPORT_BATCH_SIZE
+from search import SearchHelper
+from cache import report_cache
+from budgets import BudgetHelper
+from recurring import RecurringHelper
+from purge import PurgeHelper
+
+LIST_PAGE_SIZE = 500
+
+class CommandError(Exception):
+    pass
+
+class CommandContext:
+    # Replaces the interactive current_user global: one per process or batch stream
+    def __init__(self, out=sys.stdout):
+        self.user = None
+        self.out = out
+
+    def require_user(self):
+        if not self.user:
+            raise CommandError("You need to log in first (use 'login' or --email/--password).")
+        return self.user
+
+def json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def parse_month(month):
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise CommandError(f"Invalid month '{month}'. Use YYYY-MM.")
+    end = datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}'. Use YYYY-MM-DD.")
+
+def transaction_record(t):
+    return {
+        'id': t.id,
+        'amount': t.amount,
+        'type': t.transaction_type.value,
+        'description': t.description,
+        'category_id': t.category_id,
+        'created_at': t.created_at,
+    }
+
+def write_records(ctx, records, fmt, fields):
+    if fmt == "json":
+        json.dump(list(records), ctx.out, default=json_default)
+        ctx.out.write("\n")
+    elif fmt == "csv":
+        writer = csv.DictWriter(ctx.out, fieldnames=fields)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+    else:
+        for record in records:
+            ctx.out.write(" | ".join(str(record[f]) for f in fields) + "\n")
+
+def check(result):
+    value, msg = result
+    if not value:
+        raise CommandError(msg)
+    return value, msg
+
+def cmd_login(ctx, args):
+    ctx.user, msg = check(UserHelper.login_user(args.email, args.password))
+    print(msg, file=ctx.out)
+
+def cmd_logout(ctx, args):
+    ctx.user = None
+    print("Logged out.", file=ctx.out)
+
+def cmd_user_create(ctx, args):
+    if not validate_email(args.email):
+        raise CommandError("Invalid email format.")
+    ctx.user, msg = check(UserHelper.create_user(args.name, args.email, args.password))
+    print(f"{msg}: {ctx.user.user_id}", file=ctx.out)
+
+def cmd_user_info(ctx, args):
+    user = ctx.require_user()
+    if args.format == "json":
+        json.dump(user.to_dict(), ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_user_info(user)
+
+def purge_progress(status):
+    print(f"Deleted {status['deleted']} of {status['total']} transactions", file=sys.stderr)
+
+def purged(job):
+    return check((job.status['success'], job.status['message']))
+
+def cmd_user_delete(ctx, args):
+    user = ctx.require_user()
+    if args.chunk_size:
+        _, msg = purged(PurgeHelper.purge_user(user.id, args.chunk_size, purge_progress))
+    else:
+        _, msg = check(UserHelper.delete_user(user.id))
+    ctx.user = None
+    print(msg, file=ctx.out)
+
+def cmd_category_add(ctx, args):
+    _, msg = check(CategoryHelper.create_category(args.name, ctx.require_user().id))
+    print(msg, file=ctx.out)
+
+def cmd_category_list(ctx, args):
+    categories = CategoryHelper.get_user_categories(ctx.require_user().id)
+    write_records(ctx, (c.to_dict() for c in categories), args.format, ['id', 'name', 'created_at'])
+
+def cmd_category_delete(ctx, args):
+    if args.chunk_size:
+        _, msg = purged(PurgeHelper.purge_category(args.name, ctx.require_user().id, args.chunk_size, purge_progress))
+    else:
+        _, msg = check(CategoryHelper.delete_category(args.name, ctx.require_user().id))
+    print(msg, file=ctx.out)
+
+def cmd_tx_add(ctx, args):
+    if args.amount <= 0:
+        raise CommandError("Amount must be > 0.")
+    transaction, msg = check(TransactionHelper.create_transaction(args.amount, args.type, args.description,
+                                                                  ctx.require_user().id, args.category))
+    headline, _, alerts = msg.partition("\n")
+    print(f"{headline}: {transaction.id}", file=ctx.out)
+    if alerts:
+        print(alerts, file=ctx.out)
+
+def cmd_tx_list(ctx, args):
+    user = ctx.require_user()
+    start_date, end_date = parse_month(args.month) if args.month else (None, None)
+
+    def records():
+        # Walk the keyset pages so long histories never sit in memory at once
+        cursor, remaining = None, args.limit
+        while remaining is None or remaining > 0:
+            page_size = LIST_PAGE_SIZE if remaining is None else min(LIST_PAGE_SIZE, remaining)
+            transactions, cursor = TransactionHelper.get_transactions_page(
+                user.id, page_size, cursor, args.order, start_date, end_date)
+            for t in transactions:
+                yield transaction_record(t)
+            if remaining is not None:
+                remaining -= len(transactions)
+            if not cursor:
+                break
+
+    write_records(ctx, records(), args.format, ['id', 'created_at', 'type', 'amount', 'description', 'category_id'])
+
+def cmd_tx_find(ctx, args):
+    transaction = TransactionHelper.find_transaction_by_description(args.description, ctx.require_user().id)
+    if not transaction:
+        raise CommandError("Transaction not found.")
+    write_records(ctx, [transaction_record(transaction)], args.format, ['id', 'created_at', 'type', 'amount', 'description', 'category_id'])
+
+def cmd_tx_search(ctx, args):
+    results, has_more = SearchHelper.search(
+        ctx.require_user().id, args.query,
+        min_amount=args.min_amount, max_amount=args.max_amount,
+        start_date=parse_date(args.start) if args.start else None,
+        end_date=parse_date(args.end) if args.end else None,
+        page=args.page, page_size=args.page_size)
+    write_records(ctx, (transaction_record(t) for t in results), args.format,
+                  ['id', 'created_at', 'type', 'amount', 'description', 'category_id'])
+    if has_more and args.format == "text":
+        print(f"More matches: rerun with --page {args.page + 1}", file=sys.stderr)
+
+def cmd_tx_delete(ctx, args):
+    _, msg = check(TransactionHelper.delete_transaction(args.description, ctx.require_user().id))
+    print(msg, file=ctx.out)
+
+def cmd_tx_categorize(ctx, args):
+    if not args.category and not args.clear:
+        raise CommandError("Give a category name, or --clear to remove the category.")
+    if not args.ids and not args.match:
+        raise CommandError("Select transactions with --id and/or --match.")
+    moved, msg = TransactionHelper.categorize(ctx.require_user().id, None if args.clear else args.category, args.ids, args.match)
+    if moved is None:
+        raise CommandError(msg)
+    print(msg, file=ctx.out)
+
+def cmd_tx_import(ctx, args):
+    report, msg = ImportHelper.import_file(args.file, ctx.require_user().id, batch_size=args.batch_size, file_format=args.file_format)
+    if report is None:
+        raise CommandError(msg)
+    if msg.startswith("Error"):
+        # A failed import still hands back its report: batches before the failure stay committed
+        raise CommandError(f"{msg} ({report['imported']} transactions imported before it)" if report['imported'] else msg)
+    if args.format == "json":
+        json.dump(dict(report, message=msg), ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        print(msg, file=ctx.out)
+        DisplayHelper.display_import_report(report)
+
+def cmd_tx_export(ctx, args):
+    report, msg = ExportHelper.export_file(args.file, ctx.require_user().id, args.dataset, args.file_format,
+                                           args.compression, args.batch_size)
+    if report is None:
+        raise CommandError(msg)
+    if args.format == "json":
+        json.dump(dict(report, message=msg), ctx.out)
+        ctx.out.write("\n")
+    else:
+        print(f"{msg} ({report['bytes'] / 1024:.0f} KB, {report['rows_per_sec']:.0f} rows/sec)", file=ctx.out)
+
+def cmd_report_summary(ctx, args):
+    start_date = parse_date(args.start) if args.start else None
+    end_date = parse_date(args.end) if args.end else None
+    summary = TransactionHelper.get_monthly_report(ctx.require_user().id, start_date, end_date, args.category_id)
+    if args.format == "json":
+        json.dump(summary, ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_summary_report(summary)
+
+def cmd_report_categories(ctx, args):
+    for month in (args.start, args.end):
+        if month:
+            parse_month(month)
+    report = TransactionHelper.get_category_report(ctx.require_user().id, args.start, args.end, args.top)
+    if args.format == "json":
+        json.dump(report, ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_category_report(report)
+
+def cmd_report_detailed(ctx, args):
+    report = TransactionHelper.get_detailed_monthly_report(ctx.require_user().id)
+    if args.format == "json":
+        json.dump(report, ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_detailed_report(report)
+
+def cmd_report_cache(ctx, args):
+    stats = report_cache.stats()
+    if args.format == "json":
+        json.dump(stats, ctx.out)
+        ctx.out.write("\n")
+    else:
+        print(f"Report cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%}), "
+              f"{stats['entries']} entries, {stats['bytes'] / 1024:.0f} of {stats['max_bytes'] / 1024:.0f} KB, "
+              f"{stats['evictions']} evictions, {stats['invalidations']} invalidations", file=ctx.out)
+
+def cmd_balance(ctx, args):
+    balances = UserHelper.get_balances(ctx.require_user().id)
+    if args.format == "json":
+        json.dump(dict(balances, categories=dict(balances['categories'])), ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_balances(balances)
+
+def cmd_budget_set(ctx, args):
+    _, msg = check(BudgetHelper.set_budget(ctx.require_user().id, args.amount, args.category, args.month))
+    print(msg, file=ctx.out)
+
+def cmd_budget_list(ctx, args):
+    statuses = BudgetHelper.get_budget_status(ctx.require_user().id, args.month)
+    if args.format == "json":
+        json.dump(statuses, ctx.out, default=json_default)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_budgets(statuses)
+
+def cmd_budget_delete(ctx, args):
+    _, msg = check(BudgetHelper.delete_budget(ctx.require_user().id, args.category, args.month))
+    print(msg, file=ctx.out)
+
+def cmd_recurring_add(ctx, args):
+    if args.amount <= 0:
+        raise CommandError("Amount must be > 0.")
+    rule, msg = check(RecurringHelper.create_rule(
+        ctx.require_user().id, args.amount, args.type, args.description, args.every,
+        start_date=parse_date(args.start) if args.start else None, interval=args.interval,
+        end_date=parse_date(args.until) if args.until else None, category_name=args.category))
+    print(f"{msg}: #{rule.id}", file=ctx.out)
+
+def cmd_recurring_list(ctx, args):
+    rules = RecurringHelper.get_user_rules(ctx.require_user().id)
+    if args.format == "json":
+        json.dump([rule.to_dict() for rule in rules], ctx.out)
+        ctx.out.write("\n")
+    else:
+        DisplayHelper.display_recurring_rules(rules)
+
+def cmd_recurring_delete(ctx, args):
+    _, msg = check(RecurringHelper.delete_rule(args.id, ctx.require_user().id))
+    print(msg, file=ctx.out)
+
+def cmd_recurring_run(ctx, args):
+    # Not tied to a login: materializes due occurrences for every user (e.g. from cron)
+    report, msg = RecurringHelper.run_due(parse_date(args.until) if args.until else None)
+    if msg.startswith("Error"):
+        raise CommandError(msg)
+    if args.format == "json":
+        json.dump(dict(report, message=msg), ctx.out)
+        ctx.out.write("\n")
+    else:
+        print(f"{msg} for {report['users']} users in {report['seconds']:.2f}s", file=ctx.out)
+
+def cmd_init(ctx, args):
+    from db.migrate import init_database
+    init_database()
+
+def cmd_batch(ctx, args):
+    try:
+        stream = sys.stdin if args.file == "-" else open(args.file)
+    except OSError as e:
+        raise CommandError(str(e))
+    try:
+        return run_stream(ctx, stream, args.stop_on_error)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def add_format(parser, choices=("text", "json", "csv")):
+    parser.add_argument("--format", choices=choices, default="text")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Personal finance tracker. Run without arguments for the interactive menus.")
+    parser.add_argument("--email", help="log in before running the command")
+    parser.add_argument("--password")
+    groups = parser.add_subparsers(dest="group", metavar="command")
+    groups.required = True
+
+    groups.add_parser("init", help="create or upgrade the database schema").set_defaults(handler=cmd_init)
+
+    login = groups.add_parser("login", help="log in for the following batch commands")
+    login.add_argument("email")
+    login.add_argument("password")
+    login.set_defaults(handler=cmd_login)
+    groups.add_parser("logout").set_defaults(handler=cmd_logout)
+
+    batch = groups.add_parser("batch", help="run one command per line from a file, or '-' for stdin")
+    batch.add_argument("file")
+    batch.add_argument("--stop-on-error", action="store_true")
+    batch.set_defaults(handler=cmd_batch)
+
+    user = groups.add_parser("user", help="create, show or delete the account").add_subparsers(dest="action", metavar="action")
+    user.required = True
+    create = user.add_parser("create")
+    create.add_argument("--name", required=True)
+    create.add_argument("--email", dest="email", required=True)
+    create.add_argument("--password", dest="password", required=True)
+    create.set_defaults(handler=cmd_user_create)
+    info = user.add_parser("info")
+    add_format(info, ("text", "json"))
+    info.set_defaults(handler=cmd_user_info)
+    delete = user.add_parser("delete")
+    delete.add_argument("--chunk-size", type=int, help="delete transactions N at a time, committing between chunks")
+    delete.set_defaults(handler=cmd_user_delete)
+
+    category = groups.add_parser("category", help="add, list or delete categories").add_subparsers(dest="action", metavar="action")
+    category.required = True
+    add = category.add_parser("add")
+    add.add_argument("name")
+    add.set_defaults(handler=cmd_category_add)
+    listing = category.add_parser("list")
+    add_format(listing)
+    listing.set_defaults(handler=cmd_category_list)
+    delete = category.add_parser("delete")
+    delete.add_argument("name")
+    delete.add_argument("--chunk-size", type=int, help="delete transactions N at a time, committing between chunks")
+    delete.set_defaults(handler=cmd_category_delete)
+
+    tx = groups.add_parser("tx", help="add, list, find, delete, import or export transactions").add_subparsers(dest="action", metavar="action")
+    tx.required = True
+    add = tx.add_parser("add")
+    add.add_argument("amount", type=float)
+    add.add_argument("type", choices=["income", "expense"], type=str.lower)
+    add.add_argument("description")
+    add.add_argument("--category")
+    add.set_defaults(handler=cmd_tx_add)
+    listing = tx.add_parser("list")
+    listing.add_argument("--month", help="YYYY-MM")
+    listing.add_argument("--limit", type=int)
+    listing.add_argument("--order", choices=["asc", "desc"], default="desc")
+    add_format(listing)
+    listing.set_defaults(handler=cmd_tx_list)
+    find = tx.add_parser("find")
+    find.add_argument("description")
+    add_format(find)
+    find.set_defaults(handler=cmd_tx_find)
+    search = tx.add_parser("search", help="full-text search; words match as prefixes, quote phrases")
+    search.add_argument("query")
+    search.add_argument("--min-amount", type=float)
+    search.add_argument("--max-amount", type=float)
+    search.add_argument("--from", dest="start", help="YYYY-MM-DD, inclusive")
+    search.add_argument("--to", dest="end", help="YYYY-MM-DD, exclusive")
+    search.add_argument("--page", type=int, default=1)
+    search.add_argument("--page-size", type=int, default=20)
+    add_format(search)
+    search.set_defaults(handler=cmd_tx_search)
+    delete = tx.add_parser("delete")
+    delete.add_argument("description")
+    delete.set_defaults(handler=cmd_tx_delete)
+    categorize = tx.add_parser("categorize", help="set the category of many transactions at once")
+    categorize.add_argument("category", nargs="?")
+    categorize.add_argument("--clear", action="store_true", help="remove the category instead")
+    categorize.add_argument("--id", dest="ids", type=int, action="append", help="repeat for more transactions")
+    categorize.add_argument("--match", help="every transaction whose description contains this text")
+    categorize.set_defaults(handler=cmd_tx_categorize)
+    statement = tx.add_parser("import")
+    statement.add_argument("file")
+    statement.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    statement.add_argument("--file-format", choices=["csv", "ofx", "qfx", "qif"])
+    add_format(statement, ("text", "json"))
+    statement.set_defaults(handler=cmd_tx_import)
+    export = tx.add_parser("export", help="stream to .csv, .jsonl or .parquet, optionally .gz/.zst compressed")
+    export.add_argument("file")
+    export.add_argument("--dataset", choices=sorted(DATASETS), default="transactions",
+                        help="transactions, or the detailed monthly report rows")
+    export.add_argument("--file-format", choices=sorted(WRITERS))
+    export.add_argument("--compression", choices=["gzip", "zstd"])
+    export.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    add_format(export, ("text", "json"))
+    export.set_defaults(handler=cmd_tx_export)
+
+    report = groups.add_parser("report", help="monthly summary, category breakdown or detailed report, cache stats").add_subparsers(dest="action", metavar="action")
+    report.required = True
+    summary = report.add_parser("summary")
+    summary.add_argument("--from", dest="start", help="YYYY-MM-DD, inclusive")
+    summary.add_argument("--to", dest="end", help="YYYY-MM-DD, exclusive")
+    summary.add_argument("--category-id", type=int)
+    add_format(summary, ("text", "json"))
+    summary.set_defaults(handler=cmd_report_summary)
+    categories = report.add_parser("categories", help="income and expenses per category and month")
+    categories.add_argument("--from", dest="start", help="YYYY-MM, inclusive")
+    categories.add_argument("--to", dest="end", help="YYYY-MM, inclusive")
+    categories.add_argument("--top", type=int, help="show the N biggest categories and fold the rest into Other")
+    add_format(categories, ("text", "json"))
+    categories.set_defaults(handler=cmd_report_categories)
+    detailed = report.add_parser("detailed")
+    add_format(detailed, ("text", "json"))
+    detailed.set_defaults(handler=cmd_report_detailed)
+    cache = report.add_parser("cache", help="report cache hit/miss counters for this process")
+    add_format(cache, ("text", "json"))
+    cache.set_defaults(handler=cmd_report_cache)
+
+    balance = groups.add_parser("balance", help="running balance, overall and per category")
+    add_format(balance, ("text", "json"))
+    balance.set_defaults(handler=cmd_balance)
+
+    budget = groups.add_parser("budget", help="monthly spending limits, overall or per category").add_subparsers(dest="action", metavar="action")
+    budget.required = True
+    limit = budget.add_parser("set")
+    limit.add_argument("amount", type=float)
+    limit.add_argument("--category", help="category name; omit for a limit on all expenses")
+    limit.add_argument("--month", help="YYYY-MM, defaults to the current month")
+    limit.set_defaults(handler=cmd_budget_set)
+    listing = budget.add_parser("list")
+    listing.add_argument("--month", help="YYYY-MM, defaults to the current month")
+    add_format(listing, ("text", "json"))
+    listing.set_defaults(handler=cmd_budget_list)
+    delete = budget.add_parser("delete")
+    delete.add_argument("--category")
+    delete.add_argument("--month")
+    delete.set_defaults(handler=cmd_budget_delete)
+
+    recurring = groups.add_parser("recurring", help="repeating transactions and the scheduler that creates them").add_subparsers(dest="action", metavar="action")
+    recurring.required = True
+    add = recurring.add_parser("add")
+    add.add_argument("amount", type=float)
+    add.add_argument("type", choices=["income", "expense"], type=str.lower)
+    add.add_argument("description")
+    add.add_argument("--every", default="monthly", help="daily, weekly, monthly, yearly, or an RRULE like FREQ=WEEKLY;INTERVAL=2")
+    add.add_argument("--interval", type=int, default=1)
+    add.add_argument("--start", help="YYYY-MM-DD, defaults to now")
+    add.add_argument("--until", help="YYYY-MM-DD, last possible occurrence")
+    add.add_argument("--category")
+    add.set_defaults(handler=cmd_recurring_add)
+    listing = recurring.add_parser("list")
+    add_format(listing, ("text", "json"))
+    listing.set_defaults(handler=cmd_recurring_list)
+    delete = recurring.add_parser("delete")
+    delete.add_argument("id", type=int)
+    delete.set_defaults(handler=cmd_recurring_delete)
+    run = recurring.add_parser("run", help="create every occurrence that is due, for all users")
+    run.add_argument("--until", help="YYYY-MM-DD, materialize up to this date instead of now")
+    add_format(run, ("text", "json"))
+    run.set_defaults(handler=cmd_recurring_run)
+
+    return parser
+
+def execute(ctx, parser, argv):
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        # argparse has already printed the usage error (or --help)
+        return e.code == 0
+
+    try:
+        if args.email and args.handler not in (cmd_login, cmd_user_create):
+            cmd_login(ctx, args)
+        result = args.handler(ctx, args)
+        return result is not False
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return False
+    except Exception as e:
+        # Some helpers let database errors through; one bad command must not end a batch
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return False
+
+def run_stream(ctx, stream, stop_on_error=False):
+    parser = build_parser()
+    started = time.perf_counter()
+    commands = failures = 0
+    for line_no, line in enumerate(stream, 1):
+        try:
+            argv = shlex.split(line, comments=True)
+        except ValueError as e:
+            print(f"Line {line_no}: {e}", file=sys.stderr)
+            failures += 1
+            if stop_on_error:
+                break
+            continue
+        if not argv:
+            continue
+        commands += 1
+        if not execute(ctx, parser, argv):
+            failures += 1
+            print(f"Line {line_no} failed: {line.strip()}", file=sys.stderr)
+            if stop_on_error:
+                break
+    seconds = time.perf_counter() - started
+    print(f"Ran {commands} commands in {seconds:.2f}s, {failures} failed", file=sys.stderr)
+    return failures == 0
+
+def run(argv):
+    ctx = CommandContext()
+    return 0 if execute(ctx, build_parser(), argv) else 1
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alembic import command
+from alembic.config import Config
+from db.session import DATABASE_URL
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'alembic.ini')
+
+def alembic_config(url=DATABASE_URL):
+    config = Config(ALEMBIC_INI)
+    config.set_main_option('sqlalchemy.url', url.replace('%', '%%'))
+    return config
+
+def init_database(url=DATABASE_URL):
+    # Creates the schema on a new database and applies pending migrations to an existing one
+    command.upgrade(alembic_config(url), 'head')
+
+def show_revision(url=DATABASE_URL):
+    command.current(alembic_config(url), verbose=True)
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] in ("init", "upgrade"):
+        init_database()
+    elif len(sys.argv) > 1 and sys.argv[1] == "current":
+        show_revision()
+    else:
+        print("Usage: python migrate.py [init|upgrade|current]")
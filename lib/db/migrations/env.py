@@ -5,6 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 
+from db.models import Base
+from db.session import DATABASE_URL
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +17,21 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Migrate the same database the application uses
+if not config.get_main_option("sqlalchemy.url"):
+    config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
-target_metadata = None
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # The FTS5 search table and its shadow tables are managed by hand-written migrations
+    return not (type_ == "table" and name.startswith("transactions_fts"))
+
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -44,6 +57,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -64,8 +79,12 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        # SQLite can only ALTER tables through batch (copy-and-move) mode
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,76 @@
+"""transactions created_at not null
+
+Revision ID: 7d2b4f8e1a6c
+Revises: c5e7a1d9b3f4
+Create Date: 2026-10-19 16:02:47.915336
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2b4f8e1a6c'
+down_revision: Union[str, None] = 'c5e7a1d9b3f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The batch rebuild copies transactions into a new table, which drops its triggers and
+# breaks the category rename trigger that reads it; all four search triggers come off
+# first and go back after (see a91c6f3d2b58)
+SEARCH_TRIGGER_NAMES = ['transactions_fts_insert', 'transactions_fts_delete', 'transactions_fts_update', 'categories_fts_rename']
+SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, user_id ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN "
+    "UPDATE transactions_fts SET category = new.name "
+    "WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id); END",
+]
+
+
+def upgrade() -> None:
+    # Keyset pages compare (created_at, id), which never matches a NULL created_at, and the
+    # rollups skip those rows too. Undated rows get the owner's signup time (or now) and
+    # that owner's rollups are rebuilt so the rows show up in reports from here on.
+    bind = op.get_bind()
+    affected = [row[0] for row in bind.execute(sa.text(
+        "SELECT DISTINCT user_id FROM transactions WHERE created_at IS NULL"))]
+    op.execute(
+        "UPDATE transactions SET created_at = COALESCE("
+        "(SELECT created_at FROM users WHERE users.id = transactions.user_id), "
+        "strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime')) "
+        "WHERE created_at IS NULL"
+    )
+    for user_id in affected:
+        op.execute(f"DELETE FROM monthly_rollups WHERE user_id = {user_id}")
+        op.execute(
+            "INSERT INTO monthly_rollups (user_id, month, transaction_type, category_id, total_cents, count) "
+            "SELECT user_id, strftime('%Y-%m', created_at), transaction_type, category_id, SUM(amount_cents), COUNT(id) "
+            f"FROM transactions WHERE user_id = {user_id} "
+            "GROUP BY user_id, strftime('%Y-%m', created_at), transaction_type, category_id"
+        )
+
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
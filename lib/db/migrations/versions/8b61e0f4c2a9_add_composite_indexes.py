@@ -0,0 +1,34 @@
+"""add composite indexes
+
+Revision ID: 8b61e0f4c2a9
+Revises: 3f2a9c1d7b04
+Create Date: 2026-10-18 19:11:47.902615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b61e0f4c2a9'
+down_revision: Union[str, None] = '3f2a9c1d7b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_users_email_password', 'users', ['email', 'password'], if_not_exists=True)
+    op.create_index('ix_categories_user_id_name', 'categories', ['user_id', 'name'], if_not_exists=True)
+    op.create_index('ix_transactions_user_id_description', 'transactions', ['user_id', 'description'], if_not_exists=True)
+    op.create_index('ix_transactions_user_id_created_at', 'transactions', ['user_id', 'created_at'], if_not_exists=True)
+    op.create_index('ix_transactions_category_id', 'transactions', ['category_id'], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_category_id', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_created_at', table_name='transactions')
+    op.drop_index('ix_transactions_user_id_description', table_name='transactions')
+    op.drop_index('ix_categories_user_id_name', table_name='categories')
+    op.drop_index('ix_users_email_password', table_name='users')
@@ -0,0 +1,71 @@
+"""store amounts as cents
+
+Revision ID: a91c6f3d2b58
+Revises: e5a83b7c0d12
+Create Date: 2026-10-18 22:02:41.318907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a91c6f3d2b58'
+down_revision: Union[str, None] = 'e5a83b7c0d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The batch rebuild copies transactions into a new table and renames it. SQLite
+# drops a table's triggers with it and refuses the rename while another trigger
+# refers to the missing table, so the search triggers come off first and go back after.
+SEARCH_TRIGGER_NAMES = ['transactions_fts_insert', 'transactions_fts_delete', 'transactions_fts_update', 'categories_fts_rename']
+SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, user_id ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN "
+    "UPDATE transactions_fts SET category = new.name "
+    "WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id); END",
+]
+
+
+def upgrade() -> None:
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('amount_cents', sa.Integer(), nullable=True))
+
+    op.execute("UPDATE transactions SET amount_cents = CAST(ROUND(amount * 100) AS INTEGER)")
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amount_cents', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_column('amount')
+
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.add_column(sa.Column('amount', sa.Numeric(10, 2), nullable=True))
+
+    op.execute("UPDATE transactions SET amount = amount_cents / 100.0")
+
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.alter_column('amount', existing_type=sa.Numeric(10, 2), nullable=False)
+        batch_op.drop_column('amount_cents')
+
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
@@ -0,0 +1,58 @@
+"""hash passwords
+
+Revision ID: b72e5d9c3f18
+Revises: d3f9b1e7a4c2
+Create Date: 2026-10-19 09:12:41.381907
+
+"""
+import base64
+import hashlib
+import os
+import secrets
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b72e5d9c3f18'
+down_revision: Union[str, None] = 'd3f9b1e7a4c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of the hashing as it stood at this revision, so later changes to auth
+# can't change what this migration writes. Logins rehash to the current settings.
+PBKDF2_ITERATIONS = int(os.environ.get('FINANCE_TRACKER_PBKDF2_ITERATIONS', 600000))
+SALT_BYTES = 16
+
+
+def is_hashed(stored):
+    return stored.count('$') == 3 and stored.split('$', 1)[0] in ('pbkdf2_sha256', 'scrypt')
+
+
+def hash_password(password):
+    salt = secrets.token_bytes(SALT_BYTES)
+    derived = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, PBKDF2_ITERATIONS)
+    return (f"pbkdf2_sha256${PBKDF2_ITERATIONS}$"
+            f"{base64.b64encode(salt).decode('ascii')}${base64.b64encode(derived).decode('ascii')}")
+
+
+def upgrade() -> None:
+    # Logins look up by email alone now; the unique constraint on email already indexes it
+    op.drop_index('ix_users_email_password', table_name='users', if_exists=True)
+
+    connection = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('password', sa.String))
+    rows = connection.execute(sa.select(users.c.id, users.c.password)).fetchall()
+    hashed = [{'uid': uid, 'hashed': hash_password(password)} for uid, password in rows if not is_hashed(password)]
+    if hashed:
+        connection.execute(
+            users.update().where(users.c.id == sa.bindparam('uid')).values(password=sa.bindparam('hashed')),
+            hashed
+        )
+
+
+def downgrade() -> None:
+    # Hashes cannot be turned back into passwords; only the old index comes back
+    op.create_index('ix_users_email_password', 'users', ['email', 'password'], if_not_exists=True)
@@ -0,0 +1,51 @@
+"""add monthly rollups
+
+Revision ID: c47d2e9a1f36
+Revises: 8b61e0f4c2a9
+Create Date: 2026-10-18 20:02:33.157904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d2e9a1f36'
+down_revision: Union[str, None] = '8b61e0f4c2a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table('monthly_rollups'):
+        op.create_table(
+            'monthly_rollups',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('month', sa.String(length=7), nullable=False),
+            sa.Column('transaction_type', sa.Enum('INCOME', 'EXPENSE', name='transactiontype'), nullable=False),
+            sa.Column('category_id', sa.Integer(), nullable=True),
+            sa.Column('total_cents', sa.Integer(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_monthly_rollups_key', 'monthly_rollups', ['user_id', 'month', 'transaction_type', 'category_id'])
+
+    # Backfill from existing history; afterwards the helpers keep it current
+    op.execute("DELETE FROM monthly_rollups")
+    op.execute(
+        "INSERT INTO monthly_rollups (user_id, month, transaction_type, category_id, total_cents, count) "
+        "SELECT user_id, strftime('%Y-%m', created_at), transaction_type, category_id, "
+        "SUM(CAST(ROUND(amount * 100) AS INTEGER)), COUNT(id) "
+        "FROM transactions WHERE created_at IS NOT NULL "
+        "GROUP BY user_id, strftime('%Y-%m', created_at), transaction_type, category_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_monthly_rollups_key', table_name='monthly_rollups')
+    op.drop_table('monthly_rollups')
@@ -0,0 +1,150 @@
+"""cascade deletes
+
+Revision ID: c5e7a1d9b3f4
+Revises: f4c8a2e6d913
+Create Date: 2026-10-19 14:36:08.219574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e7a1d9b3f4'
+down_revision: Union[str, None] = 'f4c8a2e6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# SQLite's foreign keys are unnamed; the convention gives batch mode a name to drop them by
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# (table, column, referred table, ON DELETE action)
+FOREIGN_KEYS = [
+    ('categories', 'user_id', 'users', 'CASCADE'),
+    ('transactions', 'user_id', 'users', 'CASCADE'),
+    ('transactions', 'category_id', 'categories', 'CASCADE'),
+    ('monthly_rollups', 'user_id', 'users', 'CASCADE'),
+    ('monthly_rollups', 'category_id', 'categories', 'CASCADE'),
+    ('budgets', 'user_id', 'users', 'CASCADE'),
+    ('budgets', 'category_id', 'categories', 'CASCADE'),
+    ('recurring_rules', 'user_id', 'users', 'CASCADE'),
+    ('recurring_rules', 'category_id', 'categories', 'SET NULL'),
+]
+# Cascades look children up by these columns
+CASCADE_INDEXES = [
+    ('ix_monthly_rollups_category_id', 'monthly_rollups', 'category_id'),
+    ('ix_budgets_category_id', 'budgets', 'category_id'),
+    ('ix_recurring_rules_category_id', 'recurring_rules', 'category_id'),
+]
+
+# The batch rebuilds copy transactions and categories into new tables, which drops
+# their triggers; the search triggers come off first and go back after (see a91c6f3d2b58)
+SEARCH_TRIGGER_NAMES = ['transactions_fts_insert', 'transactions_fts_delete', 'transactions_fts_update', 'categories_fts_rename']
+SEARCH_TRIGGERS = [
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, user_id ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN "
+    "UPDATE transactions_fts SET category = new.name "
+    "WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id); END",
+]
+
+
+def fk_name(table, column, referred):
+    return f"fk_{table}_{column}_{referred}"
+
+
+def rebuild_foreign_keys(ondelete):
+    tables = []
+    for table, _, _, _ in FOREIGN_KEYS:
+        if table not in tables:
+            tables.append(table)
+    for table in tables:
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred, action in FOREIGN_KEYS:
+                if fk_table != table:
+                    continue
+                batch_op.drop_constraint(fk_name(table, column, referred), type_='foreignkey')
+                batch_op.create_foreign_key(fk_name(table, column, referred), referred, [column], ['id'],
+                                            ondelete=action if ondelete else None)
+            if table == 'transactions':
+                if ondelete:
+                    batch_op.create_foreign_key(fk_name('transactions', 'recurring_rule_id', 'recurring_rules'),
+                                                'recurring_rules', ['recurring_rule_id'], ['id'], ondelete='SET NULL')
+                else:
+                    batch_op.drop_constraint(fk_name('transactions', 'recurring_rule_id', 'recurring_rules'), type_='foreignkey')
+
+
+NET_CENTS = "CASE WHEN transaction_type = 'INCOME' THEN amount_cents ELSE -amount_cents END"
+
+
+def remap_user_uuids():
+    # Early versions of the CLI stored users.user_id (the UUID) in the owner column instead
+    # of users.id. Those rows belong to live users: point them at the right id rather than
+    # purging them as orphans, then rebuild the rollups and balances that missed them
+    bind = op.get_bind()
+    affected = [row[0] for row in bind.execute(sa.text(
+        "SELECT id FROM users WHERE user_id IN (SELECT user_id FROM transactions)"))]
+    for table, column, referred, _ in FOREIGN_KEYS:
+        if referred != 'users' or table == 'monthly_rollups':
+            continue
+        op.execute(f"UPDATE {table} SET {column} = (SELECT id FROM users WHERE users.user_id = {table}.{column}) "
+                   f"WHERE {column} IN (SELECT user_id FROM users)")
+    op.execute("DELETE FROM monthly_rollups WHERE user_id IN (SELECT user_id FROM users)")
+    for user_id in affected:
+        op.execute(f"DELETE FROM monthly_rollups WHERE user_id = {user_id}")
+        op.execute(
+            "INSERT INTO monthly_rollups (user_id, month, transaction_type, category_id, total_cents, count) "
+            "SELECT user_id, strftime('%Y-%m', created_at), transaction_type, category_id, SUM(amount_cents), COUNT(id) "
+            f"FROM transactions WHERE user_id = {user_id} AND created_at IS NOT NULL "
+            "GROUP BY user_id, strftime('%Y-%m', created_at), transaction_type, category_id"
+        )
+        op.execute(f"UPDATE users SET balance_cents = COALESCE("
+                   f"(SELECT SUM({NET_CENTS}) FROM transactions WHERE transactions.user_id = users.id), 0) "
+                   f"WHERE id = {user_id}")
+        op.execute(f"UPDATE categories SET balance_cents = COALESCE("
+                   f"(SELECT SUM({NET_CENTS}) FROM transactions WHERE transactions.category_id = categories.id), 0) "
+                   f"WHERE user_id = {user_id}")
+
+
+def upgrade() -> None:
+    remap_user_uuids()
+
+    # Migrations run with foreign keys off, so rows orphaned by earlier deletes are still
+    # here; once enforcement is on they would make any later update of those rows fail
+    for table, column, referred, action in FOREIGN_KEYS:
+        orphaned = f"{column} IS NOT NULL AND {column} NOT IN (SELECT id FROM {referred})"
+        if action == 'SET NULL':
+            op.execute(f"UPDATE {table} SET {column} = NULL WHERE {orphaned}")
+        else:
+            op.execute(f"DELETE FROM {table} WHERE {orphaned}")
+    op.execute("UPDATE transactions SET recurring_rule_id = NULL "
+               "WHERE recurring_rule_id IS NOT NULL AND recurring_rule_id NOT IN (SELECT id FROM recurring_rules)")
+
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    rebuild_foreign_keys(ondelete=True)
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
+
+    for name, table, column in CASCADE_INDEXES:
+        op.create_index(name, table, [column])
+
+
+def downgrade() -> None:
+    for name, table, _ in CASCADE_INDEXES:
+        op.drop_index(name, table_name=table)
+
+    for name in SEARCH_TRIGGER_NAMES:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    rebuild_foreign_keys(ondelete=False)
+    for statement in SEARCH_TRIGGERS:
+        op.execute(statement)
@@ -0,0 +1,58 @@
+"""add balances and budgets
+
+Revision ID: d3f9b1e7a4c2
+Revises: a91c6f3d2b58
+Create Date: 2026-10-18 22:47:19.504216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f9b1e7a4c2'
+down_revision: Union[str, None] = 'a91c6f3d2b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NET_CENTS = "CASE WHEN transaction_type = 'INCOME' THEN amount_cents ELSE -amount_cents END"
+
+
+def upgrade() -> None:
+    # Plain ADD COLUMN with a default; no table rebuild needed
+    op.add_column('users', sa.Column('balance_cents', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('categories', sa.Column('balance_cents', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_table(
+        'budgets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('month', sa.String(length=7), nullable=False),
+        sa.Column('limit_cents', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_budgets_key', 'budgets', ['user_id', 'month', 'category_id'], unique=True)
+
+    # Backfill the running balances from existing history
+    op.execute(
+        f"UPDATE users SET balance_cents = COALESCE("
+        f"(SELECT SUM({NET_CENTS}) FROM transactions WHERE transactions.user_id = users.id), 0)"
+    )
+    op.execute(
+        f"UPDATE categories SET balance_cents = COALESCE("
+        f"(SELECT SUM({NET_CENTS}) FROM transactions WHERE transactions.category_id = categories.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budgets_key', table_name='budgets')
+    op.drop_table('budgets')
+    with op.batch_alter_table('categories') as batch_op:
+        batch_op.drop_column('balance_cents')
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('balance_cents')
@@ -0,0 +1,61 @@
+"""add transaction search index
+
+Revision ID: e5a83b7c0d12
+Revises: c47d2e9a1f36
+Create Date: 2026-10-18 21:14:05.671342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a83b7c0d12'
+down_revision: Union[str, None] = 'c47d2e9a1f36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+        "description, category, owner, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+        "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+        "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+        "DELETE FROM transactions_fts WHERE rowid = old.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, user_id ON transactions BEGIN "
+        "DELETE FROM transactions_fts WHERE rowid = old.id; "
+        "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+        "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN "
+        "UPDATE transactions_fts SET category = new.name "
+        "WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id); END"
+    )
+
+    # Index the existing history
+    op.execute("DELETE FROM transactions_fts")
+    op.execute(
+        "INSERT INTO transactions_fts (rowid, description, category, owner) "
+        "SELECT t.id, t.description, c.name, 'u' || t.user_id "
+        "FROM transactions t LEFT JOIN categories c ON c.id = t.category_id"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS categories_fts_rename")
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS transactions_fts_insert")
+    op.execute("DROP TABLE IF EXISTS transactions_fts")
@@ -0,0 +1,59 @@
+"""add recurring rules
+
+Revision ID: f4c8a2e6d913
+Revises: b72e5d9c3f18
+Create Date: 2026-10-19 11:05:27.604113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c8a2e6d913'
+down_revision: Union[str, None] = 'b72e5d9c3f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRANSACTION_TYPES = sa.Enum('INCOME', 'EXPENSE', name='transactiontype')
+FREQUENCIES = sa.Enum('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY', name='recurringfrequency')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recurring_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('description', sa.String(), nullable=False),
+        sa.Column('amount_cents', sa.Integer(), nullable=False),
+        sa.Column('transaction_type', TRANSACTION_TYPES, nullable=False),
+        sa.Column('frequency', FREQUENCIES, nullable=False),
+        sa.Column('interval', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=True),
+        sa.Column('occurrences', sa.Integer(), nullable=False),
+        sa.Column('next_run', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_recurring_rules_user_id', 'recurring_rules', ['user_id'])
+    op.create_index('ix_recurring_rules_next_run', 'recurring_rules', ['next_run'])
+
+    # Nullable ADD COLUMN: no rebuild of transactions, so the search triggers stay as they are.
+    # SQLite can't add the foreign key without that rebuild; the model declares it
+    op.add_column('transactions', sa.Column('recurring_rule_id', sa.Integer(), nullable=True))
+    op.create_index('ix_transactions_recurring_occurrence', 'transactions', ['recurring_rule_id', 'created_at'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_recurring_occurrence', table_name='transactions')
+    # SQLite 3.35+ drops a plain column in place, again without touching the triggers
+    op.execute("ALTER TABLE transactions DROP COLUMN recurring_rule_id")
+    op.drop_index('ix_recurring_rules_next_run', table_name='recurring_rules')
+    op.drop_index('ix_recurring_rules_user_id', table_name='recurring_rules')
+    op.drop_table('recurring_rules')
@@ -1,12 +1,17 @@
 from datetime import datetime
 import uuid
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Enum, Numeric
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Index, DDL, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.orm import relationship
 import enum
+from db.session import get_engine, Session, session_scope
+from money import to_cents, from_cents
 
 Base = declarative_base()
-engine = create_engine('sqlite:///finance_tracker.db')
+
+def isoformat(value):
+    # to_dict output has to survive json.dumps without a custom encoder
+    return value.isoformat() if value is not None else None
 
 class TransactionType(enum.Enum):
     INCOME = "income"
@@ -19,13 +24,17 @@ class User(Base):
     user_id = Column(String, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
+    # KDF hash from auth.hash_password; logins look up by the unique email index
     password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.now)
     last_login = Column(DateTime)
+    # Income minus expenses, kept current by RollupHelper.record
+    balance_cents = Column(Integer, nullable=False, default=0, server_default='0')
     
-    # Relationships
-    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
-    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    # Relationships. passive_deletes: SQLite's ON DELETE CASCADE removes the children,
+    # instead of the ORM loading every one of them and deleting it row by row
+    categories = relationship("Category", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<User(name='{self.name}', email='{self.email}', user_id='{self.user_id}')>"
@@ -36,21 +45,25 @@ class User(Base):
             'user_id': self.user_id,
             'name': self.name,
             'email': self.email,
-            'created_at': self.created_at,
-            'last_login': self.last_login
+            'created_at': isoformat(self.created_at),
+            'last_login': isoformat(self.last_login)
         }
 
 class Category(Base):
     __tablename__ = 'categories'
+    __table_args__ = (
+        Index('ix_categories_user_id_name', 'user_id', 'name'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     created_at = Column(DateTime, default=datetime.now)
+    balance_cents = Column(Integer, nullable=False, default=0, server_default='0')
     
     # Relationships
     user = relationship("User", back_populates="categories")
-    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan")
+    transactions = relationship("Transaction", back_populates="category", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Category(name='{self.name}', created_at='{self.created_at}')>"
@@ -60,38 +73,171 @@ class Category(Base):
             'id': self.id,
             'name': self.name,
             'user_id': self.user_id,
-            'created_at': self.created_at
+            'created_at': isoformat(self.created_at)
         }
 
 class Transaction(Base):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        Index('ix_transactions_user_id_description', 'user_id', 'description'),
+        Index('ix_transactions_user_id_created_at', 'user_id', 'created_at'),
+        Index('ix_transactions_category_id', 'category_id'),
+        # One row per rule occurrence, however many times the scheduler catches up
+        Index('ix_transactions_recurring_occurrence', 'recurring_rule_id', 'created_at', unique=True),
+    )
     
     id = Column(Integer, primary_key=True)
-    amount = Column(Numeric(10, 2), nullable=False)
+    # Whole cents, so sums stay exact integers; use .amount for the Decimal value
+    amount_cents = Column(Integer, nullable=False)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     description = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    category_id = Column(Integer, ForeignKey('categories.id'), nullable=True)
-    created_at = Column(DateTime, default=datetime.now)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), nullable=True)
+    # Part of the keyset page cursor, which can't step past NULLs
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    # Set on rows materialized by the recurring scheduler; deleting the rule keeps the rows
+    recurring_rule_id = Column(Integer, ForeignKey('recurring_rules.id', ondelete='SET NULL'), nullable=True)
     
     # Relationships
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
     
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = to_cents(value)
+
     def __repr__(self):
         return f"<Transaction(amount={self.amount}, type='{self.transaction_type}', description='{self.description}')>"
     
     def to_dict(self):
         return {
             'id': self.id,
-            'amount': float(self.amount),
+            'amount': str(self.amount),
+            'amount_cents': self.amount_cents,
             'transaction_type': self.transaction_type.value,
             'description': self.description,
             'user_id': self.user_id,
             'category_id': self.category_id,
-            'created_at': self.created_at
+            'created_at': isoformat(self.created_at)
         }
 
-Base.metadata.create_all(engine)
+class RecurringFrequency(enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
+    YEARLY = "yearly"
+
+class RecurringRule(Base):
+    __tablename__ = 'recurring_rules'
+    __table_args__ = (
+        Index('ix_recurring_rules_user_id', 'user_id'),
+        # The scheduler only ever looks for rules that are due
+        Index('ix_recurring_rules_next_run', 'next_run'),
+        Index('ix_recurring_rules_category_id', 'category_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    # Rules outlive their category, uncategorized
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='SET NULL'), nullable=True)
+    description = Column(String, nullable=False)
+    amount_cents = Column(Integer, nullable=False)
+    transaction_type = Column(Enum(TransactionType), nullable=False)
+    # Every <interval> days/weeks/months/years from start_date, like RRULE FREQ/INTERVAL/UNTIL
+    frequency = Column(Enum(RecurringFrequency), nullable=False)
+    interval = Column(Integer, nullable=False, default=1)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime)
+    # Occurrences materialized so far, and when the next one is due (NULL once the rule has ended)
+    occurrences = Column(Integer, nullable=False, default=0)
+    next_run = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.now)
+
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
+
+    def __repr__(self):
+        return f"<RecurringRule(description='{self.description}', amount={self.amount}, frequency='{self.frequency.value}', interval={self.interval})>"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'description': self.description,
+            'amount': str(self.amount),
+            'transaction_type': self.transaction_type.value,
+            'frequency': self.frequency.value,
+            'interval': self.interval,
+            'category_id': self.category_id,
+            'start_date': isoformat(self.start_date),
+            'end_date': isoformat(self.end_date),
+            'next_run': isoformat(self.next_run),
+            'occurrences': self.occurrences,
+        }
+
+class MonthlyRollup(Base):
+    __tablename__ = 'monthly_rollups'
+    __table_args__ = (
+        Index('ix_monthly_rollups_key', 'user_id', 'month', 'transaction_type', 'category_id'),
+        # Cascading a category delete looks its rollups up by category alone
+        Index('ix_monthly_rollups_category_id', 'category_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    month = Column(String(7), nullable=False)
+    transaction_type = Column(Enum(TransactionType), nullable=False)
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), nullable=True)
+    total_cents = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<MonthlyRollup(month='{self.month}', type='{self.transaction_type}', total_cents={self.total_cents}, count={self.count})>"
+
+class Budget(Base):
+    __tablename__ = 'budgets'
+    __table_args__ = (
+        Index('ix_budgets_key', 'user_id', 'month', 'category_id', unique=True),
+        Index('ix_budgets_category_id', 'category_id'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    # NULL category: a limit on all expenses of the month
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete='CASCADE'), nullable=True)
+    month = Column(String(7), nullable=False)
+    limit_cents = Column(Integer, nullable=False)
+
+    @property
+    def limit(self):
+        return from_cents(self.limit_cents)
+
+    def __repr__(self):
+        return f"<Budget(month='{self.month}', category_id={self.category_id}, limit_cents={self.limit_cents})>"
+
+# Full-text index over transaction descriptions and category names. "owner" holds
+# u<user_id> so a search only walks the postings of one user. Triggers keep it in
+# sync with every insert, update and delete, including bulk Core inserts.
+TRANSACTION_SEARCH_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS transactions_fts USING fts5("
+    "description, category, owner, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF description, category_id, user_id ON transactions BEGIN "
+    "DELETE FROM transactions_fts WHERE rowid = old.id; "
+    "INSERT INTO transactions_fts (rowid, description, category, owner) VALUES "
+    "(new.id, new.description, (SELECT name FROM categories WHERE id = new.category_id), 'u' || new.user_id); END",
+    "CREATE TRIGGER IF NOT EXISTS categories_fts_rename AFTER UPDATE OF name ON categories BEGIN "
+    "UPDATE transactions_fts SET category = new.name "
+    "WHERE rowid IN (SELECT id FROM transactions WHERE category_id = new.id); END",
+]
 
-Session = sessionmaker(bind=engine)
+for statement in TRANSACTION_SEARCH_DDL:
+    event.listen(Base.metadata, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
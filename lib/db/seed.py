@@ -1,21 +1,53 @@
+import os
+import random
+import sys
+import time
 from datetime import datetime, timedelta
-from models import User, Category, Transaction, TransactionType, Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+from db.models import User, Category, Transaction, TransactionType, MonthlyRollup, Budget, RecurringRule, Session
+from rollups import RollupHelper
+from auth import hash_password
+
+CATEGORY_NAMES = [
+    "Salary", "Freelance Work", "Groceries", "Food & Dining", "Transportation", "Utilities", "Rent",
+    "Healthcare", "Entertainment", "Shopping", "Travel", "Insurance", "Education", "Gifts", "Subscriptions",
+    "Fitness", "Pets", "Home Repair", "Childcare", "Charity",
+]
+EXPENSE_DESCRIPTIONS = [
+    "Weekly Groceries", "Gas Station", "Electric Bill", "Water Bill", "Movie Tickets", "Coffee Shop",
+    "Pharmacy", "Restaurant", "Bus Pass", "Internet", "Phone Bill", "Gym Membership", "Book Store",
+]
+INCOME_DESCRIPTIONS = ["Monthly Salary", "Freelance Project", "Consulting Work", "Refund", "Bonus"]
 
 def seed_database():
     session = Session()
     
     try:
+        session.query(Budget).delete()
+        session.query(MonthlyRollup).delete()
         session.query(Transaction).delete()
+        session.query(RecurringRule).delete()
         session.query(Category).delete()
         session.query(User).delete()
         
         user1 = User(
             name="Jane Smith",
             email="jane.smith@example.com",
-            password="securepass456",
+            password=hash_password("securepass456"),
             created_at=datetime.now() - timedelta(days=15),
             last_login=datetime.now() - timedelta(minutes=30)
         )
+
+        user2 = User(
+            name="John Doe",
+            email="john.doe@example.com",
+            password=hash_password("password123"),
+            created_at=datetime.now() - timedelta(days=30),
+            last_login=datetime.now() - timedelta(days=2)
+        )
         
         session.add_all([user1, user2])
         session.commit()
@@ -130,6 +162,7 @@ def seed_database():
         
         session.add_all(transactions_user1 + transactions_user2)
         session.commit()
+        RollupHelper.rebuild()
         
         print("✅ Database seeded successfully!")
         print(f"Created {len([user1, user2])} users")
@@ -139,12 +172,12 @@ def seed_database():
         print("\n--- Sample User Credentials ---")
         print("User 1:")
         print(f"  Email: {user1.email}")
-        print(f"  Password: password123")
+        print(f"  Password: securepass456")
         print(f"  User ID: {user1.user_id}")
         
         print("User 2:")
         print(f"  Email: {user2.email}")
-        print(f"  Password: securepass456")
+        print(f"  Password: password123")
         print(f"  User ID: {user2.user_id}")
         
     except Exception as e:
@@ -157,7 +190,10 @@ def clear_database():
     session = Session()
     
     try:
+        session.query(Budget).delete()
+        session.query(MonthlyRollup).delete()
         session.query(Transaction).delete()
+        session.query(RecurringRule).delete()
         session.query(Category).delete()
         session.query(User).delete()
         session.commit()
@@ -168,16 +204,90 @@ def clear_database():
     finally:
         session.close()
 
+def generate_dataset(users=10, categories_per_user=10, transactions_per_user=1000, months=24, batch_size=10000, seed=0):
+    rng = random.Random(seed)
+    session = Session()
+    started = time.perf_counter()
+    now = datetime.now()
+    span_seconds = months * 30 * 24 * 3600
+
+    try:
+        first_user = (session.query(User.id).order_by(User.id.desc()).limit(1).scalar() or 0) + 1
+        user_ids = list(range(first_user, first_user + users))
+        # One hash shared by every synthetic user; hashing each at full cost would dominate seeding
+        password = hash_password("password123")
+        session.execute(insert(User), [
+            {
+                'id': user_id,
+                'user_id': f"synthetic-{seed}-{user_id}",
+                'name': f"Synthetic User {user_id}",
+                'email': f"user{user_id}.seed{seed}@example.com",
+                'password': password,
+                'created_at': now - timedelta(seconds=span_seconds),
+            }
+            for user_id in user_ids
+        ])
+
+        first_category = (session.query(Category.id).order_by(Category.id.desc()).limit(1).scalar() or 0) + 1
+        category_rows = []
+        categories = {}
+        for user_id in user_ids:
+            names = rng.sample(CATEGORY_NAMES, min(categories_per_user, len(CATEGORY_NAMES)))
+            names += [f"Category {n}" for n in range(len(names), categories_per_user)]
+            categories[user_id] = list(range(first_category, first_category + len(names)))
+            for category_id, name in zip(categories[user_id], names):
+                category_rows.append({'id': category_id, 'name': name, 'user_id': user_id, 'created_at': now})
+            first_category += len(names)
+        if category_rows:
+            session.execute(insert(Category), category_rows)
+
+        batch = []
+        total = 0
+        for user_id in user_ids:
+            for _ in range(transactions_per_user):
+                # Roughly one income per ten rows; expenses skew small with a long tail
+                is_income = rng.random() < 0.1
+                amount = rng.uniform(800, 5000) if is_income else min(rng.lognormvariate(3.3, 1.0), 5000)
+                batch.append({
+                    'amount_cents': max(int(round(amount * 100)), 1),
+                    'transaction_type': TransactionType.INCOME if is_income else TransactionType.EXPENSE,
+                    'description': rng.choice(INCOME_DESCRIPTIONS if is_income else EXPENSE_DESCRIPTIONS),
+                    'user_id': user_id,
+                    'category_id': rng.choice(categories[user_id]) if categories[user_id] and rng.random() < 0.8 else None,
+                    'created_at': now - timedelta(seconds=rng.randrange(span_seconds)),
+                })
+                if len(batch) >= batch_size:
+                    session.execute(insert(Transaction), batch)
+                    session.commit()
+                    total += len(batch)
+                    batch = []
+        if batch:
+            session.execute(insert(Transaction), batch)
+            total += len(batch)
+        session.commit()
+
+        RollupHelper.rebuild()
+        seconds = time.perf_counter() - started
+        print(f"Generated {users} users, {len(category_rows)} categories and {total} transactions "
+              f"in {seconds:.1f}s ({total / seconds if seconds else 0:.0f} rows/sec)")
+        return user_ids
+    except Exception as e:
+        session.rollback()
+        print(f"Error generating data: {str(e)}")
+        return []
+    finally:
+        session.close()
+
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1:
         if sys.argv[1] == "clear":
             clear_database()
         elif sys.argv[1] == "seed":
             seed_database()
+        elif sys.argv[1] == "generate" and len(sys.argv) == 5:
+            generate_dataset(int(sys.argv[2]), int(sys.argv[3]), int(sys.argv[4]))
         else:
-            print("Usage: python seed.py [seed|clear]")
+            print("Usage: python seed.py [seed|clear|generate <users> <categories per user> <transactions per user>]")
     else:
         print("Choose an option:")
         print("1. Seed database with sample data")
@@ -0,0 +1,109 @@
+import os
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, scoped_session
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATABASE_PATH = os.environ.get('FINANCE_TRACKER_DB', os.path.join(PROJECT_ROOT, 'finance_tracker.db'))
+DATABASE_URL = os.environ.get('FINANCE_TRACKER_DB_URL', f'sqlite:///{DATABASE_PATH}')
+
+# PRAGMAs applied to every new SQLite connection
+SQLITE_PROFILES = {
+    # SQLite's own defaults: rollback journal and an fsync on every commit
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+    },
+    # WAL lets readers run alongside the writer; NORMAL only fsyncs at checkpoints
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL concurrency but still fsync every commit
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -64000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
+SQLITE_PROFILE = os.environ.get('FINANCE_TRACKER_SQLITE_PROFILE', 'balanced')
+
+POOL_SETTINGS = {
+    'pool_size': int(os.environ.get('FINANCE_TRACKER_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('FINANCE_TRACKER_MAX_OVERFLOW', 10)),
+    'pool_timeout': float(os.environ.get('FINANCE_TRACKER_POOL_TIMEOUT', 30)),
+    'pool_recycle': int(os.environ.get('FINANCE_TRACKER_POOL_RECYCLE', -1)),
+}
+
+def apply_sqlite_profile(engine, profile=SQLITE_PROFILE):
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile '{profile}'. Use one of: {', '.join(SQLITE_PROFILES)}")
+    pragmas = SQLITE_PROFILES[profile]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        # Deletes rely on ON DELETE CASCADE / SET NULL, so enforcement is on whatever the profile
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+def make_engine(url=DATABASE_URL, profile=SQLITE_PROFILE, **pool_settings):
+    settings = dict(POOL_SETTINGS, **pool_settings)
+    if url in ('sqlite://', 'sqlite:///:memory:'):
+        # In-memory SQLite lives in a single connection, so there is no pool to size
+        engine = create_engine(url)
+    else:
+        engine = create_engine(url, pool_pre_ping=True, **settings)
+    if engine.dialect.name == 'sqlite':
+        apply_sqlite_profile(engine, profile)
+    return engine
+
+engine = None
+
+# expire_on_commit=False keeps returned objects readable after their session has closed
+SessionFactory = sessionmaker(expire_on_commit=False)
+
+def get_engine():
+    # The engine (and its first connection) is only created on first database access
+    global engine
+    if engine is None:
+        engine = make_engine()
+        SessionFactory.configure(bind=engine)
+    return engine
+
+def _new_session():
+    get_engine()
+    return SessionFactory()
+
+# Thread-local session for scripts that want one session per thread
+Session = scoped_session(_new_session)
+
+def configure_engine(url=DATABASE_URL, profile=SQLITE_PROFILE, **pool_settings):
+    global engine
+    if engine is not None:
+        engine.dispose()
+    engine = make_engine(url, profile, **pool_settings)
+    SessionFactory.configure(bind=engine)
+    Session.remove()
+    return engine
+
+@contextmanager
+def session_scope():
+    # One session per unit of work: commit on success, roll back on error, always release it
+    session = _new_session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
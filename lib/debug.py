@@ -1,5 +1,14 @@
-from db.models import User, Category, Transaction, Session
-from helpers import UserHelper, CategoryHelper, TransactionHelper
+import json
+import time
+from datetime import datetime
+from sqlalchemy import func, text
+from db.models import User, Category, Transaction, MonthlyRollup, Session
+from helpers import UserHelper, CategoryHelper, TransactionHelper, DisplayHelper, monthly_report_statement
+from importer import ImportHelper, DEFAULT_BATCH_SIZE
+from rollups import RollupHelper
+from search import SearchHelper
+from stats import StatsHelper
+from analytics import AnalyticsHelper, load_columns
 
 def test_connection():
 
@@ -35,22 +44,137 @@ def quick_test():
         UserHelper.delete_user(user.id)
         print("Test completed, cleaned up")
 
-def show_stats():
+def show_stats(as_json=False):
     try:
-        session = Session()
-        users = session.query(User).all()
-        
+        stats = StatsHelper.collect()
+        if as_json:
+            print(json.dumps(stats, default=lambda value: value.isoformat()))
+            return
+
+        db = stats['database']
         print("\n--- Database Stats ---")
-        print(f"Total Users: {len(users)}")
-        
-        for user in users:
-            cats = session.query(Category).filter_by(user_id=user.id).count()
-            trans = session.query(Transaction).filter_by(user_id=user.id).count()
-            print(f"{user.name}: {cats} categories, {trans} transactions")
-        
+        print(f"File: {db['path']} ({db['size_bytes'] / 1024:.0f} KB, {db['free_bytes'] / 1024:.0f} KB free, WAL {db['wal_bytes'] / 1024:.0f} KB)")
+        print(f"Total Users: {stats['totals']['users']}, Categories: {stats['totals']['categories']}, Transactions: {stats['totals']['transactions']}")
+
+        print(f"\n{'user':<24} {'categories':>10} {'transactions':>12} {'income':>14} {'expenses':>14}  {'first activity':<16}  {'last activity':<16}")
+        for user in stats['users']:
+            print(f"{user['name'][:24]:<24} {user['categories']:>10} {user['transactions']:>12} "
+                  f"{user['income_cents'] / 100:>14.2f} {user['expense_cents'] / 100:>14.2f}  "
+                  f"{DisplayHelper.format_datetime(user['first_activity']):<16}  {DisplayHelper.format_datetime(user['last_activity']):<16}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def check_query_plans():
+    try:
+        session = Session()
+        queries = {
+            "create_user / login_user (email lookup)": session.query(User).filter_by(email="a@b.c"),
+            "create_category / find_category_by_name": session.query(Category).filter_by(name="Food", user_id=1),
+            "get_user_categories": session.query(Category).filter_by(user_id=1),
+            "get_user_transactions": session.query(Transaction).filter_by(user_id=1),
+            "get_transactions_page": session.query(Transaction).filter_by(user_id=1)
+                .order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(21),
+            "find_transaction_by_description": session.query(Transaction).filter_by(description="Rent", user_id=1),
+            "get_detailed_monthly_report": session.query(Transaction).filter_by(user_id=1).order_by(Transaction.created_at.desc()),
+            # Whole months come from the rollups; only date ranges group the raw rows
+            "get_monthly_report": monthly_report_statement(1),
+            "get_monthly_report (date range)": monthly_report_statement(1, start_date=datetime(2026, 1, 1)),
+            "get_category_report": session.query(MonthlyRollup.month, MonthlyRollup.category_id, Category.name,
+                                                 MonthlyRollup.transaction_type, func.sum(MonthlyRollup.total_cents))
+                .outerjoin(Category, Category.id == MonthlyRollup.category_id)
+                .filter(MonthlyRollup.user_id == 1, MonthlyRollup.month >= "2026-01")
+                .group_by(MonthlyRollup.month, MonthlyRollup.category_id, MonthlyRollup.transaction_type),
+        }
+
+        print("\n--- Query Plans ---")
+        all_indexed = True
+        for name, query in queries.items():
+            statement = getattr(query, 'statement', query)
+            sql = statement.compile(session.get_bind(), compile_kwargs={"literal_binds": True})
+            plan = [row[3] for row in session.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            # A bare SCAN means SQLite walks the whole table instead of seeking an index
+            full_scan = any(step.startswith("SCAN") and "INDEX" not in step for step in plan)
+            all_indexed = all_indexed and not full_scan
+            print(f"{'FULL SCAN' if full_scan else 'INDEXED'}: {name}")
+            for step in plan:
+                print(f"    {step}")
+
         session.close()
+        return all_indexed
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
+
+def import_statement(path, user_id, batch_size=DEFAULT_BATCH_SIZE):
+    report, msg = ImportHelper.import_file(path, user_id, batch_size=batch_size)
+    print(msg)
+    if report:
+        DisplayHelper.display_import_report(report)
+    return report
+
+def verify_rollups(rebuild=False):
+    try:
+        if rebuild:
+            success, msg = RollupHelper.rebuild()
+            print(msg)
+            if not success:
+                return False
+
+        drift = RollupHelper.verify()
+        balance_drift = RollupHelper.verify_balances()
+        if not drift and not balance_drift:
+            print("Monthly rollups and balances match the transactions table")
+            return True
+
+        if drift:
+            print(f"Monthly rollups drifted in {len(drift)} places:")
+        for d in drift:
+            print(f"  user {d['user_id']} {d['month']} {d['transaction_type']} category {d['category_id']}: "
+                  f"expected {d['expected']}, stored {d['actual']} (cents, count)")
+        if balance_drift:
+            print(f"Running balances drifted in {len(balance_drift)} places:")
+        for d in balance_drift:
+            print(f"  {d['table']} {d['id']}: expected {d['expected']}, stored {d['actual']} (cents)")
+        return False
     except Exception as e:
         print(f"Error: {e}")
+        return False
+
+def show_analytics(user_id):
+    try:
+        started = time.perf_counter()
+        columns = load_columns(user_id)
+        loaded = time.perf_counter() - started
+        monthly = AnalyticsHelper.monthly_totals(columns)
+        categories = AnalyticsHelper.category_totals(columns)
+        balances = dict(AnalyticsHelper.running_balance(columns))
+        averages = dict(AnalyticsHelper.rolling_average(columns))
+        print(f"\n--- Analytics: {len(columns)} transactions (load {loaded * 1000:.0f} ms, total {(time.perf_counter() - started) * 1000:.0f} ms) ---")
+        print(f"{'month':<8} {'income':>14} {'expenses':>14} {'3-month avg net':>16} {'balance':>16}")
+        for month, totals in monthly.items():
+            average = averages.get(month)
+            print(f"{month:<8} {totals['income']:>14.2f} {totals['expense']:>14.2f} "
+                  f"{'' if average is None else f'{average:.2f}':>16} {balances[month]:>16.2f}")
+        print(f"\n{'category':<10} {'income':>14} {'expenses':>14} {'count':>8}")
+        for category, totals in sorted(categories.items(), key=lambda item: item[0] or 0):
+            print(f"{category or '-':<10} {totals['income']:>14.2f} {totals['expense']:>14.2f} {totals['count']:>8}")
+    except Exception as e:
+        print(f"Error: {e}")
+
+def verify_analytics(user_id):
+    try:
+        # Once against the rollups, once against the raw-row aggregation
+        mismatches = AnalyticsHelper.verify(user_id) + AnalyticsHelper.verify(user_id, start_date=datetime(1970, 1, 1))
+        if not mismatches:
+            print("Analytics match get_monthly_report")
+            return True
+        print(f"Analytics disagree with get_monthly_report in {len(mismatches)} months:")
+        for month, expected, actual in mismatches:
+            print(f"  {month}: expected {expected}, got {actual}")
+        return False
+    except Exception as e:
+        print(f"Error: {e}")
+        return False
 
 if __name__ == "__main__":
     import sys
@@ -59,14 +183,32 @@ if __name__ == "__main__":
         if sys.argv[1] == "test":
             quick_test()
         elif sys.argv[1] == "stats":
-            show_stats()
+            show_stats(as_json="--json" in sys.argv[2:])
+        elif sys.argv[1] == "explain":
+            sys.exit(0 if check_query_plans() else 1)
+        elif sys.argv[1] == "import" and len(sys.argv) in (4, 5):
+            batch_size = int(sys.argv[4]) if len(sys.argv) == 5 else DEFAULT_BATCH_SIZE
+            import_statement(sys.argv[2], int(sys.argv[3]), batch_size)
+        elif sys.argv[1] == "search" and len(sys.argv) == 3 and sys.argv[2] == "rebuild":
+            success, msg = SearchHelper.rebuild()
+            print(msg)
+            sys.exit(0 if success else 1)
+        elif sys.argv[1] == "analytics" and len(sys.argv) == 3:
+            show_analytics(int(sys.argv[2]))
+        elif sys.argv[1] == "analytics" and len(sys.argv) == 4 and sys.argv[2] == "verify":
+            sys.exit(0 if verify_analytics(int(sys.argv[3])) else 1)
+        elif sys.argv[1] == "rollups" and len(sys.argv) == 3 and sys.argv[2] in ("verify", "rebuild"):
+            sys.exit(0 if verify_rollups(rebuild=sys.argv[2] == "rebuild") else 1)
         else:
-            print("Usage: python debug.py [test|stats]")
+            print("Usage: python debug.py [test|stats [--json]|explain|import <file> <user id> [batch size]|rollups verify|rollups rebuild|search rebuild|analytics [verify] <user id>]")
     else:
         print("Debug Menu:")
         print("1. Test Connection")
         print("2. Quick Test")
         print("3. Show Stats")
+        print("4. Check Query Plans")
+        print("5. Verify Monthly Rollups")
+        print("6. Rebuild Monthly Rollups")
         
         choice = input("Choice: ").strip()
         if choice == "1":
@@ -75,5 +217,11 @@ if __name__ == "__main__":
             quick_test()
         elif choice == "3":
             show_stats()
+        elif choice == "4":
+            check_query_plans()
+        elif choice == "5":
+            verify_rollups()
+        elif choice == "6":
+            verify_rollups(rebuild=True)
         else:
             print("Invalid choice")
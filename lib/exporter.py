@@ -0,0 +1,200 @@
+import csv
+import gzip
+import importlib.util
+import io
+import json
+import os
+import time
+from sqlalchemy import select
+from db.models import Category, Transaction, session_scope
+from money import from_cents
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Imported by the first Parquet export; pyarrow alone would blow the CLI startup budget
+pyarrow = None
+
+DEFAULT_BATCH_SIZE = 5000
+COMPRESSION_SUFFIXES = {'.gz': 'gzip', '.zst': 'zstd'}
+FORMAT_SUFFIXES = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+
+# Transaction columns line up with what ImportHelper reads back in
+DATASETS = {
+    'transactions': ('id', 'created_at', 'type', 'amount', 'description', 'category'),
+    # The rows of get_detailed_monthly_report, flattened one per transaction
+    'report': ('month', 'type', 'id', 'amount', 'description', 'date', 'time'),
+}
+
+def transactions_statement(user_id):
+    return select(
+        Transaction.id, Transaction.created_at, Transaction.transaction_type, Transaction.amount_cents,
+        Transaction.description, Category.name
+    ).outerjoin(Category, Category.id == Transaction.category_id) \
+        .where(Transaction.user_id == user_id).order_by(Transaction.created_at, Transaction.id)
+
+def report_statement(user_id):
+    return select(
+        Transaction.id, Transaction.created_at, Transaction.transaction_type, Transaction.amount_cents, Transaction.description
+    ).where(Transaction.user_id == user_id).order_by(Transaction.created_at.desc())
+
+def transaction_rows(rows):
+    return [(id, created_at, trans_type.value, from_cents(cents), description, category)
+            for id, created_at, trans_type, cents, description, category in rows]
+
+def report_rows(rows):
+    return [(created_at.strftime("%Y-%m"), trans_type.value, id, from_cents(cents), description,
+             created_at.strftime("%Y-%m-%d"), created_at.strftime("%H:%M"))
+            for id, created_at, trans_type, cents, description in rows]
+
+SOURCES = {
+    'transactions': (transactions_statement, transaction_rows),
+    'report': (report_statement, report_rows),
+}
+
+def iter_batches(user_id, dataset, batch_size=DEFAULT_BATCH_SIZE):
+    # yield_per streams from the cursor: one batch of rows in memory at a time
+    statement, shape = SOURCES[dataset]
+    with session_scope() as session:
+        result = session.execute(statement(user_id).execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield shape(partition)
+
+def serialize(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+def open_output(path, compression=None):
+    if compression == 'gzip':
+        stream = gzip.open(path, 'wb', compresslevel=6)
+    elif compression == 'zstd':
+        stream = zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+    elif compression is None:
+        stream = open(path, 'wb')
+    else:
+        raise ValueError(f"Unsupported compression '{compression}'. Use gzip or zstd")
+    return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+
+class CsvWriter:
+    def __init__(self, path, fields, compression):
+        self.stream = open_output(path, compression)
+        self.writer = csv.writer(self.stream)
+        self.writer.writerow(fields)
+
+    def write_batch(self, rows):
+        self.writer.writerows([[serialize(value) for value in row] for row in rows])
+
+    def close(self):
+        self.stream.close()
+
+class JsonLinesWriter:
+    def __init__(self, path, fields, compression):
+        self.stream = open_output(path, compression)
+        self.fields = fields
+
+    def write_batch(self, rows):
+        self.stream.write("".join(
+            json.dumps({field: serialize(value) for field, value in zip(self.fields, row)}) + "\n" for row in rows))
+
+    def close(self):
+        self.stream.close()
+
+class ParquetWriter:
+    # One row group per batch; compression is Parquet's own per-column codec
+    TYPES = {
+        'id': 'int64', 'created_at': 'timestamp', 'amount': 'decimal',
+    }
+
+    def __init__(self, path, fields, compression):
+        global pyarrow
+        import pyarrow
+        import pyarrow.parquet
+        self.schema = pyarrow.schema([(field, self.arrow_type(field)) for field in fields])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression or 'snappy')
+
+    @classmethod
+    def arrow_type(cls, field):
+        kind = cls.TYPES.get(field)
+        if kind == 'int64':
+            return pyarrow.int64()
+        if kind == 'timestamp':
+            return pyarrow.timestamp('us')
+        if kind == 'decimal':
+            return pyarrow.decimal128(18, 2)
+        return pyarrow.string()
+
+    def write_batch(self, rows):
+        columns = list(zip(*rows))
+        self.writer.write_batch(pyarrow.record_batch(
+            [pyarrow.array(column, type=field.type) for column, field in zip(columns, self.schema)], schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+WRITERS = {
+    'csv': CsvWriter,
+    'jsonl': JsonLinesWriter,
+    'parquet': ParquetWriter,
+}
+
+def detect_format(path):
+    # data.csv.gz -> ('csv', 'gzip')
+    root, suffix = os.path.splitext(path.lower())
+    compression = COMPRESSION_SUFFIXES.get(suffix)
+    if compression:
+        root, suffix = os.path.splitext(root)
+    return FORMAT_SUFFIXES.get(suffix), compression
+
+def missing_dependency(file_format, compression):
+    if file_format == 'parquet' and importlib.util.find_spec('pyarrow') is None:
+        return "Parquet output needs the pyarrow package (pip install pyarrow)"
+    if compression == 'zstd' and file_format != 'parquet' and zstandard is None:
+        return "zstd output needs the zstandard package (pip install zstandard)"
+    return None
+
+class ExportHelper:
+    @staticmethod
+    def export_file(path, user_id, dataset='transactions', file_format=None, compression=None, batch_size=DEFAULT_BATCH_SIZE):
+        detected_format, detected_compression = detect_format(path)
+        file_format = (file_format or detected_format or '').lower()
+        compression = compression or detected_compression
+        if not file_format:
+            return None, f"Cannot tell the format from '{path}'. Use one of: {', '.join(sorted(WRITERS))}"
+        if file_format not in WRITERS:
+            return None, f"Unsupported format '{file_format}'. Use one of: {', '.join(sorted(WRITERS))}"
+        if dataset not in DATASETS:
+            return None, f"Unknown dataset '{dataset}'. Use one of: {', '.join(sorted(DATASETS))}"
+        if batch_size < 1:
+            return None, "Batch size must be at least 1"
+        missing = missing_dependency(file_format, compression)
+        if missing:
+            return None, missing
+
+        report = {'exported': 0, 'batches': 0, 'bytes': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        started = time.perf_counter()
+        try:
+            writer = WRITERS[file_format](path, DATASETS[dataset], compression)
+            try:
+                for rows in iter_batches(user_id, dataset, batch_size):
+                    writer.write_batch(rows)
+                    report['exported'] += len(rows)
+                    report['batches'] += 1
+            finally:
+                writer.close()
+        except Exception as e:
+            # Don't leave a truncated file that looks like a finished export
+            if os.path.exists(path):
+                os.remove(path)
+            return None, f"Error: {str(e)}"
+        finally:
+            report['seconds'] = time.perf_counter() - started
+            if report['seconds'] > 0:
+                report['rows_per_sec'] = report['exported'] / report['seconds']
+
+        report['bytes'] = os.path.getsize(path)
+        return report, f"Exported {report['exported']} rows to {path}"
@@ -1,179 +1,483 @@
 from datetime import datetime
-from sqlalchemy import func
-from db.models import User, Category, Transaction, TransactionType, Session
-
-session = Session()
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy import func, select, tuple_, update
+from db.models import User, Category, Transaction, TransactionType, MonthlyRollup, session_scope
+from money import to_cents, from_cents
+from cache import report_cache
+from records import TransactionRecord, CategoryRecord, select_records, fetch_records, iter_records
+from rollups import RollupHelper
+from budgets import BudgetHelper
+from auth import hash_password, verify_password, verify_unknown_user, needs_rehash, login_throttle, last_logins
+from writebehind import write_behind
+
+# Statement builders and result shaping shared by the sync helpers below and the
+# async ones in async_helpers.py, so both return exactly the same structures
+
+def balances_from_rows(balance, categories):
+    balance = balance or 0
+    categorized = sum(cents for _, cents in categories)
+    return {
+        'balance': from_cents(balance),
+        'categories': [(name, from_cents(cents)) for name, cents in categories],
+        'uncategorized': from_cents(balance - categorized),
+    }
+
+def transactions_page_statement(user_id, page_size=20, cursor=None, order="desc", start_date=None, end_date=None):
+    if order not in ("asc", "desc"):
+        raise ValueError("order must be 'asc' or 'desc'")
+
+    position = tuple_(Transaction.created_at, Transaction.id)
+    query = select_records(TransactionRecord).where(Transaction.user_id == user_id)
+    if start_date:
+        query = query.where(Transaction.created_at >= start_date)
+    if end_date:
+        query = query.where(Transaction.created_at < end_date)
+    if cursor:
+        # Keyset pagination: continue after the last (created_at, id) seen instead of using OFFSET
+        query = query.where(position < tuple_(*cursor) if order == "desc" else position > tuple_(*cursor))
+    if order == "desc":
+        query = query.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+    else:
+        query = query.order_by(Transaction.created_at, Transaction.id)
+    # One extra row tells whether there is a next page
+    return query.limit(page_size + 1)
+
+def split_page(transactions, page_size):
+    next_cursor = None
+    if len(transactions) > page_size:
+        transactions = transactions[:page_size]
+        last = transactions[-1]
+        next_cursor = (last.created_at, last.id)
+    return transactions, next_cursor
+
+def totals_statement(user_id):
+    # Summed from the monthly rollups rather than from every transaction
+    return select(
+        MonthlyRollup.transaction_type,
+        func.sum(MonthlyRollup.total_cents),
+        func.sum(MonthlyRollup.count)
+    ).where(MonthlyRollup.user_id == user_id).group_by(MonthlyRollup.transaction_type)
+
+def totals_from_rows(rows):
+    totals = {'income': Decimal("0.00"), 'expense': Decimal("0.00"), 'count': 0}
+    for trans_type, total_cents, count in rows:
+        totals[trans_type.value] = from_cents(total_cents)
+        totals['count'] += count
+    totals['balance'] = totals['income'] - totals['expense']
+    return totals
+
+def detailed_report_statement(user_id):
+    return select_records(TransactionRecord).where(Transaction.user_id == user_id).order_by(Transaction.created_at.desc())
+
+def detailed_report_from_records(transactions):
+    report = {}
+    for transaction in transactions:
+        month = transaction.created_at.strftime("%Y-%m")
+        if month not in report:
+            report[month] = {
+                'income': [],
+                'expense': [],
+                'totals': {'income': 0, 'expense': 0}
+            }
+        trans_type = transaction.transaction_type.value
+        transaction_data = {
+            'id': transaction.id,
+            'amount': transaction.amount,
+            'description': transaction.description,
+            'date': transaction.created_at.strftime("%Y-%m-%d"),
+            'time': transaction.created_at.strftime("%H:%M")
+        }
+        report[month][trans_type].append(transaction_data)
+        report[month]['totals'][trans_type] += transaction.amount_cents
+
+    for month_data in report.values():
+        for trans_type, cents in month_data['totals'].items():
+            month_data['totals'][trans_type] = from_cents(cents)
+    return report
+
+def monthly_report_statement(user_id, start_date=None, end_date=None, category_id=None):
+    if start_date or end_date:
+        # Arbitrary date ranges cut through months, so aggregate the raw rows
+        month = func.strftime("%Y-%m", Transaction.created_at).label("month")
+        query = select(
+            month,
+            Transaction.transaction_type,
+            func.sum(Transaction.amount_cents).label("total_cents"),
+            func.count(Transaction.id).label("count")
+        ).where(Transaction.user_id == user_id)
+
+        if start_date:
+            query = query.where(Transaction.created_at >= start_date)
+        if end_date:
+            query = query.where(Transaction.created_at < end_date)
+        if category_id is not None:
+            query = query.where(Transaction.category_id == category_id)
+        return query.group_by(month, Transaction.transaction_type)
+
+    # Whole months are already summed in the rollup table: O(months) instead of O(transactions)
+    query = select(
+        MonthlyRollup.month,
+        MonthlyRollup.transaction_type,
+        func.sum(MonthlyRollup.total_cents).label("total_cents"),
+        func.sum(MonthlyRollup.count).label("count")
+    ).where(MonthlyRollup.user_id == user_id)
+
+    if category_id is not None:
+        query = query.where(MonthlyRollup.category_id == category_id)
+    return query.group_by(MonthlyRollup.month, MonthlyRollup.transaction_type)
+
+def category_report_statement(user_id, start_month=None, end_month=None):
+    # Straight off the rollups, which are already one row per month, type and category;
+    # ix_monthly_rollups_key covers the user and month range
+    query = select(
+        MonthlyRollup.month,
+        MonthlyRollup.category_id,
+        Category.name,
+        MonthlyRollup.transaction_type,
+        func.sum(MonthlyRollup.total_cents),
+        func.sum(MonthlyRollup.count)
+    ).outerjoin(Category, Category.id == MonthlyRollup.category_id).where(MonthlyRollup.user_id == user_id)
+
+    if start_month:
+        query = query.where(MonthlyRollup.month >= start_month)
+    if end_month:
+        query = query.where(MonthlyRollup.month <= end_month)
+    return query.group_by(MonthlyRollup.month, MonthlyRollup.category_id, MonthlyRollup.transaction_type)
+
+def rank_categories(entries, top=None):
+    # Biggest spenders first; past the top N the rest fold into one 'Other' row so the totals still add up
+    ranked = sorted(entries.values(), key=lambda e: (-e['expense'], -e['income'], e['category'] or ''))
+    if top is not None and len(ranked) > top:
+        rest = ranked[top:]
+        ranked = ranked[:top] + [{
+            'category': 'Other',
+            'category_id': None,
+            'income': sum(e['income'] for e in rest),
+            'expense': sum(e['expense'] for e in rest),
+            'count': sum(e['count'] for e in rest),
+            'categories': len(rest),
+        }]
+    return [dict(e, income=from_cents(e['income']), expense=from_cents(e['expense']),
+                 net=from_cents(e['income'] - e['expense'])) for e in ranked]
+
+def category_report_from_rows(rows, top=None):
+    months = {}
+    totals = {}
+    for month, category_id, name, trans_type, cents, count in rows:
+        for bucket in (months.setdefault(month, {}), totals):
+            if category_id not in bucket:
+                bucket[category_id] = {'category': name, 'category_id': category_id, 'income': 0, 'expense': 0, 'count': 0}
+            bucket[category_id][trans_type.value] += cents
+            bucket[category_id]['count'] += count
+    return {
+        'months': {month: rank_categories(entries, top) for month, entries in sorted(months.items())},
+        'totals': rank_categories(totals, top),
+    }
+
+def monthly_summary_from_rows(rows):
+    summary = {}
+    for row in rows:
+        if row.month not in summary:
+            summary[row.month] = {
+                'income': Decimal("0.00"),
+                'expense': Decimal("0.00"),
+                'counts': {'income': 0, 'expense': 0}
+            }
+        trans_type = row.transaction_type.value
+        summary[row.month][trans_type] = from_cents(row.total_cents)
+        summary[row.month]['counts'][trans_type] = row.count
+    return summary
 
 class UserHelper:
     @staticmethod
     def create_user(name, email, password):
         try:
-            if session.query(User).filter_by(email=email).first():
-                return None, "Email already exists"
+            with session_scope() as session:
+                if session.query(User).filter_by(email=email).first():
+                    return None, "Email already exists"
 
-            user = User(name=name, email=email, password=password)
-            session.add(user)
-            session.commit()
+                user = User(name=name, email=email, password=hash_password(password))
+                session.add(user)
             return user, "Account created"
         except Exception as e:
-            session.rollback()
             return None, f"Error: {str(e)}"
 
     @staticmethod
     def login_user(email, password):
         try:
-            user = session.query(User).filter_by(email=email, password=password).first()
-            if user:
-                user.last_login = datetime.now()
-                session.commit()
-                return user, "Login successful"
-            return None, "Invalid credentials"
+            retry_after = login_throttle.retry_after(email)
+            if retry_after:
+                return None, f"Too many failed attempts. Try again in {retry_after:.0f}s"
+
+            # Read-only lookup on the unique email index; the hash is checked in Python
+            with session_scope() as session:
+                user = session.query(User).filter_by(email=email).first()
+            if not (verify_password(password, user.password) if user else verify_unknown_user(password)):
+                login_throttle.failure(email)
+                return None, "Invalid credentials"
+
+            login_throttle.reset(email)
+            if needs_rehash(user.password):
+                with session_scope() as session:
+                    user.password = hash_password(password)
+                    session.query(User).filter_by(id=user.id).update({'password': user.password})
+            user.last_login = datetime.now()
+            last_logins.record(user.id, user.last_login)
+            return user, "Login successful"
         except Exception as e:
             return None, f"Error: {str(e)}"
 
     @staticmethod
     def delete_user(user_id):
         try:
-            user = session.query(User).filter_by(id=user_id).first()
-            if user:
+            with session_scope() as session:
+                user = session.query(User).filter_by(id=user_id).first()
+                if not user:
+                    return False, "User not found"
+                # Categories, transactions, rollups, budgets and rules go by ON DELETE CASCADE
                 session.delete(user)
-                session.commit()
-                return True, "Account deleted"
-            return False, "User not found"
+            report_cache.invalidate_user(user_id)
+            return True, "Account deleted"
         except Exception as e:
-            session.rollback()
             return False, f"Error: {str(e)}"
 
+    @staticmethod
+    def get_balances(user_id):
+        # Materialized running balances: no pass over the transaction history
+        with session_scope() as session:
+            balance = session.query(User.balance_cents).filter(User.id == user_id).scalar()
+            categories = session.query(Category.name, Category.balance_cents) \
+                .filter(Category.user_id == user_id).order_by(Category.name).all()
+        return balances_from_rows(balance, categories)
+
 class CategoryHelper:
     @staticmethod
     def create_category(name, user_id):
         try:
-            if session.query(Category).filter_by(name=name, user_id=user_id).first():
-                return None, "Category already exists"
+            with session_scope() as session:
+                if session.query(Category).filter_by(name=name, user_id=user_id).first():
+                    return None, "Category already exists"
 
-            category = Category(name=name, user_id=user_id)
-            session.add(category)
-            session.commit()
+                category = Category(name=name, user_id=user_id)
+                session.add(category)
             return category, "Category created"
         except Exception as e:
-            session.rollback()
             return None, f"Error: {str(e)}"
 
     @staticmethod
     def get_user_categories(user_id):
-        return session.query(Category).filter_by(user_id=user_id).all()
+        with session_scope() as session:
+            return fetch_records(session, CategoryRecord, select_records(CategoryRecord).where(Category.user_id == user_id))
 
     @staticmethod
     def find_category_by_name(name, user_id):
-        return session.query(Category).filter_by(name=name, user_id=user_id).first()
+        with session_scope() as session:
+            return session.query(Category).filter_by(name=name, user_id=user_id).first()
 
     @staticmethod
     def delete_category(name, user_id):
         try:
-            category = session.query(Category).filter_by(name=name, user_id=user_id).first()
-            if category:
+            with session_scope() as session:
+                category = session.query(Category).filter_by(name=name, user_id=user_id).first()
+                if not category:
+                    return False, "Category not found"
+                RollupHelper.forget_category(session, category.id)
                 session.delete(category)
-                session.commit()
-                return True, "Category deleted"
-            return False, "Category not found"
+            report_cache.invalidate_user(user_id)
+            return True, "Category deleted"
         except Exception as e:
-            session.rollback()
             return False, f"Error: {str(e)}"
 
 class TransactionHelper:
     @staticmethod
-    def create_transaction(amount, transaction_type, description, user_id):
+    def create_transaction(amount, transaction_type, description, user_id, category_name=None):
         try:
             if transaction_type.lower() not in ['income', 'expense']:
                 return None, "Invalid type. Use 'income' or 'expense'"
 
             trans_type = TransactionType.INCOME if transaction_type.lower() == 'income' else TransactionType.EXPENSE
 
-            transaction = Transaction(
-                amount=amount,
-                transaction_type=trans_type,
-                description=description,
-                user_id=user_id
-            )
-            session.add(transaction)
-            session.commit()
-            return transaction, "Transaction created"
+            with session_scope() as session:
+                category_id = None
+                if category_name:
+                    category = session.query(Category).filter_by(name=category_name, user_id=user_id).first()
+                    if not category:
+                        return None, "Category not found"
+                    category_id = category.id
+
+                transaction = Transaction(
+                    amount_cents=to_cents(amount),
+                    transaction_type=trans_type,
+                    description=description,
+                    user_id=user_id,
+                    category_id=category_id
+                )
+                session.add(transaction)
+                session.flush()
+                RollupHelper.record(session, [transaction])
+                alerts = BudgetHelper.check(session, transaction)
+            report_cache.invalidate_user(user_id)
+            # Budget alerts go on their own lines after the usual message
+            return transaction, "\n".join(["Transaction created"] + alerts)
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    def queue_transaction(amount, transaction_type, description, user_id, category_name=None):
+        # Write-behind variant of create_transaction: returns a Future of the same
+        # (transaction, message) pair, resolved once the writer thread has committed it.
+        # The row isn't visible to reads until then; call write_behind.flush() to wait.
+        return write_behind.submit(amount, transaction_type, description, user_id, category_name)
+
+    @staticmethod
+    def categorize(user_id, category_name=None, transaction_ids=None, match=None, chunk_size=5000):
+        # Bulk (re)assignment by id and/or description substring; no category name clears it.
+        # Rollups and balances move chunk by chunk, all in one commit
+        try:
+            if not transaction_ids and not match:
+                return None, "Give transaction ids or a description to match"
+            with session_scope() as session:
+                category_id = None
+                if category_name:
+                    category = session.query(Category).filter_by(name=category_name, user_id=user_id).first()
+                    if not category:
+                        return None, "Category not found"
+                    category_id = category.id
+
+                filters = [Transaction.category_id.is_distinct_from(category_id)]
+                if match:
+                    filters.append(Transaction.description.icontains(match, autoescape=True))
+                scan = select(Transaction.id).where(Transaction.user_id == user_id, *filters)
+                # user_id + 0 keeps SQLite on the primary key for each chunk instead of
+                # walking the user's whole history through ix_transactions_user_id_description
+                query = select(
+                    Transaction.id, Transaction.user_id, Transaction.created_at, Transaction.transaction_type,
+                    Transaction.amount_cents, Transaction.category_id
+                ).where(Transaction.user_id + 0 == user_id, *filters)
+
+                moved = 0
+                for chunk in categorize_chunks(session, scan, transaction_ids, chunk_size):
+                    rows = [SimpleNamespace(**row._mapping) for row in session.execute(query.where(chunk))]
+                    if not rows:
+                        continue
+                    RollupHelper.record(session, rows, sign=-1)
+                    session.execute(update(Transaction).where(chunk, query.whereclause).values(category_id=category_id))
+                    for row in rows:
+                        row.category_id = category_id
+                    RollupHelper.record(session, rows)
+                    moved += len(rows)
+            report_cache.invalidate_user(user_id)
+            return moved, f"{'Categorized' if category_name else 'Uncategorized'} {moved} transactions"
         except Exception as e:
-            session.rollback()
             return None, f"Error: {str(e)}"
 
     @staticmethod
     def get_user_transactions(user_id):
-        return session.query(Transaction).filter_by(user_id=user_id).all()
+        with session_scope() as session:
+            return fetch_records(session, TransactionRecord, select_records(TransactionRecord).where(Transaction.user_id == user_id))
+
+    @staticmethod
+    def iter_user_transactions(user_id, batch_size=1000):
+        with session_scope() as session:
+            query = select_records(TransactionRecord).where(Transaction.user_id == user_id) \
+                .order_by(Transaction.created_at, Transaction.id)
+            for transaction in iter_records(session, TransactionRecord, query, batch_size):
+                yield transaction
+
+    @staticmethod
+    def get_transactions_page(user_id, page_size=20, cursor=None, order="desc", start_date=None, end_date=None):
+        query = transactions_page_statement(user_id, page_size, cursor, order, start_date, end_date)
+        with session_scope() as session:
+            transactions = fetch_records(session, TransactionRecord, query)
+        return split_page(transactions, page_size)
+
+    @staticmethod
+    def get_transaction_totals(user_id):
+        with session_scope() as session:
+            rows = session.execute(totals_statement(user_id)).all()
+        return totals_from_rows(rows)
 
     @staticmethod
     def find_transaction_by_description(description, user_id):
-        return session.query(Transaction).filter_by(description=description, user_id=user_id).first()
+        with session_scope() as session:
+            return session.query(Transaction).filter_by(description=description, user_id=user_id).first()
 
     @staticmethod
     def delete_transaction(description, user_id):
         try:
-            transaction = session.query(Transaction).filter_by(description=description, user_id=user_id).first()
-            if transaction:
+            with session_scope() as session:
+                transaction = session.query(Transaction).filter_by(description=description, user_id=user_id).first()
+                if not transaction:
+                    return False, "Transaction not found"
+                RollupHelper.record(session, [transaction], sign=-1)
                 session.delete(transaction)
-                session.commit()
-                return True, "Transaction deleted"
-            return False, "Transaction not found"
+            report_cache.invalidate_user(user_id)
+            return True, "Transaction deleted"
         except Exception as e:
-            session.rollback()
             return False, f"Error: {str(e)}"
 
     @staticmethod
     def get_detailed_monthly_report(user_id):
-        session = Session()
+        cached = report_cache.get(user_id, ('detailed',))
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
         try:
-            transactions = session.query(Transaction).filter_by(user_id=user_id).order_by(Transaction.created_at.desc()).all()
-            report = {}
-
-            for transaction in transactions:
-                month = transaction.created_at.strftime("%Y-%m")
-                if month not in report:
-                    report[month] = {
-                        'income': [],
-                        'expense': [],
-                        'totals': {'income': 0.0, 'expense': 0.0}
-                    }
-                trans_type = transaction.transaction_type.value
-                transaction_data = {
-                    'id': transaction.id,
-                    'amount': float(transaction.amount),
-                    'description': transaction.description,
-                    'date': transaction.created_at.strftime("%Y-%m-%d"),
-                    'time': transaction.created_at.strftime("%H:%M")
-                }
-                report[month][trans_type].append(transaction_data)
-                report[month]['totals'][trans_type] += float(transaction.amount)
-
+            with session_scope() as session:
+                transactions = fetch_records(session, TransactionRecord, detailed_report_statement(user_id))
+            report = detailed_report_from_records(transactions)
+            report_cache.put(user_id, ('detailed',), report, generation)
             return report
         except Exception as e:
             print(f"Error generating monthly report: {str(e)}")
             return {}
-        finally:
-            session.close()
 
     @staticmethod
-    def get_monthly_report(user_id):
-        session = Session()
+    def get_category_report(user_id, start_month=None, end_month=None, top=None):
+        cache_key = ('categories', start_month, end_month, top)
+        cached = report_cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
+        try:
+            with session_scope() as session:
+                rows = session.execute(category_report_statement(user_id, start_month, end_month)).all()
+            report = category_report_from_rows(rows, top)
+            report_cache.put(user_id, cache_key, report, generation)
+            return report
+        except Exception as e:
+            print(f"Error generating category report: {str(e)}")
+            return {'months': {}, 'totals': []}
+
+    @staticmethod
+    def get_monthly_report(user_id, start_date=None, end_date=None, category_id=None):
+        cache_key = ('monthly', start_date, end_date, category_id)
+        cached = report_cache.get(user_id, cache_key)
+        if cached is not None:
+            return cached
+        generation = report_cache.generation(user_id)
         try:
-            transactions = session.query(Transaction).filter_by(user_id=user_id).all()
-            summary = {}
-            for transaction in transactions:
-                month = transaction.created_at.strftime("%Y-%m")
-                if month not in summary:
-                    summary[month] = {'income': 0.0, 'expense': 0.0}
-                trans_type = transaction.transaction_type.value
-                summary[month][trans_type] += float(transaction.amount)
+            with session_scope() as session:
+                rows = session.execute(monthly_report_statement(user_id, start_date, end_date, category_id)).all()
+            summary = monthly_summary_from_rows(rows)
+            report_cache.put(user_id, cache_key, summary, generation)
             return summary
         except Exception as e:
             print(f"Error generating summary report: {str(e)}")
             return {}
-        finally:
-            session.close()
+
+def categorize_chunks(session, scan, transaction_ids=None, chunk_size=5000):
+    # Id conditions, a chunk of rows each: the given ids 500 at a time, or for a
+    # description match one indexed pass for the ids and then primary key ranges
+    if transaction_ids:
+        ids = sorted(set(transaction_ids))
+        for i in range(0, len(ids), 500):
+            yield Transaction.id.in_(ids[i:i + 500])
+        return
+    ids = session.scalars(scan.order_by(Transaction.id)).all()
+    for i in range(0, len(ids), chunk_size):
+        yield Transaction.id.between(ids[i], ids[min(i + chunk_size, len(ids)) - 1])
 
 class DisplayHelper:
     @staticmethod
@@ -200,29 +504,48 @@ class DisplayHelper:
 
     @staticmethod
     def display_transactions(transactions):
-        if not transactions:
+        income, expenses = [], []
+        income_cents = expense_cents = 0
+        for t in transactions:
+            if t.transaction_type == TransactionType.INCOME:
+                income.append(t)
+                income_cents += t.amount_cents
+            else:
+                expenses.append(t)
+                expense_cents += t.amount_cents
+
+        if not income and not expenses:
             print("No transactions found.")
             return
 
-        income = [t for t in transactions if t.transaction_type == TransactionType.INCOME]
-        expenses = [t for t in transactions if t.transaction_type == TransactionType.EXPENSE]
-        print(f"Transactions ({len(transactions)}):")
+        print(f"Transactions ({len(income) + len(expenses)}):")
+        total_income, total_expenses = from_cents(income_cents), from_cents(expense_cents)
 
         if income:
-            total_income = sum(float(t.amount) for t in income)
             print(f"\n INCOME: ${total_income:.2f}")
             for t in income:
                 print(f"  • ${t.amount:.2f} - {t.description}")
 
         if expenses:
-            total_expenses = sum(float(t.amount) for t in expenses)
             print(f"\n EXPENSES: ${total_expenses:.2f}")
             for t in expenses:
                 print(f"  • ${t.amount:.2f} - {t.description}")
 
-        if income or expenses:
-            balance = sum(float(t.amount) for t in income) - sum(float(t.amount) for t in expenses)
-            print(f"\n Balance: ${balance:.2f}")
+        print(f"\n Balance: ${total_income - total_expenses:.2f}")
+
+    @staticmethod
+    def display_transaction_totals(totals):
+        if not totals['count']:
+            print("No transactions found.")
+            return
+        print(f"Transactions ({totals['count']}):")
+        print(f" INCOME: ${totals['income']:.2f} | EXPENSES: ${totals['expense']:.2f} | Balance: ${totals['balance']:.2f}")
+
+    @staticmethod
+    def display_transaction_page(transactions, page_number):
+        print(f"\n--- Page {page_number} ---")
+        for t in transactions:
+            print(f"  • {DisplayHelper.format_datetime(t.created_at)} | {t.transaction_type.value:<7} | ${t.amount:.2f} - {t.description}")
 
     @staticmethod
     def display_detailed_report(report):
@@ -286,6 +609,80 @@ class DisplayHelper:
             net = income - expense
             print(f"\n📅 {month} | Income: ${income:.2f} | Expenses: ${expense:.2f} | Net: ${net:.2f}")
 
+    @staticmethod
+    def display_category_report(report):
+        if not report['totals']:
+            print("No transactions found for category report.")
+            return
+
+        def show(entries):
+            for e in entries:
+                name = e['category'] or '(uncategorized)'
+                if 'categories' in e:
+                    name = f"{name} ({e['categories']} categories)"
+                print(f"  • {name:<28} Expenses: ${e['expense']:>10.2f} | Income: ${e['income']:>10.2f} | {e['count']} transactions")
+
+        print("\n--- CATEGORY BREAKDOWN ---")
+        for month in sorted(report['months'], reverse=True):
+            print(f"\n📅 {month}")
+            show(report['months'][month])
+        print("\nAll months:")
+        show(report['totals'])
+
+    @staticmethod
+    def display_balances(balances):
+        print(f"\n--- Balance: ${balances['balance']:.2f} ---")
+        for name, balance in balances['categories']:
+            print(f"  • {name}: ${balance:.2f}")
+        if balances['categories']:
+            print(f"  • (uncategorized): ${balances['uncategorized']:.2f}")
+
+    @staticmethod
+    def display_budgets(statuses):
+        if not statuses:
+            print("No budgets set for this month.")
+            return
+        print(f"\n--- Budgets {statuses[0]['month']} ---")
+        for status in statuses:
+            flag = " OVER BUDGET" if status['over'] else ""
+            print(f"  • {status['category'] or 'All expenses'}: ${status['spent']:.2f} of ${status['limit']:.2f} "
+                  f"(${status['remaining']:.2f} left){flag}")
+
+    @staticmethod
+    def display_recurring_rules(rules):
+        if not rules:
+            print("No recurring transactions.")
+            return
+        print("\n--- Recurring Transactions ---")
+        for rule in rules:
+            every = rule.frequency.value if rule.interval == 1 else f"every {rule.interval} x {rule.frequency.value}"
+            next_run = DisplayHelper.format_datetime(rule.next_run) if rule.next_run else "ended"
+            print(f"  • #{rule.id} {rule.transaction_type.value:<7} ${rule.amount:.2f} - {rule.description} "
+                  f"({every}, next: {next_run})")
+
+    @staticmethod
+    def display_search_results(results, page, has_more):
+        if not results:
+            print("No matching transactions." if page == 1 else "No more matches.")
+            return
+        print(f"\n--- Matches (page {page}) ---")
+        for t in results:
+            print(f"  • {DisplayHelper.format_datetime(t.created_at)} | {t.transaction_type.value:<7} | ${t.amount:.2f} - {t.description}")
+        if has_more:
+            print("  ... more matches on the next page")
+
+    @staticmethod
+    def display_import_report(report):
+        print("\n--- IMPORT REPORT ---")
+        print(f"Imported: {report['imported']} rows in {report['batches']} batches")
+        print(f"Time: {report['seconds']:.2f}s ({report['rows_per_sec']:.0f} rows/sec)")
+        if report['rejected']:
+            print(f"Rejected: {len(report['rejected'])} rows")
+            for line_no, reason in report['rejected'][:20]:
+                print(f"  • line {line_no}: {reason}")
+            if len(report['rejected']) > 20:
+                print(f"  ... and {len(report['rejected']) - 20} more")
+
 
 def get_valid_input(prompt, input_type=str, validation_func=None):
     while True:
@@ -0,0 +1,203 @@
+import csv
+import os
+import re
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert
+from db.models import Category, Transaction, TransactionType, session_scope
+from money import to_cents
+from rollups import RollupHelper
+from cache import report_cache
+
+DEFAULT_BATCH_SIZE = 500
+DATE_FORMATS = ("%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S", "%Y%m%d%H%M%S", "%Y%m%d", "%m/%d/%Y", "%m/%d/%y")
+
+CSV_COLUMNS = {
+    'amount': 'amount',
+    'type': 'type',
+    'transaction_type': 'type',
+    'description': 'description',
+    'memo': 'description',
+    'name': 'description',
+    'payee': 'description',
+    'date': 'date',
+    'created_at': 'date',
+    'category': 'category',
+}
+
+OFX_TAG = re.compile(r"<(/?)(\w+)>([^<]*)")
+
+def read_csv_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        for raw in reader:
+            row = {}
+            for key, value in raw.items():
+                field = CSV_COLUMNS.get((key or '').strip().lower())
+                if field and value is not None:
+                    row[field] = value.strip()
+            yield reader.line_num, row
+
+def read_ofx_rows(path):
+    row = None
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line_no, line in enumerate(f, 1):
+            for closing, tag, value in OFX_TAG.findall(line):
+                tag = tag.upper()
+                if tag == 'STMTTRN':
+                    if closing and row is not None:
+                        yield line_no, row
+                        row = None
+                    elif not closing:
+                        row = {}
+                elif row is not None and not closing:
+                    value = value.strip()
+                    if tag == 'TRNAMT':
+                        row['amount'] = value
+                    elif tag == 'DTPOSTED':
+                        # OFX dates look like 20250603120000.000[-5:EST]
+                        row['date'] = re.match(r"\d*", value).group()[:14]
+                    elif tag == 'NAME' or (tag == 'MEMO' and 'description' not in row):
+                        row['description'] = value
+
+def read_qif_rows(path):
+    row = {}
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip('\r\n')
+            if not line or line.startswith('!'):
+                continue
+            code, value = line[0], line[1:].strip()
+            if code == '^':
+                if row:
+                    yield line_no, row
+                row = {}
+            elif code == 'D':
+                row['date'] = value.replace("'", "/").replace(' ', '')
+            elif code in ('T', 'U'):
+                row['amount'] = value
+            elif code == 'P' or (code == 'M' and 'description' not in row):
+                row['description'] = value
+            elif code == 'L':
+                row['category'] = value
+
+READERS = {
+    'csv': read_csv_rows,
+    'ofx': read_ofx_rows,
+    'qfx': read_ofx_rows,
+    'qif': read_qif_rows,
+}
+
+def parse_date(value):
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+class ImportHelper:
+    @staticmethod
+    def parse_row(row):
+        # Same rules as get_valid_input and validate_transaction_type
+        amount = row.get('amount', '').replace(',', '').replace('$', '')
+        description = row.get('description', '')
+        if not amount or not description:
+            return None, "Input cannot be empty."
+
+        try:
+            amount = Decimal(amount)
+        except InvalidOperation:
+            return None, "Invalid float."
+        if not amount.is_finite():
+            return None, "Invalid float."
+
+        trans_type = row.get('type', '')
+        if trans_type:
+            if trans_type.lower() not in ['income', 'expense']:
+                return None, "Type must be 'income' or 'expense'."
+        else:
+            # Bank statements sign the amount instead of naming the type
+            trans_type = 'expense' if amount < 0 else 'income'
+            amount = abs(amount)
+
+        if amount <= 0:
+            return None, "Amount must be > 0."
+
+        created_at = datetime.now()
+        if row.get('date'):
+            created_at = parse_date(row['date'])
+            if created_at is None:
+                return None, f"Invalid date: {row['date']}"
+
+        return {
+            'amount_cents': to_cents(amount),
+            'transaction_type': TransactionType.INCOME if trans_type.lower() == 'income' else TransactionType.EXPENSE,
+            'description': description,
+            'created_at': created_at,
+            'category': row.get('category') or None,
+        }, None
+
+    @staticmethod
+    def import_file(path, user_id, batch_size=DEFAULT_BATCH_SIZE, file_format=None, create_categories=True):
+        file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+        if file_format not in READERS:
+            return None, f"Unsupported format '{file_format}'. Use one of: {', '.join(sorted(READERS))}"
+        if batch_size < 1:
+            return None, "Batch size must be at least 1"
+
+        report = {'imported': 0, 'rejected': [], 'batches': 0, 'seconds': 0.0, 'rows_per_sec': 0.0}
+        started = time.perf_counter()
+        try:
+            with session_scope() as session:
+                categories = {
+                    name.lower(): category_id
+                    for category_id, name in session.query(Category.id, Category.name).filter_by(user_id=user_id)
+                }
+
+                def category_id_for(name):
+                    if not name:
+                        return None
+                    if name.lower() not in categories and create_categories:
+                        category = Category(name=name, user_id=user_id)
+                        session.add(category)
+                        session.flush()
+                        categories[name.lower()] = category.id
+                    return categories.get(name.lower())
+
+                batch = []
+                for line_no, row in READERS[file_format](path):
+                    values, error = ImportHelper.parse_row(row)
+                    if error:
+                        report['rejected'].append((line_no, error))
+                        continue
+                    values['category_id'] = category_id_for(values.pop('category'))
+                    values['user_id'] = user_id
+                    batch.append(values)
+
+                    if len(batch) >= batch_size:
+                        ImportHelper._insert_batch(session, batch, report)
+                        batch = []
+                if batch:
+                    ImportHelper._insert_batch(session, batch, report)
+        except Exception as e:
+            return report, f"Error: {str(e)}"
+        finally:
+            # Batches commit as they go, so even a failed import may have added rows
+            report_cache.invalidate_user(user_id)
+            report['seconds'] = time.perf_counter() - started
+            if report['seconds'] > 0:
+                report['rows_per_sec'] = report['imported'] / report['seconds']
+
+        return report, f"Imported {report['imported']} transactions, rejected {len(report['rejected'])}"
+
+    @staticmethod
+    def _insert_batch(session, batch, report):
+        # One executemany and one commit per batch instead of a commit per row
+        session.execute(insert(Transaction), batch)
+        RollupHelper.record(session, [SimpleNamespace(**values) for values in batch])
+        session.commit()
+        report['imported'] += len(batch)
+        report['batches'] += 1
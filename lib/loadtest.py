@@ -0,0 +1,157 @@
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Load test for server.py. With no URL it starts its own server on a scratch
+# database in a child process, so client and server don't share a GIL.
+
+LIB_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+class Client:
+    # One keep-alive connection per simulated user
+    def __init__(self, host, port):
+        self.connection = http.client.HTTPConnection(host, port, timeout=60)
+        self.token = None
+        self.etags = {}
+
+    def request(self, method, path, body=None, conditional=False):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f"Bearer {self.token}"
+        if conditional and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        self.connection.request(method, path, json.dumps(body) if body is not None else None, headers)
+        response = self.connection.getresponse()
+        data = response.read()
+        if response.getheader('ETag'):
+            self.etags[path] = response.getheader('ETag')
+        return response.status, json.loads(data) if data else None
+
+    def close(self):
+        self.connection.close()
+
+def start_server(database):
+    env = dict(os.environ, FINANCE_TRACKER_DB=database)
+    subprocess.run([sys.executable, os.path.join(LIB_DIR, 'db', 'migrate.py'), 'init'],
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+    process = subprocess.Popen([sys.executable, os.path.join(LIB_DIR, 'server.py'), '0', '127.0.0.1', '--quiet'],
+                               env=env, stdout=subprocess.PIPE, text=True)
+    # server.py prints its address once it is listening
+    address = process.stdout.readline().strip().rsplit('/', 1)[-1]
+    host, port = address.rsplit(':', 1)
+    return process, host, int(port)
+
+def workload(i):
+    # A dashboard-style mix: one write, then lists and reports, with the reports
+    # re-polled after the write so some revalidations come back 304
+    kind = i % 10
+    if kind == 0:
+        return 'POST', '/transactions', {'amount': 5 + i % 50, 'type': 'expense' if i % 3 else 'income',
+                                         'description': f"load {i}"}, False
+    if kind in (1, 6):
+        return 'GET', '/transactions?limit=20', None, False
+    if kind in (2, 4):
+        return 'GET', '/reports/summary', None, True
+    if kind == 3:
+        return 'GET', '/balance', None, False
+    if kind == 5:
+        return 'GET', '/reports/totals', None, False
+    if kind == 8:
+        return 'GET', '/categories', None, False
+    return 'GET', '/reports/detailed', None, True
+
+def setup_client(client, index, warmup):
+    email = f"load{index}-{time.time_ns()}@example.com"
+    status, body = client.request('POST', '/users', {'name': f"Load {index}", 'email': email, 'password': 'load'})
+    if status != 201:
+        return status
+    client.token = body['token']
+    client.request('POST', '/categories', {'name': 'Groceries'})
+    for i in range(warmup):
+        client.request('POST', '/transactions', {'amount': 10 + i, 'type': 'expense', 'description': f"seed {i}"})
+    return status
+
+def run_client(host, port, index, requests, warmup, barrier, results):
+    client = Client(host, port)
+    try:
+        try:
+            status = setup_client(client, index, warmup)
+        finally:
+            # Every client starts the measured phase together, after all the seeding
+            barrier.wait()
+        if status != 201:
+            results.append(('setup', status, 0.0))
+            return
+
+        for i in range(requests):
+            method, path, payload, conditional = workload(i)
+            started = time.perf_counter()
+            status, _ = client.request(method, path, payload, conditional)
+            results.append((f"{method} {path.split('?')[0]}", status, time.perf_counter() - started))
+    except (OSError, http.client.HTTPException) as e:
+        print(f"Client {index}: {e}", file=sys.stderr)
+        results.append(('error', 599, 0.0))
+    finally:
+        client.close()
+
+def run_load_test(url=None, clients=20, requests_per_client=200, warmup=50):
+    process = None
+    if url:
+        parts = urlsplit(url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        database = os.path.join(tempfile.mkdtemp(prefix="finance_load_"), 'load.db')
+        process, host, port = start_server(database)
+        print(f"Started server on {host}:{port} with {database}")
+
+    try:
+        results = []
+        barrier = threading.Barrier(clients + 1)
+        threads = [threading.Thread(target=run_client, args=(host, port, i, requests_per_client, warmup, barrier, results))
+                   for i in range(clients)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    measured = [r for r in results if r[0] not in ('setup', 'error')]
+    latencies = [r[2] * 1000 for r in measured]
+    errors = sum(1 for r in results if r[1] >= 400)
+    not_modified = sum(1 for r in measured if r[1] == 304)
+    print(f"\n{clients} clients x {requests_per_client} requests ({warmup} seed writes each) in {seconds:.2f}s")
+    print(f"{len(measured) / seconds:.0f} req/s, "
+          f"p50 {percentile(latencies, 50):.2f} ms, p99 {percentile(latencies, 99):.2f} ms, "
+          f"max {max(latencies, default=0):.2f} ms, {errors} errors, {not_modified} not modified")
+
+    print(f"\n{'endpoint':<24} {'count':>6} {'p50 ms':>9} {'p99 ms':>9}")
+    for endpoint in sorted({r[0] for r in measured}):
+        samples = [r[2] * 1000 for r in measured if r[0] == endpoint]
+        print(f"{endpoint:<24} {len(samples):>6} {percentile(samples, 50):>9.2f} {percentile(samples, 99):>9.2f}")
+    return errors == 0
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    url = args.pop(0) if args and args[0].startswith('http') else None
+    if args and not args[0].isdigit():
+        print("Usage: python loadtest.py [http://host:port] [clients] [requests per client] [seed writes per client]")
+        sys.exit(2)
+    sys.exit(0 if run_load_test(url, *[int(arg) for arg in args[:3]]) else 1)
@@ -0,0 +1,8 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+def to_cents(amount):
+    # str() first so floats typed at the prompt round the way they read (0.1 -> 10, not 9)
+    return int((Decimal(str(amount)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+def from_cents(cents):
+    return Decimal(cents or 0).scaleb(-2)
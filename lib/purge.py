@@ -0,0 +1,109 @@
+import os
+import secrets
+import threading
+import time
+from sqlalchemy import delete, func, select
+from db.models import Category, Transaction, User, session_scope
+from helpers import UserHelper, CategoryHelper
+
+# Chunked deletes for accounts and categories too big to drop in one transaction.
+# Each chunk of transactions is its own commit, so the write lock is released in
+# between and other writers get in; the owner row goes last and ON DELETE CASCADE
+# takes what is left (rollups, budgets, rules). Reports and balances keep counting
+# the deleted rows until that last step. An interrupted purge can simply be rerun.
+
+DELETE_CHUNK_SIZE = int(os.environ.get('FINANCE_TRACKER_DELETE_CHUNK_SIZE', 1000))
+
+class PurgeJob:
+    def __init__(self, kind, user_id, category_name=None, chunk_size=DELETE_CHUNK_SIZE, progress=None):
+        self.id = secrets.token_urlsafe(12)
+        self.kind = kind
+        self.user_id = user_id
+        self.category_name = category_name
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.thread = None
+        self.status = {'id': self.id, 'kind': kind, 'deleted': 0, 'total': 0, 'chunks': 0,
+                       'done': False, 'success': False, 'message': None, 'seconds': 0.0}
+
+    def _owner(self, session):
+        if self.kind == 'user':
+            if session.query(User.id).filter(User.id == self.user_id).first() is None:
+                return None
+            return Transaction.user_id == self.user_id
+        category_id = session.query(Category.id).filter_by(name=self.category_name, user_id=self.user_id).scalar()
+        if category_id is None:
+            return None
+        return Transaction.category_id == category_id
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            with session_scope() as session:
+                owner = self._owner(session)
+                if owner is not None:
+                    self.status['total'] = session.query(func.count(Transaction.id)).filter(owner).scalar()
+            if owner is None:
+                self.status['message'] = "User not found" if self.kind == 'user' else "Category not found"
+                return self.status
+
+            while True:
+                with session_scope() as session:
+                    chunk = select(Transaction.id).where(owner).limit(self.chunk_size).scalar_subquery()
+                    deleted = session.execute(delete(Transaction).where(Transaction.id.in_(chunk))).rowcount
+                if not deleted:
+                    break
+                self.status['deleted'] += deleted
+                self.status['chunks'] += 1
+                if self.progress:
+                    self.progress(dict(self.status))
+
+            if self.kind == 'user':
+                success, msg = UserHelper.delete_user(self.user_id)
+            else:
+                success, msg = CategoryHelper.delete_category(self.category_name, self.user_id)
+            self.status['success'], self.status['message'] = success, msg
+        except Exception as e:
+            self.status['message'] = f"Error: {str(e)}"
+        finally:
+            self.status['seconds'] = time.perf_counter() - started
+            self.status['done'] = True
+        return self.status
+
+    def start(self):
+        # Not a daemon: a process that is exiting still finishes the purge it started
+        self.thread = threading.Thread(target=self.run, name=f"purge-{self.kind}-{self.user_id}")
+        self.thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return dict(self.status)
+
+# Started jobs by id, so a server can report progress on a later request
+jobs = {}
+jobs_lock = threading.Lock()
+
+class PurgeHelper:
+    @staticmethod
+    def purge_user(user_id, chunk_size=DELETE_CHUNK_SIZE, progress=None, background=False):
+        return PurgeHelper._launch(PurgeJob('user', user_id, None, chunk_size, progress), background)
+
+    @staticmethod
+    def purge_category(name, user_id, chunk_size=DELETE_CHUNK_SIZE, progress=None, background=False):
+        return PurgeHelper._launch(PurgeJob('category', user_id, name, chunk_size, progress), background)
+
+    @staticmethod
+    def get_job(job_id):
+        with jobs_lock:
+            return jobs.get(job_id)
+
+    @staticmethod
+    def _launch(job, background):
+        if not background:
+            job.run()
+            return job
+        with jobs_lock:
+            jobs[job.id] = job
+        return job.start()
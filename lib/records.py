@@ -0,0 +1,72 @@
+from sqlalchemy import select
+from db.models import Category, Transaction, isoformat
+from money import from_cents
+
+# Read-only rows for listings and reports: plain column projections, no identity
+# map, no change tracking, no per-instance __dict__
+
+class TransactionRecord:
+    __slots__ = ('id', 'amount_cents', 'transaction_type', 'description', 'user_id', 'category_id', 'created_at')
+    columns = (Transaction.id, Transaction.amount_cents, Transaction.transaction_type, Transaction.description,
+               Transaction.user_id, Transaction.category_id, Transaction.created_at)
+
+    def __init__(self, id, amount_cents, transaction_type, description, user_id, category_id, created_at):
+        self.id = id
+        self.amount_cents = amount_cents
+        self.transaction_type = transaction_type
+        self.description = description
+        self.user_id = user_id
+        self.category_id = category_id
+        self.created_at = created_at
+
+    @property
+    def amount(self):
+        return from_cents(self.amount_cents)
+
+    def __repr__(self):
+        return f"<TransactionRecord(amount={self.amount}, type='{self.transaction_type}', description='{self.description}')>"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'amount': str(self.amount),
+            'amount_cents': self.amount_cents,
+            'transaction_type': self.transaction_type.value,
+            'description': self.description,
+            'user_id': self.user_id,
+            'category_id': self.category_id,
+            'created_at': isoformat(self.created_at)
+        }
+
+class CategoryRecord:
+    __slots__ = ('id', 'name', 'user_id', 'created_at')
+    columns = (Category.id, Category.name, Category.user_id, Category.created_at)
+
+    def __init__(self, id, name, user_id, created_at):
+        self.id = id
+        self.name = name
+        self.user_id = user_id
+        self.created_at = created_at
+
+    def __repr__(self):
+        return f"<CategoryRecord(name='{self.name}', created_at='{self.created_at}')>"
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'user_id': self.user_id,
+            'created_at': isoformat(self.created_at)
+        }
+
+def select_records(record_class):
+    return select(*record_class.columns)
+
+def fetch_records(session, record_class, statement):
+    return [record_class(*row) for row in session.execute(statement)]
+
+def iter_records(session, record_class, statement, batch_size=1000):
+    # Streams rows from the cursor in batches instead of buffering the whole result
+    result = session.execute(statement.execution_options(yield_per=batch_size))
+    for row in result:
+        yield record_class(*row)
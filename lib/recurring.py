@@ -0,0 +1,173 @@
+import calendar
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import insert, update, bindparam
+from db.models import Category, RecurringRule, RecurringFrequency, Transaction, TransactionType, session_scope
+from money import to_cents
+from rollups import RollupHelper
+from cache import report_cache
+
+RRULE_FREQUENCIES = {f.name: f for f in RecurringFrequency}
+
+def add_months(value, months):
+    # Clamp to the month's last day, counted from the original date so Jan 31 -> Feb 28 -> Mar 31
+    index = value.year * 12 + value.month - 1 + months
+    year, month = divmod(index, 12)
+    return value.replace(year=year, month=month + 1, day=min(value.day, calendar.monthrange(year, month + 1)[1]))
+
+def occurrence(rule, n):
+    # The n-th occurrence (0 = start_date), always derived from the start so months never drift
+    steps = n * rule.interval
+    if rule.frequency == RecurringFrequency.DAILY:
+        return rule.start_date + timedelta(days=steps)
+    if rule.frequency == RecurringFrequency.WEEKLY:
+        return rule.start_date + timedelta(weeks=steps)
+    if rule.frequency == RecurringFrequency.MONTHLY:
+        return add_months(rule.start_date, steps)
+    return add_months(rule.start_date, 12 * steps)
+
+def next_run_after(rule, n):
+    when = occurrence(rule, n)
+    if rule.end_date is not None and when > rule.end_date:
+        return None
+    return when
+
+def parse_rrule(text):
+    # The subset of RFC 5545 RRULE we store: FREQ, INTERVAL and UNTIL (date or date-time)
+    fields = {}
+    for part in text.strip().upper().split(';'):
+        name, _, value = part.partition('=')
+        fields[name.strip()] = value.strip()
+    frequency = RRULE_FREQUENCIES.get(fields.get('FREQ', ''))
+    if frequency is None:
+        raise ValueError("RRULE needs FREQ=DAILY, WEEKLY, MONTHLY or YEARLY")
+    interval = int(fields.get('INTERVAL', 1))
+    until = fields.get('UNTIL')
+    if until:
+        until = datetime.strptime(until.rstrip('Z'), "%Y%m%dT%H%M%S" if 'T' in until else "%Y%m%d")
+    return frequency, interval, until or None
+
+class RecurringHelper:
+    @staticmethod
+    def create_rule(user_id, amount, transaction_type, description, frequency, start_date=None,
+                    interval=1, end_date=None, category_name=None):
+        try:
+            if transaction_type.lower() not in ['income', 'expense']:
+                return None, "Invalid type. Use 'income' or 'expense'"
+            if frequency.upper().startswith('FREQ='):
+                try:
+                    frequency, interval, until = parse_rrule(frequency)
+                except ValueError as e:
+                    return None, f"Invalid RRULE: {e}"
+                end_date = end_date or until
+            elif frequency.upper() in RRULE_FREQUENCIES:
+                frequency = RRULE_FREQUENCIES[frequency.upper()]
+            else:
+                return None, "Invalid frequency. Use daily, weekly, monthly, yearly or an RRULE like FREQ=MONTHLY;INTERVAL=1"
+            if interval < 1:
+                return None, "Interval must be at least 1"
+            amount_cents = to_cents(amount)
+            if amount_cents <= 0:
+                return None, "Amount must be > 0"
+            start_date = start_date or datetime.now()
+            if end_date is not None and end_date < start_date:
+                return None, "End date is before the start date"
+
+            with session_scope() as session:
+                category_id = None
+                if category_name:
+                    category = session.query(Category).filter_by(name=category_name, user_id=user_id).first()
+                    if not category:
+                        return None, "Category not found"
+                    category_id = category.id
+
+                rule = RecurringRule(
+                    user_id=user_id,
+                    category_id=category_id,
+                    description=description,
+                    amount_cents=amount_cents,
+                    transaction_type=TransactionType.INCOME if transaction_type.lower() == 'income' else TransactionType.EXPENSE,
+                    frequency=frequency,
+                    interval=interval,
+                    start_date=start_date,
+                    end_date=end_date,
+                    occurrences=0,
+                    next_run=start_date
+                )
+                session.add(rule)
+            return rule, "Recurring transaction created"
+        except Exception as e:
+            return None, f"Error: {str(e)}"
+
+    @staticmethod
+    def get_user_rules(user_id):
+        with session_scope() as session:
+            return session.query(RecurringRule).filter_by(user_id=user_id).order_by(RecurringRule.id).all()
+
+    @staticmethod
+    def delete_rule(rule_id, user_id):
+        # Transactions already materialized stay; ON DELETE SET NULL unlinks them from the rule
+        try:
+            with session_scope() as session:
+                rule = session.query(RecurringRule).filter_by(id=rule_id, user_id=user_id).first()
+                if not rule:
+                    return False, "Recurring transaction not found"
+                session.delete(rule)
+            return True, "Recurring transaction deleted"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    @staticmethod
+    def run_due(now=None, user_id=None):
+        # One pass over every due rule: a single executemany insert for all occurrences,
+        # rollups, and the rules' new positions, all committed together. A rule's position
+        # only moves in the same commit as its rows, so re-running (or running again after
+        # downtime) never creates an occurrence twice; the unique index backs that up.
+        now = now or datetime.now()
+        report = {'rules': 0, 'created': 0, 'users': 0, 'seconds': 0.0}
+        started = time.perf_counter()
+        users = set()
+        try:
+            with session_scope() as session:
+                query = session.query(RecurringRule).filter(RecurringRule.next_run <= now)
+                if user_id is not None:
+                    query = query.filter(RecurringRule.user_id == user_id)
+                rules = query.all()
+                rows, positions = [], []
+                for rule in rules:
+                    n = rule.occurrences
+                    when = rule.next_run
+                    while when is not None and when <= now:
+                        rows.append({
+                            'amount_cents': rule.amount_cents,
+                            'transaction_type': rule.transaction_type,
+                            'description': rule.description,
+                            'user_id': rule.user_id,
+                            'category_id': rule.category_id,
+                            'created_at': when,
+                            'recurring_rule_id': rule.id,
+                        })
+                        n += 1
+                        when = next_run_after(rule, n)
+                    positions.append({'rule_id': rule.id, 'seen': rule.occurrences, 'occurrences': n, 'next_run': when})
+                    users.add(rule.user_id)
+
+                if rows:
+                    session.execute(insert(Transaction), rows)
+                    RollupHelper.record(session, [SimpleNamespace(**values) for values in rows])
+                if positions:
+                    table = RecurringRule.__table__
+                    session.connection().execute(
+                        update(table).where(table.c.id == bindparam('rule_id'), table.c.occurrences == bindparam('seen'))
+                        .values(occurrences=bindparam('occurrences'), next_run=bindparam('next_run')),
+                        positions)
+                report['rules'], report['created'], report['users'] = len(positions), len(rows), len(users)
+        except Exception as e:
+            return report, f"Error: {str(e)}"
+        finally:
+            for user_id in users:
+                report_cache.invalidate_user(user_id)
+            report['seconds'] = time.perf_counter() - started
+
+        return report, f"Created {report['created']} transactions from {report['rules']} recurring rules"
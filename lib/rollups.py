@@ -0,0 +1,178 @@
+from collections import defaultdict
+from sqlalchemy import and_, bindparam, case, delete, func, insert, select, update
+from db.models import User, Category, MonthlyRollup, Transaction, TransactionType, session_scope
+from cache import report_cache
+
+MONTH_FORMAT = "%Y-%m"
+
+class RollupHelper:
+    @staticmethod
+    def record(session, transactions, sign=1):
+        # Runs inside the caller's transaction so rollups commit or roll back with the rows they count
+        deltas = defaultdict(lambda: [0, 0])
+        user_balances = defaultdict(int)
+        category_balances = defaultdict(int)
+        for t in transactions:
+            key = (t.user_id, t.created_at.strftime(MONTH_FORMAT), t.transaction_type, t.category_id)
+            deltas[key][0] += sign * t.amount_cents
+            deltas[key][1] += sign
+
+            net = sign * t.amount_cents if t.transaction_type == TransactionType.INCOME else -sign * t.amount_cents
+            user_balances[t.user_id] += net
+            if t.category_id is not None:
+                category_balances[t.category_id] += net
+
+        # Running balances move by the delta; nothing is re-summed. Core executemany
+        # keeps a batch of thousands of rows to a handful of statements.
+        users, categories, rollups = User.__table__, Category.__table__, MonthlyRollup.__table__
+        if user_balances:
+            session.execute(
+                update(users).where(users.c.id == bindparam('owner')).values(balance_cents=users.c.balance_cents + bindparam('cents')),
+                [{'owner': owner, 'cents': cents} for owner, cents in user_balances.items()])
+        if category_balances:
+            session.execute(
+                update(categories).where(categories.c.id == bindparam('owner'))
+                .values(balance_cents=categories.c.balance_cents + bindparam('cents')),
+                [{'owner': owner, 'cents': cents} for owner, cents in category_balances.items()])
+        if not deltas:
+            return
+
+        existing = RollupHelper._existing_keys(session, deltas)
+        rollup_key = and_(
+            rollups.c.user_id == bindparam('key_user'),
+            rollups.c.month == bindparam('key_month'),
+            rollups.c.transaction_type == bindparam('key_type'),
+            # IS rather than =, so a NULL category matches the uncategorized rollup
+            rollups.c.category_id.is_not_distinct_from(bindparam('key_category'))
+        )
+        updates, inserts = [], []
+        for (user_id, month, trans_type, category_id), (cents, count) in deltas.items():
+            key = {'key_user': user_id, 'key_month': month, 'key_type': trans_type, 'key_category': category_id}
+            if (user_id, month, trans_type, category_id) in existing:
+                updates.append(dict(key, cents=cents, count=count))
+            elif count > 0:
+                inserts.append({'user_id': user_id, 'month': month, 'transaction_type': trans_type,
+                                'category_id': category_id, 'total_cents': cents, 'count': count})
+        if updates:
+            session.execute(
+                update(rollups).where(rollup_key).values(
+                    total_cents=rollups.c.total_cents + bindparam('cents'), count=rollups.c.count + bindparam('count')),
+                updates)
+            if sign < 0:
+                session.execute(delete(rollups).where(rollup_key, rollups.c.count <= 0), updates)
+        if inserts:
+            session.execute(insert(MonthlyRollup), inserts)
+
+    @staticmethod
+    def _existing_keys(session, deltas, chunk_size=500):
+        # Which of the touched rollup rows already exist, read per chunk of users
+        months = [key[1] for key in deltas]
+        user_ids = sorted({key[0] for key in deltas})
+        existing = set()
+        for i in range(0, len(user_ids), chunk_size):
+            existing.update(tuple(row) for row in session.execute(
+                select(MonthlyRollup.user_id, MonthlyRollup.month, MonthlyRollup.transaction_type, MonthlyRollup.category_id)
+                .where(MonthlyRollup.user_id.in_(user_ids[i:i + chunk_size]),
+                       MonthlyRollup.month.between(min(months), max(months)))))
+        return existing
+
+    @staticmethod
+    def forget_category(session, category_id):
+        # The category's transactions go with it, and so does their share of the user's balance.
+        # Its rollups and budgets are removed by ON DELETE CASCADE, its recurring rules set uncategorized
+        user_id, cents = session.query(Category.user_id, Category.balance_cents).filter(Category.id == category_id).one()
+        session.query(User).filter(User.id == user_id).update(
+            {User.balance_cents: User.balance_cents - cents}, synchronize_session=False)
+
+    @staticmethod
+    def _balance_subquery(owner_column):
+        net = func.sum(case(
+            (Transaction.transaction_type == TransactionType.INCOME, Transaction.amount_cents),
+            else_=-Transaction.amount_cents
+        ))
+        return select(func.coalesce(net, 0)).where(owner_column).scalar_subquery()
+
+    @staticmethod
+    def _aggregate_query(session, user_id=None):
+        month = func.strftime(MONTH_FORMAT, Transaction.created_at)
+        query = session.query(
+            Transaction.user_id,
+            month,
+            Transaction.transaction_type,
+            Transaction.category_id,
+            func.sum(Transaction.amount_cents),
+            func.count(Transaction.id)
+        ).filter(Transaction.created_at.isnot(None))
+        if user_id is not None:
+            query = query.filter(Transaction.user_id == user_id)
+        return query.group_by(Transaction.user_id, month, Transaction.transaction_type, Transaction.category_id)
+
+    @staticmethod
+    def rebuild(user_id=None):
+        try:
+            with session_scope() as session:
+                stale = session.query(MonthlyRollup)
+                if user_id is not None:
+                    stale = stale.filter_by(user_id=user_id)
+                stale.delete(synchronize_session=False)
+
+                columns = ['user_id', 'month', 'transaction_type', 'category_id', 'total_cents', 'count']
+                aggregate = RollupHelper._aggregate_query(session, user_id).statement
+                session.execute(insert(MonthlyRollup).from_select(columns, aggregate))
+
+                users = session.query(User)
+                categories = session.query(Category)
+                if user_id is not None:
+                    users = users.filter(User.id == user_id)
+                    categories = categories.filter(Category.user_id == user_id)
+                users.update({User.balance_cents: RollupHelper._balance_subquery(Transaction.user_id == User.id)},
+                             synchronize_session=False)
+                categories.update({Category.balance_cents: RollupHelper._balance_subquery(Transaction.category_id == Category.id)},
+                                  synchronize_session=False)
+            # Summaries were read from the old rollups
+            if user_id is None:
+                report_cache.clear()
+            else:
+                report_cache.invalidate_user(user_id)
+            return True, "Rollups rebuilt"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
+
+    @staticmethod
+    def verify(user_id=None):
+        with session_scope() as session:
+            expected = {tuple(row[:4]): (row[4], row[5]) for row in RollupHelper._aggregate_query(session, user_id)}
+
+            stored = session.query(MonthlyRollup)
+            if user_id is not None:
+                stored = stored.filter_by(user_id=user_id)
+            actual = {
+                (r.user_id, r.month, r.transaction_type, r.category_id): (r.total_cents, r.count)
+                for r in stored
+            }
+
+            drift = []
+            for key in sorted(set(expected) | set(actual), key=str):
+                if expected.get(key, (0, 0)) != actual.get(key, (0, 0)):
+                    drift.append({
+                        'user_id': key[0],
+                        'month': key[1],
+                        'transaction_type': key[2].value,
+                        'category_id': key[3],
+                        'expected': expected.get(key, (0, 0)),
+                        'actual': actual.get(key, (0, 0))
+                    })
+            return drift
+
+    @staticmethod
+    def verify_balances(user_id=None):
+        with session_scope() as session:
+            drift = []
+            for model, owner in ((User, Transaction.user_id == User.id), (Category, Transaction.category_id == Category.id)):
+                query = session.query(model.id, model.balance_cents, RollupHelper._balance_subquery(owner))
+                if user_id is not None:
+                    query = query.filter((User.id if model is User else Category.user_id) == user_id)
+                for owner_id, stored, expected in query:
+                    if stored != expected:
+                        drift.append({'table': model.__tablename__, 'id': owner_id, 'expected': expected, 'actual': stored})
+            return drift
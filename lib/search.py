@@ -0,0 +1,70 @@
+import re
+from sqlalchemy import column, func, literal_column, table, text
+from db.models import Transaction, session_scope
+from money import to_cents
+from records import TransactionRecord, select_records, fetch_records
+
+transactions_fts = table('transactions_fts', column('rowid'))
+TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+# bm25 weights for (description, category, owner): descriptions outrank category names
+RANK = func.bm25(literal_column('transactions_fts'), 10.0, 5.0, 0.0)
+
+def build_match(query, user_id):
+    # Quoted text is a phrase, bare words match as prefixes ("grocer" finds "Groceries")
+    terms = []
+    for phrase, word in TERM.findall(query):
+        if phrase.strip():
+            terms.append('"' + phrase.strip() + '"')
+        else:
+            # Split where the tokenizer splits, so "e-mail" is the phrase "e mail", not "email"
+            tokens = re.findall(r'[^\W_]+', word)
+            if tokens:
+                terms.append(f'"{" ".join(tokens)}"*')
+    if not terms:
+        return None
+    return f'owner:"u{user_id}" AND {{description category}}:({" AND ".join(terms)})'
+
+class SearchHelper:
+    @staticmethod
+    def search(user_id, query, min_amount=None, max_amount=None, start_date=None, end_date=None, page=1, page_size=20):
+        match = build_match(query, user_id)
+        if not match:
+            return [], False
+
+        with session_scope() as session:
+            results = select_records(TransactionRecord).join(
+                transactions_fts, transactions_fts.c.rowid == Transaction.id
+            ).where(
+                literal_column('transactions_fts').op('MATCH')(match),
+                Transaction.user_id == user_id
+            )
+            if min_amount is not None:
+                results = results.where(Transaction.amount_cents >= to_cents(min_amount))
+            if max_amount is not None:
+                results = results.where(Transaction.amount_cents <= to_cents(max_amount))
+            if start_date:
+                results = results.where(Transaction.created_at >= start_date)
+            if end_date:
+                results = results.where(Transaction.created_at < end_date)
+
+            results = fetch_records(session, TransactionRecord, results.order_by(RANK, Transaction.created_at.desc())
+                                    .limit(page_size + 1).offset((max(page, 1) - 1) * page_size))
+
+        has_more = len(results) > page_size
+        return results[:page_size], has_more
+
+    @staticmethod
+    def rebuild():
+        try:
+            with session_scope() as session:
+                session.execute(text("DELETE FROM transactions_fts"))
+                session.execute(text(
+                    "INSERT INTO transactions_fts (rowid, description, category, owner) "
+                    "SELECT t.id, t.description, c.name, 'u' || t.user_id "
+                    "FROM transactions t LEFT JOIN categories c ON c.id = t.category_id"
+                ))
+                session.execute(text("INSERT INTO transactions_fts (transactions_fts) VALUES ('optimize')"))
+            return True, "Search index rebuilt"
+        except Exception as e:
+            return False, f"Error: {str(e)}"
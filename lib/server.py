@@ -0,0 +1,420 @@
+import hashlib
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from helpers import UserHelper, CategoryHelper, TransactionHelper, validate_email
+from budgets import BudgetHelper
+from purge import PurgeHelper
+from commands import json_default, transaction_record
+from db.session import get_engine
+from writebehind import WRITE_BEHIND, write_behind
+
+# HTTP/JSON front end over the helpers. Every helper call already opens its own
+# session from the pooled engine, so request threads never share one; the
+# logged-in user comes from a bearer token instead of a process global.
+
+TOKEN_TTL = int(os.environ.get('FINANCE_TRACKER_TOKEN_TTL', 12 * 3600))
+MAX_PAGE_SIZE = 500
+MAX_BODY_BYTES = 1024 * 1024
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class TokenStore:
+    def __init__(self, ttl=TOKEN_TTL):
+        self.ttl = ttl
+        self.tokens = {}
+        # (expiry, token) in issue order; with one TTL that is also expiry order
+        self.expiries = deque()
+        self.lock = threading.Lock()
+
+    def issue(self, user):
+        token = secrets.token_urlsafe(32)
+        now = time.monotonic()
+        with self.lock:
+            # Sweep tokens that expired without being presented again, so the store stays bounded
+            while self.expiries and self.expiries[0][0] < now:
+                _, expired = self.expiries.popleft()
+                self.tokens.pop(expired, None)
+            self.tokens[token] = (user, now + self.ttl)
+            self.expiries.append((now + self.ttl, token))
+        return token
+
+    def lookup(self, token):
+        with self.lock:
+            entry = self.tokens.get(token)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self.tokens[token]
+                return None
+            return entry[0]
+
+    def revoke(self, token):
+        with self.lock:
+            self.tokens.pop(token, None)
+
+    def revoke_user(self, user_id):
+        with self.lock:
+            for token in [t for t, (user, _) in self.tokens.items() if user.id == user_id]:
+                del self.tokens[token]
+
+tokens = TokenStore()
+
+def check(result, status=400):
+    value, msg = result
+    if not value:
+        if msg.startswith("Error:"):
+            raise ApiError(500, msg)
+        if msg.endswith("not found"):
+            raise ApiError(404, msg)
+        if msg.endswith("already exists"):
+            raise ApiError(409, msg)
+        if msg.startswith("Too many failed attempts"):
+            raise ApiError(429, msg)
+        raise ApiError(status, msg)
+    return value, msg
+
+def require(body, *fields):
+    missing = [f for f in fields if body.get(f) in (None, "")]
+    if missing:
+        raise ApiError(400, f"Missing field(s): {', '.join(missing)}")
+    return [body[f] for f in fields]
+
+def parse_date(value, fmt="%Y-%m-%d"):
+    try:
+        return datetime.strptime(value, fmt) if value else None
+    except ValueError:
+        raise ApiError(400, f"Invalid date '{value}'")
+
+def parse_month(value):
+    start = parse_date(value, "%Y-%m")
+    if start is None:
+        return None, None
+    return start, datetime(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+def parse_int(value, name, default=None):
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ApiError(400, f"'{name}' must be an integer")
+
+def encode_cursor(cursor):
+    if not cursor:
+        return None
+    created_at, transaction_id = cursor
+    return f"{created_at.isoformat()}_{transaction_id}"
+
+def decode_cursor(value):
+    if not value:
+        return None
+    try:
+        created_at, _, transaction_id = value.rpartition("_")
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except ValueError:
+        raise ApiError(400, f"Invalid cursor '{value}'")
+
+def background(request):
+    # ?background=1: big deletes run as a chunked job, polled at GET /jobs/<id>
+    return request.query.get('background', '').lower() in ('1', 'true', 'yes')
+
+# Route handlers: (request, user, match) -> (status, payload)
+
+def create_user(request, user, match):
+    name, email, password = require(request.body(), 'name', 'email', 'password')
+    if not validate_email(email):
+        raise ApiError(400, "Invalid email format")
+    user, msg = check(UserHelper.create_user(name, email, password))
+    return 201, {'message': msg, 'user': user.to_dict(), 'token': tokens.issue(user)}
+
+def login(request, user, match):
+    email, password = require(request.body(), 'email', 'password')
+    user, msg = check(UserHelper.login_user(email, password), 401)
+    return 201, {'message': msg, 'user': user.to_dict(), 'token': tokens.issue(user)}
+
+def logout(request, user, match):
+    tokens.revoke(request.token)
+    return 200, {'message': "Logged out"}
+
+def get_me(request, user, match):
+    return 200, user.to_dict()
+
+def delete_me(request, user, match):
+    if background(request):
+        job = PurgeHelper.purge_user(user.id, background=True)
+        tokens.revoke_user(user.id)
+        return 202, {'message': "Deleting account", 'job': job.id}
+    _, msg = check(UserHelper.delete_user(user.id))
+    tokens.revoke_user(user.id)
+    return 200, {'message': msg}
+
+def list_categories(request, user, match):
+    return 200, [c.to_dict() for c in CategoryHelper.get_user_categories(user.id)]
+
+def create_category(request, user, match):
+    name, = require(request.body(), 'name')
+    category, msg = check(CategoryHelper.create_category(name, user.id))
+    return 201, {'message': msg, 'category': category.to_dict()}
+
+def delete_category(request, user, match):
+    name = unquote(match.group(1))
+    if background(request):
+        if not any(category.name == name for category in CategoryHelper.get_user_categories(user.id)):
+            raise ApiError(404, "Category not found")
+        job = PurgeHelper.purge_category(name, user.id, background=True)
+        return 202, {'message': f"Deleting category '{name}'", 'job': job.id}
+    _, msg = check(CategoryHelper.delete_category(name, user.id))
+    return 200, {'message': msg}
+
+def get_job(request, user, match):
+    # No token: the account may be gone by now, and job ids are unguessable
+    job = PurgeHelper.get_job(match.group(1))
+    if job is None:
+        raise ApiError(404, "Job not found")
+    return 200, dict(job.status)
+
+def list_transactions(request, user, match):
+    query = request.query
+    page_size = parse_int(query.get('limit'), 'limit', 50)
+    if not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise ApiError(400, f"'limit' must be between 1 and {MAX_PAGE_SIZE}")
+    order = query.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        raise ApiError(400, "'order' must be 'asc' or 'desc'")
+    start_date, end_date = parse_month(query.get('month'))
+    transactions, cursor = TransactionHelper.get_transactions_page(
+        user.id, page_size, decode_cursor(query.get('cursor')), order, start_date, end_date)
+    return 200, {'transactions': [transaction_record(t) for t in transactions], 'next_cursor': encode_cursor(cursor)}
+
+def create_transaction(request, user, match):
+    body = request.body()
+    amount, transaction_type, description = require(body, 'amount', 'type', 'description')
+    category = body.get('category') or None
+    try:
+        if float(amount) <= 0:
+            raise ApiError(400, "Amount must be > 0")
+    except (TypeError, ValueError):
+        raise ApiError(400, "Amount must be a number")
+    if WRITE_BEHIND:
+        # Still answers after the commit, but concurrent requests share one
+        transaction, msg = check(TransactionHelper.queue_transaction(
+            amount, str(transaction_type), description, user.id, category).result())
+    else:
+        transaction, msg = check(TransactionHelper.create_transaction(amount, str(transaction_type), description, user.id, category))
+    headline, _, alerts = msg.partition("\n")
+    return 201, {'message': headline, 'alerts': alerts.splitlines(), 'transaction': transaction_record(transaction)}
+
+def categorize_transactions(request, user, match):
+    # {"category": "Food" or null to clear, "ids": [...], "match": "coffee"}
+    body = request.body()
+    ids = body.get('ids') or []
+    if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+        raise ApiError(400, "'ids' must be a list of integers")
+    moved, msg = TransactionHelper.categorize(user.id, body.get('category') or None, ids, body.get('match'))
+    if moved is None:
+        check((None, msg))
+    return 200, {'message': msg, 'moved': moved}
+
+def delete_transaction(request, user, match):
+    _, msg = check(TransactionHelper.delete_transaction(unquote(match.group(1)), user.id))
+    return 200, {'message': msg}
+
+def summary_report(request, user, match):
+    query = request.query
+    return 200, TransactionHelper.get_monthly_report(
+        user.id, parse_date(query.get('from')), parse_date(query.get('to')),
+        parse_int(query.get('category_id'), 'category_id'))
+
+def category_report(request, user, match):
+    query = request.query
+    for name in ('from', 'to'):
+        parse_month(query.get(name))
+    top = parse_int(query.get('top'), 'top')
+    if top is not None and top < 1:
+        raise ApiError(400, "'top' must be at least 1")
+    return 200, TransactionHelper.get_category_report(user.id, query.get('from'), query.get('to'), top)
+
+def detailed_report(request, user, match):
+    return 200, TransactionHelper.get_detailed_monthly_report(user.id)
+
+def totals(request, user, match):
+    return 200, TransactionHelper.get_transaction_totals(user.id)
+
+def balance(request, user, match):
+    balances = UserHelper.get_balances(user.id)
+    return 200, dict(balances, categories=dict(balances['categories']))
+
+def budgets(request, user, match):
+    return 200, BudgetHelper.get_budget_status(user.id, request.query.get('month'))
+
+# (method, path pattern, handler, needs a token)
+ROUTES = [
+    ('POST', r'/users', create_user, False),
+    ('POST', r'/sessions', login, False),
+    ('DELETE', r'/sessions', logout, True),
+    ('GET', r'/me', get_me, True),
+    ('DELETE', r'/me', delete_me, True),
+    ('GET', r'/categories', list_categories, True),
+    ('POST', r'/categories', create_category, True),
+    ('DELETE', r'/categories/([^/]+)', delete_category, True),
+    ('GET', r'/transactions', list_transactions, True),
+    ('POST', r'/transactions', create_transaction, True),
+    ('POST', r'/transactions/categorize', categorize_transactions, True),
+    ('DELETE', r'/transactions/([^/]+)', delete_transaction, True),
+    ('GET', r'/reports/summary', summary_report, True),
+    ('GET', r'/reports/categories', category_report, True),
+    ('GET', r'/reports/detailed', detailed_report, True),
+    ('GET', r'/reports/totals', totals, True),
+    ('GET', r'/balance', balance, True),
+    ('GET', r'/budgets', budgets, True),
+    ('GET', r'/jobs/([^/]+)', get_job, False),
+]
+ROUTES = [(method, re.compile(pattern + r'/?$'), handler, auth) for method, pattern, handler, auth in ROUTES]
+
+def etag_for(body):
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients reuse one connection for many requests
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; with Nagle on, each response waits out a delayed ACK
+    disable_nagle_algorithm = True
+    server_version = 'FinanceTracker/1.0'
+    quiet = False
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def content_length(self):
+        value = (self.headers.get('Content-Length') or '0').strip()
+        if not re.fullmatch(r'[0-9]+', value):
+            # No telling where this body ends, so the connection can't be reused
+            self.close_connection = True
+            raise ApiError(400, "Invalid Content-Length")
+        return int(value)
+
+    def body(self):
+        length = self.length
+        if length > MAX_BODY_BYTES:
+            # Hang up rather than read the body just to throw it away
+            self.close_connection = True
+            raise ApiError(413, "Request body too large")
+        raw = self.rfile.read(length) if length else b''
+        self.body_read = True
+        try:
+            body = json.loads(raw or b'{}')
+        except ValueError:
+            raise ApiError(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Request body must be a JSON object")
+        return body
+
+    def authenticate(self):
+        header = self.headers.get('Authorization', '')
+        scheme, _, token = header.partition(' ')
+        user = tokens.lookup(token.strip()) if scheme.lower() == 'bearer' else None
+        if user is None:
+            raise ApiError(401, "Missing or expired token")
+        self.token = token.strip()
+        return user
+
+    def dispatch(self, method):
+        self.body_read = False
+        self.length = 0
+        url = urlsplit(self.path)
+        self.query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            self.length = self.content_length()
+            for route_method, pattern, handler, auth in ROUTES:
+                match = pattern.match(url.path)
+                if match and route_method == method:
+                    user = self.authenticate() if auth else None
+                    status, payload = handler(self, user, match)
+                    break
+            else:
+                allowed = any(pattern.match(url.path) for _, pattern, _, _ in ROUTES)
+                raise ApiError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+        except ApiError as e:
+            status, payload = e.status, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"Error: {str(e)}"}
+
+        if not self.body_read and self.length and not self.close_connection:
+            if self.length > MAX_BODY_BYTES:
+                self.close_connection = True
+            else:
+                # Drain an unread body so the next request on this connection parses cleanly
+                self.rfile.read(self.length)
+        self.respond(method, status, payload)
+
+    def respond(self, method, status, payload):
+        body = json.dumps(payload, default=json_default).encode()
+        headers = {'Content-Type': 'application/json'}
+        if self.close_connection:
+            headers['Connection'] = 'close'
+        if method == 'GET' and status == 200:
+            # Conditional GET: an unchanged report costs the client no body at all
+            etag = etag_for(body)
+            headers.update({'ETag': etag, 'Cache-Control': 'private, no-cache'})
+            if etag in [tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')]:
+                status, body = 304, b''
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The socketserver default of 5 resets connections when many clients connect at once
+    request_queue_size = 128
+
+def make_server(host='127.0.0.1', port=8000, quiet=False):
+    RequestHandler.quiet = quiet
+    return Server((host, port), RequestHandler)
+
+def serve(host='127.0.0.1', port=8000, quiet=False):
+    # Open the pool before the first request instead of inside it
+    get_engine()
+    server = make_server(host, port, quiet)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        write_behind.close()
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if arg != "--quiet"]
+    serve(args[1] if len(args) > 1 else '127.0.0.1', int(args[0]) if args else 8000, "--quiet" in sys.argv)
@@ -0,0 +1,75 @@
+import os
+from sqlalchemy import case, func, text
+from db.models import User, Category, Transaction, TransactionType, MonthlyRollup, session_scope
+
+class StatsHelper:
+    @staticmethod
+    def collect():
+        with session_scope() as session:
+            categories = session.query(
+                Category.user_id,
+                func.count(Category.id).label('categories')
+            ).group_by(Category.user_id).subquery()
+
+            # Per-user totals come from the monthly rollups: O(months) rather than O(transactions)
+            totals = session.query(
+                MonthlyRollup.user_id,
+                func.sum(MonthlyRollup.count).label('transactions'),
+                func.sum(case((MonthlyRollup.transaction_type == TransactionType.INCOME, MonthlyRollup.total_cents), else_=0)).label('income_cents'),
+                func.sum(case((MonthlyRollup.transaction_type == TransactionType.EXPENSE, MonthlyRollup.total_cents), else_=0)).label('expense_cents')
+            ).group_by(MonthlyRollup.user_id).subquery()
+
+            # Correlated MIN/MAX are single seeks on ix_transactions_user_id_created_at
+            first_activity = session.query(func.min(Transaction.created_at)) \
+                .filter(Transaction.user_id == User.id).correlate(User).scalar_subquery()
+            last_activity = session.query(func.max(Transaction.created_at)) \
+                .filter(Transaction.user_id == User.id).correlate(User).scalar_subquery()
+
+            rows = session.query(
+                User.id,
+                User.name,
+                User.email,
+                User.last_login,
+                func.coalesce(categories.c.categories, 0),
+                func.coalesce(totals.c.transactions, 0),
+                func.coalesce(totals.c.income_cents, 0),
+                func.coalesce(totals.c.expense_cents, 0),
+                first_activity,
+                last_activity
+            ).outerjoin(categories, categories.c.user_id == User.id) \
+                .outerjoin(totals, totals.c.user_id == User.id) \
+                .order_by(User.id).all()
+
+            page_size = session.execute(text("PRAGMA page_size")).scalar()
+            page_count = session.execute(text("PRAGMA page_count")).scalar()
+            free_pages = session.execute(text("PRAGMA freelist_count")).scalar()
+            path = session.get_bind().url.database
+
+        users = [{
+            'id': row[0],
+            'name': row[1],
+            'email': row[2],
+            'last_login': row[3],
+            'categories': row[4],
+            'transactions': row[5],
+            'income_cents': row[6],
+            'expense_cents': row[7],
+            'first_activity': row[8],
+            'last_activity': row[9],
+        } for row in rows]
+
+        wal_path = f"{path}-wal" if path else None
+        return {
+            'database': {
+                'path': path,
+                'size_bytes': page_size * page_count,
+                'free_bytes': page_size * free_pages,
+                'wal_bytes': os.path.getsize(wal_path) if wal_path and os.path.exists(wal_path) else 0,
+            },
+            'totals': {
+                'users': len(users),
+                'categories': sum(u['categories'] for u in users),
+                'transactions': sum(u['transactions'] for u in users),
+            },
+            'users': users,
+        }
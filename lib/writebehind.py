@@ -0,0 +1,203 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime
+from db.models import Category, Transaction, TransactionType, session_scope
+from db.session import get_engine
+from money import to_cents
+from cache import report_cache
+from rollups import RollupHelper
+from budgets import BudgetHelper
+
+# Write-behind for create_transaction: callers enqueue and get a Future back, and
+# one writer thread commits whatever has queued up as a single transaction. Under
+# concurrent writers that turns N commits (and N fsyncs) into one per batch.
+
+WRITE_BEHIND = os.environ.get('FINANCE_TRACKER_WRITE_BEHIND', '0') == '1'
+WRITE_BATCH_SIZE = int(os.environ.get('FINANCE_TRACKER_WRITE_BATCH_SIZE', 500))
+WRITE_FLUSH_MS = float(os.environ.get('FINANCE_TRACKER_WRITE_FLUSH_MS', 10))
+WRITE_QUEUE_SIZE = int(os.environ.get('FINANCE_TRACKER_WRITE_QUEUE_SIZE', 10000))
+# What submit does when the queue is full: wait for room, refuse, or commit in the caller
+WRITE_FULL_POLICY = os.environ.get('FINANCE_TRACKER_WRITE_FULL_POLICY', 'block')
+WRITE_BLOCK_TIMEOUT = float(os.environ.get('FINANCE_TRACKER_WRITE_BLOCK_TIMEOUT', 30))
+FULL_POLICIES = ('block', 'reject', 'inline')
+
+_STOP = object()
+
+class WriteBehindQueue:
+    def __init__(self, batch_size=WRITE_BATCH_SIZE, flush_ms=WRITE_FLUSH_MS, max_pending=WRITE_QUEUE_SIZE,
+                 policy=WRITE_FULL_POLICY, block_timeout=WRITE_BLOCK_TIMEOUT):
+        if policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown write queue policy '{policy}'. Use one of: {', '.join(FULL_POLICIES)}")
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.thread = None
+        self.closed = False
+        self.lock = threading.Lock()
+        # Bumped from caller threads and the writer thread alike, so only under the lock
+        self.counts = {'written': 0, 'batches': 0, 'failed': 0, 'rejected': 0, 'inline': 0}
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.closed = False
+                self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self.thread.start()
+                # Daemon threads are still running when atexit handlers fire, so this drains the queue
+                atexit.register(self.close)
+        return self
+
+    def submit(self, amount, transaction_type, description, user_id, category_name=None):
+        # Resolves to the same (transaction, message) pair create_transaction returns,
+        # once the batch holding this row has committed
+        future = Future()
+        if transaction_type.lower() not in ['income', 'expense']:
+            future.set_result((None, "Invalid type. Use 'income' or 'expense'"))
+            return future
+        try:
+            transaction = Transaction(
+                amount_cents=to_cents(amount),
+                transaction_type=TransactionType.INCOME if transaction_type.lower() == 'income' else TransactionType.EXPENSE,
+                description=description,
+                user_id=user_id,
+                # Stamped at submit time, so rows keep the order callers made them in
+                created_at=datetime.now()
+            )
+        except Exception as e:
+            future.set_result((None, f"Error: {str(e)}"))
+            return future
+        if self.closed:
+            future.set_result((None, "Write queue is closed"))
+            return future
+        self.start()
+
+        item = (transaction, future, category_name or None)
+        try:
+            if self.policy == 'block':
+                self.queue.put(item, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            if self.policy == 'inline':
+                self._count(inline=1)
+                self._write([item])
+            else:
+                self._count(rejected=1)
+                future.set_result((None, "Write queue is full, try again later"))
+        return future
+
+    def flush(self, timeout=None):
+        # Wait until everything submitted before this call has committed
+        if self.thread is None or not self.thread.is_alive():
+            return True
+        marker = Future()
+        self.queue.put((None, marker, None))
+        return marker.result(timeout)[0]
+
+    def close(self, timeout=None):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            thread, self.thread = self.thread, None
+        if thread is not None and thread.is_alive():
+            self.queue.put(_STOP)
+            thread.join(timeout)
+        self._checkpoint()
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def _count(self, **increments):
+        with self.lock:
+            for name, amount in increments.items():
+                self.counts[name] += amount
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            batch = [item]
+            stop = False
+            # Wait up to the flush interval for more rows, but no longer than a full batch
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size and batch[-1][0] is not None:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch):
+        entries = [entry for entry in batch if entry[0] is not None]
+        if entries:
+            try:
+                self._commit(entries)
+            except Exception:
+                # One bad row shouldn't fail its neighbours: retry them a commit each
+                for entry in entries:
+                    if entry[1].done():
+                        continue
+                    try:
+                        self._commit([entry])
+                    except Exception as e:
+                        self._count(failed=1)
+                        entry[1].set_result((None, f"Error: {str(e)}"))
+        for transaction, marker, _ in batch:
+            if transaction is None:
+                marker.set_result((True, "Flushed"))
+
+    def _commit(self, entries):
+        with session_scope() as session:
+            # Category names resolved for the whole batch in one query
+            names = {(transaction.user_id, name) for transaction, _, name in entries if name}
+            categories = {}
+            if names:
+                categories = {(user_id, name): category_id for category_id, user_id, name in session.query(
+                    Category.id, Category.user_id, Category.name).filter(
+                    Category.user_id.in_({user_id for user_id, _ in names}), Category.name.in_({name for _, name in names}))}
+            missing = [entry for entry in entries if entry[2] and (entry[0].user_id, entry[2]) not in categories]
+            for transaction, future, _ in missing:
+                future.set_result((None, "Category not found"))
+            entries = [entry for entry in entries if entry not in missing]
+            for transaction, _, name in entries:
+                if name:
+                    transaction.category_id = categories[(transaction.user_id, name)]
+            transactions = [transaction for transaction, _, _ in entries]
+            session.add_all(transactions)
+            session.flush()
+            RollupHelper.record(session, transactions)
+            alerts = BudgetHelper.check_many(session, transactions)
+        for user_id in {transaction.user_id for transaction in transactions}:
+            report_cache.invalidate_user(user_id)
+        self._count(written=len(entries), batches=1)
+        for (transaction, future, _), messages in zip(entries, alerts):
+            future.set_result((transaction, "\n".join(["Transaction created"] + messages)))
+
+    def _checkpoint(self):
+        # With synchronous=NORMAL a WAL commit isn't fsynced until a checkpoint; force one on shutdown
+        engine = get_engine()
+        if engine.dialect.name != 'sqlite':
+            return
+        try:
+            with engine.connect() as connection:
+                connection.exec_driver_sql("PRAGMA wal_checkpoint(FULL)")
+        except Exception as e:
+            print(f"Write-behind checkpoint failed: {str(e)}")
+
+write_behind = WriteBehindQueue()